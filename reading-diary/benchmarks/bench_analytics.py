@@ -0,0 +1,83 @@
+"""Аналитика чтения: полная загрузка, итоговые показатели и обновление после изменения книги
+
+Полная загрузка читает все книги одним запросом в массивы NumPy;
+обновление после изменения одной книги поправляет агрегаты на ее вклад.
+После серии изменений результат сверяется с загрузкой с нуля.
+
+Запуск: python benchmarks/bench_analytics.py [--books 1000000]
+"""
+import argparse
+import random
+import sys
+import time
+
+from common import STATUSES, make_library, measure, random_book, temp_db_path
+
+from analytics import ReadingAnalytics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--changes', type=int, default=200)
+    args = parser.parse_args()
+
+    db = make_library(temp_db_path(), args.books)
+
+    analytics = ReadingAnalytics(db)
+    load_ms = measure(analytics.load, args.repeat) / 1000
+    summary_ms = measure(analytics.summary, args.repeat * 4) / 1000
+
+    rng = random.Random(11)
+    genres = [genre['name'] for genre in db.get_all_genres()]
+    max_id = db.connect().execute("SELECT MAX(id) FROM books").fetchone()[0]
+    deleted = set()
+
+    def change():
+        action = rng.random()
+        if action < 0.3:
+            db.add_book(random_book(rng, genres))
+        elif action < 0.8:
+            book_id = rng.randint(1, max_id)
+            if book_id not in deleted:
+                book = random_book(rng, genres)
+                db.update_books([(book_id, {'status': rng.choice(STATUSES),
+                                            'start_date': book['start_date'],
+                                            'finish_date': book['finish_date'],
+                                            'pages': book['pages']})])
+        else:
+            book_id = rng.randint(1, max_id)
+            deleted.add(book_id)
+            db.delete_books([book_id])
+
+    # Каждое изменение сразу учитывается, как при открытии статистики после правки
+    refresh_us = 0.0
+    for _ in range(args.changes):
+        change()
+        started = time.perf_counter()
+        analytics.refresh()
+        refresh_us += (time.perf_counter() - started) * 1e6
+    refresh_ms = refresh_us / args.changes / 1000
+
+    fresh = ReadingAnalytics(db)
+    fresh.load()
+    matches = fresh.summary() == analytics.summary()
+    summary = analytics.summary()
+
+    print(f"Библиотека: {args.books} книг")
+    print(f"полная загрузка (один запрос):       {load_ms:>9.1f} мс")
+    print(f"итоговые показатели:                 {summary_ms:>9.2f} мс")
+    print(f"обновление после изменения книги:    {refresh_ms:>9.2f} мс")
+    print(f"дней чтения: {summary['reading_days']}, средняя длительность: {summary['avg_duration']} дн., "
+          f"страниц в день: {summary['pages_per_day']}")
+    db.close()
+
+    if not matches:
+        print("Инкрементальные агрегаты расходятся с загрузкой с нуля")
+        sys.exit(1)
+    print(f"После {args.changes} изменений агрегаты совпадают с загрузкой с нуля")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""N одиночных вызовов add_book/update_book/delete_book против одного пакетного
+
+Запуск: python benchmarks/bench_batch_writes.py [--books 10000 --count 2000]
+"""
+import argparse
+import random
+import time
+
+from common import make_library, random_book, temp_db_path
+
+
+def elapsed_ms(func) -> float:
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=10_000)
+    parser.add_argument('--count', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    results = []
+    for mode in ('single', 'batch'):
+        db = make_library(temp_db_path(), args.books)
+        genres = [genre['name'] for genre in db.get_all_genres()]
+        new_books = [random_book(rng, genres) for _ in range(args.count)]
+
+        if mode == 'single':
+            book_ids = []
+            add_ms = elapsed_ms(lambda: book_ids.extend(db.add_book(book) for book in new_books))
+            updates = [(book_id, dict(book, status='Отложено')) for book_id, book in zip(book_ids, new_books)]
+            update_ms = elapsed_ms(lambda: [db.update_book(book_id, book) for book_id, book in updates])
+            delete_ms = elapsed_ms(lambda: [db.delete_book(book_id) for book_id in book_ids])
+        else:
+            book_ids = []
+            add_ms = elapsed_ms(lambda: book_ids.extend(db.add_books(new_books)))
+            updates = [(book_id, {'status': 'Отложено'}) for book_id in book_ids]
+            update_ms = elapsed_ms(lambda: db.update_books(updates))
+            delete_ms = elapsed_ms(lambda: db.delete_books(book_ids))
+
+        results.append((mode, add_ms, update_ms, delete_ms, db.check_statistics()))
+        db.close()
+
+    print(f"Библиотека: {args.books} книг, операций: {args.count}")
+    print(f"{'вариант':<12}{'добавление, мс':>16}{'изменение, мс':>16}{'удаление, мс':>15}")
+    for mode, add_ms, update_ms, delete_ms, differences in results:
+        title = 'по одной' if mode == 'single' else 'пакетом'
+        print(f"{title:<12}{add_ms:>16.1f}{update_ms:>16.1f}{delete_ms:>15.1f}")
+        if differences:
+            print(f"  статистика расходится с пересчетом: {differences}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""Реализации графиков статистики: Qt (QPainter) против matplotlib
+
+Для каждой реализации в отдельном процессе замеряются время импорта модуля,
+время первой и повторной отрисовки трех графиков (данные за 10 лет
+помесячно) и прирост памяти процесса (max RSS).
+
+Запуск: python benchmarks/bench_chart_backends.py [--books 20000]
+(без дисплея выставляется QT_QPA_PLATFORM=offscreen)
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from common import make_library, temp_db_path
+
+from charts import CHART_BACKENDS
+
+
+def max_rss_mb() -> float:
+    # В Linux ru_maxrss в килобайтах
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_backend(name: str, db_path: str, repeat: int) -> dict:
+    """Замеры одной реализации в текущем процессе"""
+    import importlib
+
+    from PyQt6.QtWidgets import QApplication, QWidget
+
+    from database import Database
+
+    app = QApplication(sys.argv)
+    db = Database(db_path)
+    stats = db.get_statistics()
+    months = [item['month'] for item in stats['monthly_stats']]
+    counts = [item['count'] for item in stats['monthly_stats']]
+    genres = [item for item in stats['genres_stats'] if item['count']]
+    ratings = {item['rating']: item['count'] for item in stats['ratings_stats']}
+    containers = [QWidget() for _ in range(3)]
+    for container in containers:
+        container.resize(600, 400)
+    rss_before = max_rss_mb()
+
+    started = time.perf_counter()
+    module = importlib.import_module(CHART_BACKENDS[name][0])
+    import_ms = (time.perf_counter() - started) * 1000
+
+    def render(shift: int) -> float:
+        started = time.perf_counter()
+        charts.set_monthly(months, [count + shift for count in counts])
+        charts.set_genres([item['genre'] for item in genres], [item['count'] + shift for item in genres])
+        charts.set_ratings({rating: count + shift for rating, count in ratings.items()})
+        for container in containers:
+            # grab() рисует виджет целиком, как при показе
+            container.grab()
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    charts = module.Charts(*containers)
+    for container in containers:
+        container.show()
+    app.processEvents()
+    first_ms = (time.perf_counter() - started) * 1000 + render(0)
+    update_ms = sum(render(shift) for shift in range(1, repeat + 1)) / repeat
+
+    db.close()
+    return {
+        'import_ms': import_ms,
+        'first_ms': first_ms,
+        'update_ms': update_ms,
+        'memory_mb': max_rss_mb() - rss_before,
+        'months': len(months),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=20_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--backend', help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        # Дочерний процесс: замеры одной реализации
+        print(json.dumps(run_backend(args.backend, args.db, args.repeat)))
+        return
+
+    db = make_library(temp_db_path(), args.books)
+    db_path = db.db_path
+    db.close()
+
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    print(f"Библиотека: {args.books} книг")
+    print(f"{'реализация':<12}{'импорт, мс':>12}{'первая, мс':>12}{'повторная, мс':>15}{'память, МБ':>12}")
+    for name in CHART_BACKENDS:
+        result = subprocess.run(
+            [sys.executable, __file__, '--backend', name, '--db', db_path, '--repeat', str(args.repeat)],
+            env=env, capture_output=True, text=True, check=True
+        )
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"{name:<12}{report['import_ms']:>12.1f}{report['first_ms']:>12.1f}"
+              f"{report['update_ms']:>15.1f}{report['memory_mb']:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
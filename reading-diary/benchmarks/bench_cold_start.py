@@ -0,0 +1,77 @@
+"""Время холодного запуска: от старта процесса до первой отрисовки главного окна
+
+Программа запускается несколько раз в режиме --profile-startup с пустой
+базой во временном каталоге. Проверяется, что тяжелые модули (matplotlib,
+numpy) не загружаются до первого окна; с --max-ms медиана сверх порога
+считается регрессией. Запуск с --uic сравнивает с разбором .ui через uic.
+
+Запуск: python benchmarks/bench_cold_start.py [--runs 7 --max-ms 1500]
+(без дисплея выставляется QT_QPA_PLATFORM=offscreen)
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import SRC_DIR
+
+MAIN = os.path.join(SRC_DIR, 'main.py')
+
+
+def run_once(env) -> tuple:
+    """Возвращает (время до первого окна по часам процесса, мс; по отчету, мс; тяжелые модули)"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, MAIN, '--profile-startup', '--exit-after-startup'],
+        cwd=tempfile.mkdtemp(prefix='reading_diary_'), env=env,
+        capture_output=True, text=True, timeout=120, check=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    first_window = float(re.search(r'Первое окно: ([\d.]+) мс', result.stdout).group(1))
+    heavy = re.search(r'Тяжелые модули при запуске: (.*)', result.stdout).group(1)
+    return wall_ms, first_window, heavy
+
+
+def measure(runs: int, env) -> tuple:
+    results = [run_once(env) for _ in range(runs)]
+    return (statistics.median(wall for wall, _, _ in results),
+            statistics.median(first for _, first, _ in results),
+            {heavy for _, _, heavy in results})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--max-ms', type=float, help="порог медианы времени до первого окна")
+    parser.add_argument('--uic', action='store_true', help="сравнить с загрузкой .ui через uic")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    variants = [('текущий запуск', env)]
+    if args.uic:
+        variants.append(('без скомпилированного UI', dict(env, READING_DIARY_UIC='1')))
+
+    failed = False
+    print(f"Медиана по {args.runs} запускам")
+    for title, variant_env in variants:
+        wall_ms, first_window_ms, heavy = measure(args.runs, variant_env)
+        print(f"{title:<26} процесс целиком: {wall_ms:>8.1f} мс, первое окно: {first_window_ms:>8.1f} мс")
+        if heavy != {'нет'}:
+            failed = True
+            print(f"  до первого окна загружены тяжелые модули: {', '.join(heavy)}")
+        if args.max_ms and variant_env is env and first_window_ms > args.max_ms:
+            failed = True
+            print(f"  регрессия: первое окно дольше порога {args.max_ms:.0f} мс")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
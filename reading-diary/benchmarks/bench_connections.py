@@ -0,0 +1,42 @@
+"""Задержка одного вызова Database с новым соединением на каждый вызов и с пулом
+
+Запуск: python benchmarks/bench_connections.py [--books 100000]
+"""
+import argparse
+import random
+
+from common import make_library, measure, temp_db_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    db = make_library(temp_db_path(), args.books)
+    rng = random.Random(1)
+
+    calls = {
+        'get_book': lambda: db.get_book(rng.randint(1, args.books)),
+        'get_all_genres': db.get_all_genres,
+    }
+
+    print(f"Библиотека: {args.books} книг, {args.repeat} вызовов на метод")
+    print(f"{'метод':<16}{'новое соединение, мкс':>24}{'пул, мкс':>12}")
+    for name, call in calls.items():
+        # Прежнее поведение: каждый вызов открывает новое соединение
+        def fresh():
+            db.close()
+            call()
+
+        fresh_us = measure(fresh, args.repeat)
+        call()
+        pooled_us = measure(call, args.repeat)
+        print(f"{name:<16}{fresh_us:>24.1f}{pooled_us:>12.1f}")
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""Пиковый RSS при загрузке списка книг с обложками в строках и без них
+
+Каждый вариант запускается в отдельном процессе на одной и той же базе:
+«до» повторяет прежний SELECT b.* с BLOB обложки в каждой строке,
+«после» — текущие get_all_books и export_to_csv.
+
+Запуск: python benchmarks/bench_covers_memory.py [--books 20000 --cover-kb 40]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+
+from common import make_library, temp_db_path
+
+LEGACY_SQL = '''
+    SELECT b.*, ci.image as cover_image, g.name as genre_name
+    FROM books b
+    LEFT JOIN covers c ON c.book_id = b.id
+    LEFT JOIN cover_images ci ON ci.hash = c.hash
+    LEFT JOIN genres g ON b.genre_id = g.id
+    ORDER BY b.created_at DESC
+'''
+
+
+def peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса в мегабайтах (Linux: ru_maxrss в КБ)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(mode: str, db_path: str):
+    from database import Database
+
+    db = Database(db_path)
+    if mode == 'legacy':
+        conn = db.connect()
+        books = [dict(row) for row in conn.execute(LEGACY_SQL)]
+        export = [dict(row) for row in conn.execute(LEGACY_SQL)]
+    else:
+        books = db.get_all_books()
+        export = db.export_to_csv(os.devnull)
+    print(f"{peak_rss_mb():.1f} {len(books)} {bool(export)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=20_000)
+    parser.add_argument('--cover-kb', type=int, default=40)
+    parser.add_argument('--worker', nargs=2, metavar=('MODE', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    db_path = temp_db_path()
+    make_library(db_path, args.books, cover=os.urandom(args.cover_kb * 1024)).close()
+
+    print(f"Библиотека: {args.books} книг, обложки по {args.cover_kb} КБ")
+    for mode, title in (('legacy', 'до: обложки в строках списка'), ('current', 'после: без обложек')):
+        output = subprocess.run(
+            [sys.executable, __file__, '--worker', mode, db_path],
+            check=True, capture_output=True, text=True
+        ).stdout.split()
+        print(f"{title:<32} пиковый RSS {float(output[0]):>8.1f} МБ")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
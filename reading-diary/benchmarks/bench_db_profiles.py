@@ -0,0 +1,113 @@
+"""Профили соединений SQLite: скорость записи и задержки при одновременном чтении
+
+Для каждого профиля из DATABASE_PROFILES, допускающего запись, замеряются:
+- добавление книги, каждая в своей транзакции (как AddBookDialog.save_book);
+- задержка добавления книги, пока другой поток непрерывно пересчитывает
+  статистику полным проходом по таблице (долгое чтение);
+- задержка чтения карточки книги, пока другой поток непрерывно пишет.
+Профиль только для чтения сравнивается с обычным на скорости чтения
+закрытой базы.
+
+Запуск: python benchmarks/bench_db_profiles.py [--books 200000]
+"""
+import argparse
+import random
+import shutil
+import statistics
+import threading
+import time
+
+from common import make_library, measure, random_book, temp_db_path
+
+from database import DATABASE_PROFILES, Database
+
+
+def timed_calls(func, count: int):
+    """Вызывает func count раз и возвращает задержки в миллисекундах"""
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def under_load(db, background, func, count: int):
+    """Задержки func, пока в другом потоке без остановки выполняется background"""
+    stop = threading.Event()
+    running = threading.Event()
+
+    def load():
+        try:
+            running.set()
+            while not stop.is_set():
+                background()
+        finally:
+            db.release_thread_connection()
+
+    thread = threading.Thread(target=load)
+    thread.start()
+    running.wait()
+    try:
+        return timed_calls(func, count)
+    finally:
+        stop.set()
+        thread.join()
+
+
+def percentile(values, fraction: float) -> float:
+    """Значение, не превышаемое долей fraction замеров"""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=200_000)
+    parser.add_argument('--writes', type=int, default=300)
+    parser.add_argument('--reads', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    print(f"Библиотека: {args.books} книг")
+    print(f"{'профиль':<12}{'запись, мкс':>13}{'запись при чтении, мс':>24}{'чтение при записи, мс':>24}")
+    print(f"{'':<12}{'':>13}{'медиана':>12}{'макс.':>12}{'медиана':>12}{'p99':>12}")
+
+    paths = {}
+    for name, settings in DATABASE_PROFILES.items():
+        if settings.read_only:
+            continue
+        db = make_library(temp_db_path(), args.books, settings=settings)
+        paths[name] = db.db_path
+        genres = [genre['name'] for genre in db.get_all_genres()]
+
+        def add_book():
+            db.add_book(random_book(rng, genres))
+
+        def get_book():
+            db.get_book(rng.randint(1, args.books))
+
+        write_us = measure(add_book, args.writes)
+        writes = under_load(db, db.compute_statistics, add_book, args.writes // 10)
+        reads = under_load(db, add_book, get_book, args.reads)
+        db.close()
+
+        print(f"{name:<12}{write_us:>13.0f}{statistics.median(writes):>12.2f}{max(writes):>12.1f}"
+              f"{statistics.median(reads):>12.3f}{percentile(reads, 0.99):>12.3f}")
+
+    # Чтение закрытой базы: обычное открытие и неизменяемый файл только для чтения
+    print()
+    print(f"{'профиль':<12}{'карточка, мкс':>15}{'статистика, мс':>16}")
+    viewer_path = temp_db_path()
+    shutil.copy(paths['default'], viewer_path)
+    for name in ('default', 'viewer'):
+        db = Database(viewer_path, DATABASE_PROFILES[name])
+        db.init_db()
+        book_us = measure(lambda: db.get_book(rng.randint(1, args.books)), args.reads)
+        stats_ms = measure(db.compute_statistics, 5) / 1000
+        db.close()
+        print(f"{name:<12}{book_us:>15.1f}{stats_ms:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""Пиковый RSS экспорта в CSV в зависимости от размера библиотеки
+
+Для каждого размера экспорт запускается в отдельном процессе: «до» собирает
+все строки через fetchall и только потом пишет файл, «после» — потоковый
+Database.export_to_csv. Потоковому экспорту нужна постоянная память.
+
+Запуск: python benchmarks/bench_export_memory.py [--sizes 1000 10000 100000 1000000]
+"""
+import argparse
+import csv
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from common import make_library, temp_db_path
+
+LEGACY_SQL = '''
+    SELECT b.id, b.title, b.author, g.name as genre_name, b.status,
+           b.start_date, b.finish_date, b.rating, b.pages, b.review
+    FROM books b
+    LEFT JOIN genres g ON b.genre_id = g.id
+    ORDER BY b.created_at DESC
+'''
+
+
+def peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса в мегабайтах (Linux: ru_maxrss в КБ)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def legacy_export(db, file_path: str):
+    """Прежний экспорт: все строки в памяти, затем запись"""
+    books = db.connect().execute(LEGACY_SQL).fetchall()
+    with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        for book in books:
+            writer.writerow([book['id'], book['title'], book['author'], book['genre_name'] or '',
+                             book['status'], book['start_date'], book['finish_date'],
+                             book['rating'] or '', book['pages'] or 0, book['review'] or ''])
+
+
+def run_worker(mode: str, db_path: str):
+    from database import Database
+
+    db = Database(db_path)
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    output = temp_db_path('export.csv.gz' if mode == 'gzip' else 'export.csv')
+    if mode == 'legacy':
+        legacy_export(db, output)
+    else:
+        db.export_to_csv(output)
+    elapsed = time.perf_counter() - started
+    print(f"{peak_rss_mb() - baseline:.1f} {elapsed:.2f} {os.path.getsize(output) / 1024 / 1024:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10_000, 100_000])
+    parser.add_argument('--worker', nargs=2, metavar=('MODE', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    modes = (('legacy', 'до: fetchall'), ('stream', 'после: поток'), ('gzip', 'после: поток + gzip'))
+    print(f"{'книг':>9}  {'вариант':<22}{'прирост RSS, МБ':>17}{'время, с':>10}{'файл, МБ':>10}")
+    for size in args.sizes:
+        db_path = temp_db_path()
+        make_library(db_path, size).close()
+        for mode, title in modes:
+            result = subprocess.run(
+                [sys.executable, __file__, '--worker', mode, db_path],
+                capture_output=True, text=True, check=True
+            )
+            rss, elapsed, file_mb = result.stdout.split()
+            print(f"{size:>9}  {title:<22}{float(rss):>17.1f}{float(elapsed):>10.2f}{float(file_mb):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
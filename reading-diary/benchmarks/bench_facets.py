@@ -0,0 +1,84 @@
+"""Счетчики фасетных фильтров: битовые карты FacetIndex против COUNT ... GROUP BY
+
+Замеряется построение карт и их объем, пересчет всех счетчиков при смене
+фильтров (битовые карты и запросы GROUP BY по каждому фильтру с условиями
+остальных), применение одного изменения книги и первая страница списка
+с фильтрами.
+
+Запуск: python benchmarks/bench_facets.py [--books 500000]
+"""
+import argparse
+import sys
+import time
+
+from common import make_library, measure, temp_db_path
+
+from facets import _VALUE_SQL, FacetIndex
+
+SCENARIOS = [
+    ("без фильтров", {}),
+    ("статус", {'status': {'Прочитано'}}),
+    ("жанр + оценка", {'genre': {3}, 'rating': {5}}),
+    ("год + объем", {'year': {'2020', '2021'}, 'pages': {1, 2}}),
+    ("все фильтры", {'status': {'Прочитано', 'Читаю'}, 'genre': {1, 2, None},
+                     'rating': {4, 5}, 'pages': {2}, 'year': {'2019'}}),
+]
+
+
+def sql_counts(db, filters):
+    """Счетчики тех же значений запросами: по одному GROUP BY на фильтр"""
+    conn = db.connect()
+    counts = {}
+    for facet, value_sql in _VALUE_SQL.items():
+        others = {other: values for other, values in filters.items() if other != facet}
+        conditions, params = db._filter_conditions(conn, others)
+        where = ' AND '.join(conditions) or '1'
+        counts[facet] = conn.execute(
+            f"SELECT {value_sql}, COUNT(*) FROM books b WHERE {where} GROUP BY 1", params
+        ).fetchall()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=500_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db = make_library(temp_db_path(), args.books)
+    index = FacetIndex(db)
+    started = time.perf_counter()
+    index.load()
+    load_ms = (time.perf_counter() - started) * 1000
+    bitmap_count = sum(len(bitmaps) for bitmaps in index.bitmaps.values())
+    size = sum(sys.getsizeof(bits) for bitmaps in index.bitmaps.values() for bits in bitmaps.values())
+
+    print(f"Библиотека: {args.books} книг, время в мс")
+    print(f"Построение карт: {load_ms:.0f} мс, {bitmap_count} карт, {size / 1024 / 1024:.1f} МБ\n")
+
+    print(f"{'фильтры':<16}{'карты':>9}{'GROUP BY':>11}{'страница':>11}")
+    for name, filters in SCENARIOS:
+        bitmap_ms = measure(lambda: index.counts(filters), args.repeat) / 1000
+        sql_ms = measure(lambda: sql_counts(db, filters), args.repeat) / 1000
+        page_ms = measure(lambda: db.get_books_page(filters=filters), args.repeat) / 1000
+        print(f"{name:<16}{bitmap_ms:>9.1f}{sql_ms:>11.1f}{page_ms:>11.1f}")
+
+    # Чередование двух запросов, чтобы карта поиска каждый раз строилась заново
+    words = iter(['мир', 'война'] * args.repeat)
+    search_ms = measure(lambda: index.counts({}, next(words)), args.repeat) / 1000
+    print(f"\nсчетчики с новым текстом поиска: {search_ms:.1f} мс")
+
+    book = db.get_book(args.books // 2)
+
+    def edit():
+        book['rating'] = 5 if book['rating'] != 5 else 4
+        db.update_book(book['id'], book)
+        index.refresh()
+
+    print(f"изменение книги + refresh:       {measure(edit, args.repeat) / 1000:.1f} мс")
+    index.close()
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
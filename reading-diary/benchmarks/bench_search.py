@@ -0,0 +1,50 @@
+"""Задержка поиска: прежний LIKE '%...%' против FTS5 в Database.get_all_books
+
+Запуск: python benchmarks/bench_search.py [--books 500000]
+"""
+import argparse
+
+from common import make_library, measure, temp_db_path
+
+QUERIES = ['Достоевский', 'дост', 'мастер маргарита', 'Карожиов', 'карож', 'фантастика', 'solaris']
+
+LIKE_SQL = '''
+    SELECT b.*, g.name as genre_name
+    FROM books b
+    LEFT JOIN genres g ON b.genre_id = g.id
+    WHERE b.title LIKE ? OR b.author LIKE ?
+    ORDER BY b.created_at DESC
+'''
+
+# Только поиск и ранжирование, без чтения строк books: первая страница результатов
+TOP_SQL = "SELECT rowid FROM books_fts WHERE books_fts MATCH ? ORDER BY rank LIMIT 100"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=500_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    db = make_library(temp_db_path(), args.books)
+    conn = db.connect()
+
+    def like_search(text):
+        pattern = f"%{text}%"
+        return [dict(row) for row in conn.execute(LIKE_SQL, (pattern, pattern))]
+
+    print(f"Библиотека: {args.books} книг")
+    print(f"{'запрос':<20}{'найдено':>10}{'LIKE, мс':>12}{'FTS5, мс':>12}{'FTS5 топ-100, мс':>18}")
+    for query in QUERIES:
+        found = len(db.get_all_books(query))
+        like_ms = measure(lambda: like_search(query), max(1, args.repeat // 10)) / 1000
+        fts_ms = measure(lambda: db.get_all_books(query), args.repeat) / 1000
+        match_query = db._fts_query(query)
+        top_ms = measure(lambda: conn.execute(TOP_SQL, (match_query,)).fetchall(), args.repeat) / 1000
+        print(f"{query:<20}{found:>10}{like_ms:>12.2f}{fts_ms:>12.2f}{top_ms:>18.2f}")
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
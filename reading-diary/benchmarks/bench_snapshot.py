@@ -0,0 +1,134 @@
+"""Снимок библиотеки по колонкам против списка словарей
+
+Замеряется память и время построения LibrarySnapshot и списка словарей
+get_all_books, затем фильтры и статистика: векторными масками по
+массивам снимка и циклом Python по словарям. Результаты обоих путей
+сверяются.
+
+Запуск: python benchmarks/bench_snapshot.py [--books 500000]
+"""
+import argparse
+import time
+import tracemalloc
+from collections import Counter
+
+from common import make_library, measure, temp_db_path
+
+from database import PAGE_RANGES
+from snapshot import LibrarySnapshot
+
+SCENARIOS = [
+    ("статус", {'status': {'Прочитано'}}),
+    ("жанр + оценка", {'genre': {3}, 'rating': {5}}),
+    ("год + объем", {'year': {'2020', '2021'}, 'pages': {1, 2}}),
+    ("без оценки", {'rating': {None}}),
+]
+
+
+def timed(func):
+    """Результат вызова и время в мс"""
+    started = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def retained_mb(func):
+    """Результат вызова и память, выделенная им и не освобожденная, в МБ
+
+    tracemalloc учитывает и массивы NumPy; освобождение памяти, выделенной
+    до начала замера, не вычитается.
+    """
+    tracemalloc.start()
+    result = func()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size / 1024 / 1024
+
+
+def book_value(book, facet):
+    """Значение фильтра у книги-словаря, как в FacetIndex"""
+    if facet == 'genre':
+        return book['genre_id']
+    if facet == 'year':
+        return book['finish_date'][:4] if book['finish_date'] else None
+    if facet == 'pages':
+        pages = book['pages'] or 0
+        for number, (low, high) in enumerate(PAGE_RANGES):
+            if pages >= low and (high is None or pages < high):
+                return number
+        return None
+    return book[facet]
+
+
+def dict_count(books, filters):
+    return sum(all(book_value(book, facet) in values for facet, values in filters.items())
+               for book in books)
+
+
+def dict_statistics(books):
+    """Основные показатели get_statistics циклом по словарям"""
+    statuses = Counter(book['status'] for book in books)
+    ratings = [book['rating'] for book in books if book['rating'] is not None]
+    return {
+        'total': len(books),
+        'read_count': statuses['Прочитано'],
+        'reading_count': statuses['Читаю'],
+        'wishlist_count': statuses['Хочу прочитать'],
+        'avg_rating': round(sum(ratings) / len(ratings), 2) if ratings else 0,
+        'total_pages': sum(book['pages'] for book in books if book['pages'] and book['pages'] > 0),
+        'genres': Counter(book['genre_name'] for book in books if book['genre_name']),
+        'ratings': Counter(ratings),
+        'months': Counter(book['finish_date'][:7] for book in books if book['finish_date']),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=500_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db = make_library(temp_db_path(), args.books)
+    _, dict_ms = timed(db.get_all_books)
+    books, dict_mb = retained_mb(db.get_all_books)
+    snapshot = LibrarySnapshot(db)
+    _, snapshot_ms = timed(snapshot.load)
+    # Повторная загрузка заменяет массивы: учитываются только новые
+    _, snapshot_mb = retained_mb(snapshot.load)
+
+    print(f"Библиотека: {args.books} книг, время в мс")
+    print(f"{'':<16}{'построение':>12}{'память, МБ':>12}{'байт на книгу':>15}")
+    for name, elapsed, size in [("словари", dict_ms, dict_mb), ("снимок", snapshot_ms, snapshot_mb)]:
+        print(f"{name:<16}{elapsed:>12.0f}{size:>12.1f}{size * 1024 * 1024 / len(books):>15.0f}")
+
+    print(f"\n{'фильтры':<16}{'словари':>12}{'снимок':>12}")
+    for name, filters in SCENARIOS:
+        expected = dict_count(books, filters)
+        if snapshot.count(filters) != expected:
+            raise SystemExit(f"Расхождение в фильтре «{name}»: {snapshot.count(filters)} != {expected}")
+        loop_ms = measure(lambda: dict_count(books, filters), args.repeat) / 1000
+        vector_ms = measure(lambda: snapshot.count(filters), args.repeat) / 1000
+        print(f"{name:<16}{loop_ms:>12.1f}{vector_ms:>12.1f}")
+
+    expected = dict_statistics(books)
+    stats = snapshot.statistics()
+    if any(stats[key] != expected[key] for key in ('total', 'read_count', 'avg_rating', 'total_pages')):
+        raise SystemExit("Расхождение в статистике")
+    loop_ms = measure(lambda: dict_statistics(books), args.repeat) / 1000
+    vector_ms = measure(snapshot.statistics, args.repeat) / 1000
+    print(f"{'статистика':<16}{loop_ms:>12.1f}{vector_ms:>12.1f}")
+
+    book = db.get_book(args.books // 2)
+
+    def edit():
+        book['rating'] = 5 if book['rating'] != 5 else 4
+        db.update_book(book['id'], book)
+        snapshot.refresh()
+
+    print(f"\nизменение книги + refresh: {measure(edit, args.repeat) / 1000:.1f} мс")
+    snapshot.close()
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
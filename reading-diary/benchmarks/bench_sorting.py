@@ -0,0 +1,81 @@
+"""Сортировка списка по щелчку на заголовке: в памяти против ORDER BY в базе
+
+Прежний способ — загрузить все строки в модель и отсортировать их
+QSortFilterProxyModel по тексту ячеек (так «Страниц» сравнивались как
+строки). Теперь щелчок перезапрашивает первую страницу у базы с нужным
+ORDER BY; замеряются первая страница и страница в глубине списка для
+сортировки по одной и нескольким колонкам, с поиском и без.
+
+Запуск: python benchmarks/bench_sorting.py [--books 200000]
+(без дисплея: QT_QPA_PLATFORM=offscreen)
+"""
+import argparse
+import sys
+import time
+
+from common import make_library, measure, temp_db_path
+
+from PyQt6.QtCore import QModelIndex, QSortFilterProxyModel, Qt
+from PyQt6.QtWidgets import QApplication
+
+from books_model import COLUMNS, BooksTableModel
+
+PAGE_SIZE = BooksTableModel.BATCH_SIZE
+
+SORTS = [
+    ("Страниц", [('pages', False)]),
+    ("Оценка ↓", [('rating', True)]),
+    ("Конец ↓", [('finish_date', True)]),
+    ("Жанр", [('genre_name', False)]),
+    ("Статус, Название ↓", [('status', False), ('title', True)]),
+    ("Оценка ↓, Страниц, Жанр", [('rating', True), ('pages', False), ('genre_name', False)]),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--search', default='мир')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    db = make_library(temp_db_path(), args.books)
+
+    # Прежний способ: все строки в модели, сортировка прокси по тексту
+    model = BooksTableModel()
+    started = time.perf_counter()
+    model.reset_source(lambda limit, cursor: db.get_books_page(after=cursor, limit=limit))
+    while model.canFetchMore(QModelIndex()):
+        model.fetchMore(QModelIndex())
+    load_ms = (time.perf_counter() - started) * 1000
+    proxy = QSortFilterProxyModel()
+    proxy.setSourceModel(model)
+    pages_column = [key for key, _ in COLUMNS].index('pages')
+    started = time.perf_counter()
+    proxy.sort(pages_column, Qt.SortOrder.AscendingOrder)
+    proxy_ms = (time.perf_counter() - started) * 1000
+
+    print(f"Библиотека: {args.books} книг, страница {PAGE_SIZE} строк, время в мс")
+    print(f"в памяти: загрузка всех строк {load_ms:.0f}, сортировка «Страниц» как текста {proxy_ms:.0f}")
+    print()
+    print(f"{'сортировка':<28}{'1-я стр.':>10}{'стр. 100':>10}{f'поиск «{args.search}»':>16}")
+    for title, sort in SORTS:
+        first_ms = measure(lambda: db.get_books_page('', sort, limit=PAGE_SIZE), args.repeat) / 1000
+
+        # Курсор в глубине списка: последняя книга сотой страницы
+        cursor = None
+        for _ in range(100):
+            cursor = db.get_books_page('', sort, cursor, PAGE_SIZE)[1]
+        deep_ms = measure(lambda: db.get_books_page('', sort, cursor, PAGE_SIZE), args.repeat) / 1000
+
+        search_ms = measure(lambda: db.get_books_page(args.search, sort, limit=PAGE_SIZE), args.repeat) / 1000
+        print(f"{title:<28}{first_ms:>10.1f}{deep_ms:>10.1f}{search_ms:>16.1f}")
+
+    print(f"\nНайдено по «{args.search}»: {db.count_books(args.search)}")
+    db.close()
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""Стоимость открытия статистики: пересчет по books против материализованных агрегатов
+
+Также измеряется цена триггеров при изменении книг и проверяется, что после
+серии случайных изменений агрегаты совпадают с пересчетом (check_statistics).
+
+Запуск: python benchmarks/bench_statistics.py [--books 100000]
+"""
+import argparse
+import random
+import sys
+
+from common import STATUSES, make_library, measure, random_book, temp_db_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--changes', type=int, default=500)
+    args = parser.parse_args()
+
+    db = make_library(temp_db_path(), args.books)
+
+    compute_ms = measure(db.compute_statistics, max(1, args.repeat // 4)) / 1000
+    stored_ms = measure(db.get_statistics, args.repeat) / 1000
+
+    # Случайные добавления, изменения и удаления через триггеры
+    rng = random.Random(7)
+    genres = [genre['name'] for genre in db.get_all_genres()]
+    ids = [book['id'] for book in db.get_all_books('', args.changes * 2, 0)]
+
+    def change():
+        action = rng.random()
+        if action < 0.4:
+            ids.append(db.add_book(random_book(rng, genres)))
+        elif action < 0.8:
+            book = dict(db.get_book(rng.choice(ids)))
+            book['genre'] = book['genre_name']
+            book['status'] = rng.choice(STATUSES)
+            book['rating'] = rng.choice([None, 1, 2, 3, 4, 5])
+            book['finish_date'] = rng.choice([None, '2023-05-17', '2024-11-02'])
+            db.update_book(book['id'], book)
+        else:
+            db.delete_book(ids.pop(rng.randrange(len(ids))))
+
+    change_ms = measure(change, args.changes) / 1000
+    differences = db.check_statistics()
+
+    print(f"Библиотека: {args.books} книг")
+    print(f"compute_statistics (пересчет):   {compute_ms:>9.2f} мс")
+    print(f"get_statistics (агрегаты):       {stored_ms:>9.2f} мс")
+    print(f"изменение книги с триггерами:    {change_ms:>9.2f} мс")
+    db.close()
+
+    if differences:
+        print("Расхождения агрегатов:")
+        for key, (stored, fresh) in differences.items():
+            print(f"  {key}: сохранено {stored}, пересчет {fresh}")
+        sys.exit(1)
+    print(f"После {args.changes} изменений агрегаты совпадают с пересчетом")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
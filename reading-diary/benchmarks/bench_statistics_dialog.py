@@ -0,0 +1,97 @@
+"""Время открытия диалога статистики с графиками за 10 лет помесячно
+
+Сравниваются: новый диалог при каждом открытии (как было раньше),
+повторное открытие без изменений данных (графики берутся из кэша по версии
+статистики) и повторное открытие после изменения одной книги (графики
+обновляются на месте). Время включает показ окна, фоновую загрузку всех
+разделов и отрисовку графиков; для нового диалога отдельно показано время
+до появления окна с заглушками.
+
+Запуск: python benchmarks/bench_statistics_dialog.py [--books 20000]
+(без дисплея: QT_QPA_PLATFORM=offscreen)
+"""
+import argparse
+import random
+import sys
+import time
+
+from common import make_library, temp_db_path
+
+from PyQt6.QtCore import QThreadPool
+from PyQt6.QtWidgets import QApplication
+
+from statistics_dialog import StatisticsDialog
+
+
+def wait_loaded(app, dialog):
+    """Дожидается фоновой загрузки статистики и отрисовки всех разделов"""
+    while dialog.statistics_task is not None:
+        QThreadPool.globalInstance().waitForDone()
+        app.processEvents()
+    app.processEvents()
+
+
+def open_dialog(app, dialog) -> float:
+    """Показывает диалог до отрисовки графиков и закрывает, возвращает мс"""
+    started = time.perf_counter()
+    dialog.load_statistics()
+    dialog.show()
+    wait_loaded(app, dialog)
+    elapsed = (time.perf_counter() - started) * 1000
+    dialog.hide()
+    app.processEvents()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=20_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    db = make_library(temp_db_path(), args.books)
+    months = len(db.get_statistics()['monthly_stats'])
+
+    def fresh_dialog():
+        """Возвращает (мс до появления окна с заглушками, мс до загрузки всех разделов)"""
+        started = time.perf_counter()
+        dialog = StatisticsDialog(db)
+        dialog.show()
+        app.processEvents()
+        shown = (time.perf_counter() - started) * 1000
+        wait_loaded(app, dialog)
+        loaded = (time.perf_counter() - started) * 1000
+        dialog.close()
+        dialog.deleteLater()
+        app.processEvents()
+        return shown, loaded
+
+    # Первое создание прогревает шрифты и кэши графиков
+    fresh_dialog()
+    fresh = [fresh_dialog() for _ in range(args.repeat)]
+    shown_ms = sum(shown for shown, _ in fresh) / args.repeat
+    fresh_ms = sum(loaded for _, loaded in fresh) / args.repeat
+
+    dialog = StatisticsDialog(db)
+    open_dialog(app, dialog)
+    cached_ms = sum(open_dialog(app, dialog) for _ in range(args.repeat)) / args.repeat
+
+    rng = random.Random(3)
+    book_ids = [book['id'] for book in db.get_all_books('', 1000, 0)]
+    changed_ms = 0.0
+    for _ in range(args.repeat):
+        db.update_books([(rng.choice(book_ids), {'rating': rng.randint(1, 5)})])
+        changed_ms += open_dialog(app, dialog)
+    changed_ms /= args.repeat
+
+    print(f"Библиотека: {args.books} книг, месяцев на графике: {months}")
+    print(f"новый диалог, окно с заглушками:  {shown_ms:>9.1f} мс")
+    print(f"новый диалог при каждом открытии: {fresh_ms:>9.1f} мс")
+    print(f"повторно, данные не менялись:     {cached_ms:>9.1f} мс")
+    print(f"повторно, изменена одна книга:    {changed_ms:>9.1f} мс")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
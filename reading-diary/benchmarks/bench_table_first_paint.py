@@ -0,0 +1,90 @@
+"""Время до первой отрисовки таблицы книг: QTableWidget против модели с подгрузкой
+
+Запуск: python benchmarks/bench_table_first_paint.py [--books 100000]
+(без дисплея: QT_QPA_PLATFORM=offscreen)
+"""
+import argparse
+import sys
+import time
+
+from common import make_library, temp_db_path
+
+from PyQt6.QtCore import QEvent, QObject, Qt
+from PyQt6.QtWidgets import QApplication, QTableView, QTableWidget, QTableWidgetItem
+
+from books_model import COLUMNS, STATUS_COLORS, BooksTableModel
+
+
+class PaintWatcher(QObject):
+    """Отмечает момент первой отрисовки области таблицы"""
+
+    def __init__(self):
+        super().__init__()
+        self.painted_at = None
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and self.painted_at is None:
+            self.painted_at = time.perf_counter()
+        return False
+
+
+def fill_table_widget(table: QTableWidget, books):
+    """Прежнее заполнение: по QTableWidgetItem на каждую ячейку"""
+    table.setRowCount(len(books))
+    for row, book in enumerate(books):
+        for column, (key, _) in enumerate(COLUMNS):
+            value = book[key]
+            if key == 'rating':
+                item = QTableWidgetItem("★" * value if value else '')
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            else:
+                item = QTableWidgetItem('' if value is None else str(value))
+            if key == 'status' and value in STATUS_COLORS:
+                item.setBackground(STATUS_COLORS[value])
+            table.setItem(row, column, item)
+
+
+def time_to_first_paint(app, view, load) -> float:
+    watcher = PaintWatcher()
+    view.viewport().installEventFilter(watcher)
+    view.resize(1000, 600)
+    view.show()
+    app.processEvents()
+    watcher.painted_at = None
+
+    started = time.perf_counter()
+    load()
+    view.viewport().update()
+    while watcher.painted_at is None:
+        app.processEvents()
+    view.close()
+    return (watcher.painted_at - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=100_000)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    db = make_library(temp_db_path(), args.books)
+
+    table = QTableWidget()
+    table.setColumnCount(len(COLUMNS))
+    widget_ms = time_to_first_paint(app, table, lambda: fill_table_widget(table, db.get_all_books()))
+
+    model = BooksTableModel()
+    view = QTableView()
+    view.setModel(model)
+    model_ms = time_to_first_paint(
+        app, view, lambda: model.reset_source(lambda limit, cursor: db.get_books_page(after=cursor, limit=limit))
+    )
+
+    print(f"Библиотека: {args.books} книг")
+    print(f"QTableWidget, все строки:       {widget_ms:>9.1f} мс")
+    print(f"BooksTableModel, первая порция: {model_ms:>9.1f} мс")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""Проверяет через EXPLAIN QUERY PLAN, что запросы Database идут по индексам
+
+Каждый метод чтения вызывается с трассировкой SQL; для каждого выполненного
+SELECT строится план, и полный просмотр таблиц books или reading_sessions
+либо временное B-дерево для сортировки строк считаются ошибкой. Сортировка
+уже сгруппированного результата (десятки строк) и найденных полнотекстовым
+поиском книг допускается, как и просмотр books в порядке id с LIMIT: он
+читает не больше LIMIT строк. При сортировке списка по нескольким колонкам
+младшие ключи сортируются внутри группы книг с одинаковым старшим ключом,
+а страница с фасетными фильтрами либо идет по индексу сортировки, либо
+сортирует книги, найденные по индексу самого избирательного фильтра,
+поэтому для таких запросов проверяется только отсутствие полного просмотра.
+
+Запуск: python benchmarks/check_query_plans.py [--books 5000]
+"""
+import argparse
+import re
+import sys
+from datetime import date, datetime, timedelta
+
+from common import make_library, temp_db_path
+
+from database import SORT_COLUMNS
+from facets import facet_index
+
+# Полный просмотр books без индекса (алиас b или имя таблицы)
+FULL_SCAN = re.compile(r'^SCAN (b|books|reading_sessions)$')
+TEMP_SORT = re.compile(r'USE TEMP B-TREE FOR (ORDER|GROUP) BY')
+# Страница списка, отсортированного по id: просмотр таблицы по порядку до LIMIT
+ROWID_PAGE = re.compile(r'WHERE (1|b\.id [<>] \d+) ORDER BY b\.id (ASC|DESC) LIMIT \d+$')
+
+
+def page_calls(db):
+    """Постраничная выборка по каждой колонке сортировки: первая страница и страница после курсора"""
+    def first_and_next(search_text, sort):
+        return lambda: db.get_books_page(search_text, sort, db.get_books_page(search_text, sort, limit=100)[1])
+
+    calls = {}
+    for column in SORT_COLUMNS:
+        for descending in (False, True):
+            sort = [(column, descending)]
+            name = f"get_books_page({column}{' desc' if descending else ''})"
+            calls[name] = first_and_next('', sort)
+            if SORT_COLUMNS[column][1] is None:
+                continue
+            # Курсор на книге без значения
+            calls[name + ' null'] = lambda sort=sort: db.get_books_page(sort=sort, after=(None, 100))
+    calls['get_books_page(search)'] = first_and_next('мир', [])
+    calls['get_books_page(search, pages)'] = first_and_next('мир', [('pages', False)])
+    return calls
+
+
+def multi_key_page_calls(db):
+    """Постраничная выборка с сортировкой по нескольким колонкам"""
+    calls = {}
+    for sort in ([('status', False), ('title', True)],
+                 [('rating', True), ('pages', False), ('genre_name', False)],
+                 [('genre_name', False), ('finish_date', True)]):
+        name = f"get_books_page({', '.join(column + (' desc' if descending else '') for column, descending in sort)})"
+        calls[name] = lambda sort=sort: db.get_books_page(sort=sort, after=db.get_books_page(sort=sort, limit=100)[1])
+    calls['get_books_page(search, status, pages)'] = lambda: db.get_books_page(
+        'мир', [('status', False), ('pages', True)]
+    )
+    return calls
+
+
+def filter_page_calls(db):
+    """Постраничная выборка с фасетными фильтрами: по индексу сортировки и по индексу фильтра"""
+    calls = {}
+    for filters in ({'status': {'Прочитано'}},
+                    {'genre': {3}, 'rating': {5}},
+                    {'year': {'2020'}, 'pages': {None, 4}},
+                    {'rating': {None, 1}, 'pages': {1, 2}}):
+        name = ', '.join(sorted(filters))
+        for sort in ([], [('title', False)]):
+            calls[f"get_books_page({name}{', title' if sort else ''})"] = (
+                lambda filters=filters, sort=sort: db.get_books_page(
+                    '', sort, db.get_books_page('', sort, limit=100, filters=filters)[1], filters=filters
+                )
+            )
+        calls[f"get_books_page(search, {name})"] = lambda filters=filters: db.get_books_page(
+            'мир', filters=filters
+        )
+    return calls
+
+
+def facet_calls(db):
+    """Подсчет книг с фильтрами и построение битовых карт фильтров"""
+    filters = {'status': {'Прочитано', 'Читаю'}, 'genre': {1, None}, 'pages': {3}}
+    index = facet_index(db)
+    return {
+        'count_books(filters)': lambda: db.count_books('', filters),
+        'count_books(search, filters)': lambda: db.count_books('мир', filters),
+        'get_book_row(filters)': lambda: db.get_book_row(1, 'мир', filters),
+        'find_book_ids': lambda: db.find_book_ids('мир'),
+        'FacetIndex.load': index.load,
+        'FacetIndex.update': lambda: index.update(range(1, 200)),
+    }
+
+
+def database_calls(db):
+    """Вызовы Database, запросы которых проверяются"""
+    return {
+        'get_book': lambda: db.get_book(1),
+        'get_all_books': lambda: db.get_all_books(),
+        'get_all_books(search)': lambda: db.get_all_books('мир'),
+        'get_all_genres': db.get_all_genres,
+        'get_statistics': db.get_statistics,
+        'get_reading_sessions(book)': lambda: db.get_reading_sessions(book_id=1),
+        'get_reading_sessions(period)': lambda: db.get_reading_sessions(
+            start=datetime.now() - timedelta(days=7), end=datetime.now()
+        ),
+        'get_daily_reading': lambda: db.get_daily_reading(date.today() - timedelta(days=30), date.today()),
+        'get_reading_streak': db.get_reading_streak,
+        'get_book_progress': lambda: db.get_book_progress(1),
+        'count_books': db.count_books,
+        **page_calls(db),
+        **facet_calls(db),
+    }
+
+
+def collect_statements(db, call):
+    """Возвращает SELECT-запросы, выполненные при вызове"""
+    statements = []
+    conn = db.connect()
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+
+
+def plan_problems(conn, sql, sorted_groups=False):
+    """Возвращает строки плана, нарушающие правила, и весь план"""
+    plan = [row['detail'] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    small = sorted_groups or 'GROUP BY' in sql.upper() or 'MATCH' in sql.upper()
+    rowid_page = ROWID_PAGE.search(' '.join(sql.split()))
+    problems = [
+        detail for detail in plan
+        if (FULL_SCAN.match(detail) and not rowid_page) or (TEMP_SORT.search(detail) and not small)
+    ]
+    return problems, plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=5000)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    db = make_library(temp_db_path(), args.books)
+    conn = db.connect()
+    failed = False
+
+    calls = [(name, call, False) for name, call in database_calls(db).items()]
+    calls += [(name, call, True) for name, call in multi_key_page_calls(db).items()]
+    calls += [(name, call, True) for name, call in filter_page_calls(db).items()]
+    for name, call, sorted_groups in calls:
+        for sql in collect_statements(db, call):
+            problems, plan = plan_problems(conn, sql, sorted_groups)
+            query = ' '.join(sql.split())
+            if problems:
+                failed = True
+                print(f"FAIL {name}: {query}")
+                for detail in plan:
+                    print(f"     {detail}")
+            elif args.verbose:
+                print(f"ok   {name}: {query}")
+                for detail in plan:
+                    print(f"     {detail}")
+
+    db.close()
+    if failed:
+        sys.exit(1)
+    print("Все запросы используют индексы")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
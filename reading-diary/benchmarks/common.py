@@ -0,0 +1,103 @@
+"""Общие функции для бенчмарков читательского дневника"""
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from database import Database, DatabaseSettings  # noqa: E402
+
+STATUSES = ['Хочу прочитать', 'Читаю', 'Прочитано', 'Отложено']
+
+WORDS = [
+    'война', 'мир', 'преступление', 'наказание', 'идиот', 'бесы', 'братья',
+    'мастер', 'маргарита', 'тихий', 'дон', 'отцы', 'дети', 'мёртвые', 'души',
+    'герой', 'нашего', 'времени', 'капитанская', 'дочка', 'обломов', 'гроза',
+    'foundation', 'dune', 'solaris', 'station', 'eleven', 'road', 'night',
+]
+
+# Синтетические слова, чтобы избирательность поиска была как в живой библиотеке
+SYLLABLES = ['ка', 'ро', 'ми', 'ла', 'то', 'ве', 'ни', 'су', 'да', 'ре', 'по', 'жи']
+WORDS += [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+
+AUTHORS = [
+    'Лев Толстой', 'Фёдор Достоевский', 'Михаил Булгаков', 'Михаил Шолохов',
+    'Иван Тургенев', 'Николай Гоголь', 'Михаил Лермонтов', 'Александр Пушкин',
+    'Иван Гончаров', 'Александр Островский', 'Isaac Asimov', 'Frank Herbert',
+    'Stanisław Lem', 'Emily St. John Mandel', 'Cormac McCarthy',
+]
+
+FIRST_NAMES = ['Анна', 'Иван', 'Мария', 'Пётр', 'Ольга', 'Сергей', 'Елена', 'Дмитрий']
+
+
+def temp_db_path(name: str = 'bench.db') -> str:
+    """Возвращает путь к файлу базы во временном каталоге"""
+    return os.path.join(tempfile.mkdtemp(prefix='reading_diary_'), name)
+
+
+def random_book(rng: random.Random, genres, cover: bytes = None) -> dict:
+    """Генерирует случайную книгу в формате Database.add_book"""
+    status = rng.choice(STATUSES)
+    start = date(2014, 1, 1) + timedelta(days=rng.randrange(3650))
+    finish = start + timedelta(days=rng.randrange(1, 60)) if status == 'Прочитано' else None
+    return {
+        'title': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).capitalize(),
+        'author': rng.choice(AUTHORS) if rng.random() < 0.2 else (
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(WORDS[-len(SYLLABLES) ** 3:]).capitalize()}ов"
+        ),
+        'genre': rng.choice(genres),
+        'status': status,
+        'start_date': start.isoformat(),
+        'finish_date': finish.isoformat() if finish else None,
+        'rating': rng.choice([None, 1, 2, 3, 4, 5]),
+        'review': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 12))),
+        'cover_image': cover,
+        'pages': rng.randint(50, 1200),
+    }
+
+
+def make_library(db_path: str, count: int, seed: int = 42, cover: bytes = None,
+                 settings: DatabaseSettings = None) -> Database:
+    """Создает базу с заданным количеством случайных книг"""
+    db = Database(db_path, settings)
+    db.init_db()
+
+    genres = [genre['name'] for genre in db.get_all_genres()]
+    rng = random.Random(seed)
+
+    conn = db.connect()
+    genre_ids = {row['name']: row['id'] for row in conn.execute("SELECT id, name FROM genres")}
+    columns = ['title', 'author', 'genre_id', 'status', 'start_date', 'finish_date',
+               'rating', 'review', 'pages']
+
+    def rows():
+        for _ in range(count):
+            book = random_book(rng, genres)
+            book['genre_id'] = genre_ids[book['genre']]
+            yield tuple(book[column] for column in columns)
+
+    with conn:
+        conn.executemany(
+            f"INSERT INTO books ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            rows()
+        )
+        if cover:
+            # Одно изображение на все книги, как после дедупликации обложек
+            digest = hashlib.sha256(cover).hexdigest()
+            conn.execute("INSERT INTO cover_images (hash, image) VALUES (?, ?)", (digest, cover))
+            conn.execute("INSERT INTO covers (book_id, hash) SELECT id, ? FROM books", (digest,))
+    return db
+
+
+def measure(func, repeat: int) -> float:
+    """Возвращает среднее время одного вызова в микросекундах"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e6
\ No newline at end of file
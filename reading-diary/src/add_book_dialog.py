@@ -1,20 +1,27 @@
-import os
 from PyQt6.QtWidgets import QDialog, QMessageBox, QFileDialog, QVBoxLayout
-from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtCore import Qt, QDate, pyqtSignal
 from PyQt6.QtGui import QPixmap
-from PyQt6 import uic
+from images import submit_cover
+from pixmap_cache import cover_pixmap
+from ui_loader import load_ui
 
 
 class AddBookDialog(QDialog):
+    # Завершение фоновой подготовки обложки (передается Future)
+    cover_prepared = pyqtSignal(object)
+
     def __init__(self, db, parent=None, book_id=None):
         super().__init__(parent)
         self.db = db
         self.book_id = book_id
         self.cover_image = None
+        self.cover_thumbnails = None
+        self.cover_changed = False
+        self.cover_future = None
 
-        ui_path = os.path.join(os.path.dirname(__file__), '..', 'qt', 'add_book_dialog.ui')
-        uic.loadUi(ui_path, self)
+        load_ui('add_book_dialog', self)
 
+        # Жанры берутся из кеша справочника, без запроса к базе
         self.genres = self.db.get_all_genres()
 
         self.setup_ui()
@@ -53,6 +60,7 @@ class AddBookDialog(QDialog):
         """Настраивает сигналы и слоты"""
         self.btn_load_cover.clicked.connect(self.load_cover)
         self.btn_clear_cover.clicked.connect(self.clear_cover)
+        self.cover_prepared.connect(self.on_cover_prepared)
         self.buttonBox.accepted.connect(self.save_book)
         self.buttonBox.rejected.connect(self.reject)
 
@@ -99,39 +107,57 @@ class AddBookDialog(QDialog):
         # Отзыв
         self.text_review.setPlainText(book['review'] or "")
 
-        # Обложка
-        if book['cover_image']:
-            self.cover_image = book['cover_image']
-            self.update_cover_preview()
+        # Обложка: для превью достаточно миниатюры, оригинал не загружается
+        pixmap = cover_pixmap(self.db, self.book_id, 'small')
+        if pixmap:
+            self.lbl_cover_preview.setPixmap(pixmap)
 
     def load_cover(self):
         """Загружает обложку книги"""
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Выберите изображение", "",
-            "Images (*.png *.jpg *.jpeg *.bmp *.gif)"
+            "Images (*.png *.jpg *.jpeg *.bmp *.gif *.webp)"
         )
 
         if file_path:
-            try:
-                with open(file_path, 'rb') as f:
-                    self.cover_image = f.read()
-                self.update_cover_preview()
-            except Exception as e:
-                QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить изображение: {e}")
+            # Чтение, пережатие и миниатюры выполняются в фоне,
+            # пока пользователь заполняет остальные поля
+            self.cover_changed = True
+            self.cover_image = None
+            self.cover_thumbnails = None
+            self.cover_future = submit_cover(file_path)
+            self.cover_future.add_done_callback(self.cover_prepared.emit)
+            self.lbl_cover_preview.setText("Обработка изображения...")
+
+    def on_cover_prepared(self, future):
+        """Показывает подготовленную обложку"""
+        if future is not self.cover_future:
+            return  # Пользователь уже выбрал другой файл или очистил обложку
+
+        try:
+            self.cover_image, self.cover_thumbnails = future.result()
+        except Exception as e:
+            self.clear_cover()
+            QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить изображение: {e}")
+            return
+
+        self.update_cover_preview()
 
     def clear_cover(self):
         """Очищает обложку"""
         self.cover_image = None
+        self.cover_thumbnails = None
+        self.cover_changed = True
+        self.cover_future = None
         self.lbl_cover_preview.clear()
         self.lbl_cover_preview.setText("Обложка не загружена")
 
     def update_cover_preview(self):
         """Обновляет превью обложки"""
-        if self.cover_image:
+        if self.cover_thumbnails:
             pixmap = QPixmap()
-            pixmap.loadFromData(self.cover_image)
-            scaled_pixmap = pixmap.scaled(150, 200, Qt.AspectRatioMode.KeepAspectRatio)
-            self.lbl_cover_preview.setPixmap(scaled_pixmap)
+            pixmap.loadFromData(self.cover_thumbnails['small'])
+            self.lbl_cover_preview.setPixmap(pixmap)
 
     def validate_input(self):
         """Проверяет корректность введенных данных"""
@@ -153,19 +179,33 @@ class AddBookDialog(QDialog):
         if not self.validate_input():
             return
 
+        genre = self.combo_genre.currentText().strip()
+
         # Собираем данные
         book_data = {
             'title': self.edit_title.text().strip(),
             'author': self.edit_author.text().strip(),
-            'genre': self.combo_genre.currentText() if self.combo_genre.currentText() != "Не указан" else None,
+            # Новый жанр, введенный вручную, создается при сохранении
+            'genre': genre if genre and genre != "Не указан" else None,
             'status': self.combo_status.currentText(),
             'start_date': self.date_start.date().toString("yyyy-MM-dd"),
             'finish_date': self.date_finish.date().toString("yyyy-MM-dd"),
             'review': self.text_review.toPlainText().strip(),
-            'cover_image': self.cover_image,
             'pages': self.spin_pages.value()
         }
 
+        # Обложку передаем, только если она изменилась
+        if self.cover_changed or not self.book_id:
+            if self.cover_future is not None and self.cover_image is None:
+                # Обработка еще идет: дожидаемся ее
+                try:
+                    self.cover_image, self.cover_thumbnails = self.cover_future.result()
+                except Exception as e:
+                    QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить изображение: {e}")
+                    return
+            book_data['cover_image'] = self.cover_image
+            book_data['cover_thumbnails'] = self.cover_thumbnails
+
         # Определяем рейтинг
         book_data['rating'] = None
         for rating, button in self.rating_buttons.items():
@@ -0,0 +1,320 @@
+"""Аналитика чтения по датам начала и окончания книг
+
+Все книги загружаются одним запросом в массивы NumPy (даты — номерами
+дней от 1970-01-01). Из них поддерживаются агрегаты: книги и страницы по
+месяцам окончания, разностный массив «сколько книг читается в этот день»,
+суммы длительностей. Изменение книги вычитает ее старый вклад и добавляет
+новый, не перечитывая остальные строки.
+
+BookTracker — общая основа данных, которые поддерживаются по уведомлениям
+об изменении книг: аналитики, снимка библиотеки (snapshot.py) и индекса
+фильтров (facets.py).
+"""
+import threading
+import weakref
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Даты вне этого диапазона считаются ошибочными и не учитываются
+FIRST_YEAR = 1900
+LAST_YEAR = 2100
+DAY_BASE = (date(FIRST_YEAR, 1, 1) - date(1970, 1, 1)).days
+DAYS = (date(LAST_YEAR + 1, 1, 1) - date(FIRST_YEAR, 1, 1)).days
+MONTH_BASE = (FIRST_YEAR - 1970) * 12
+MONTHS = (LAST_YEAR - FIRST_YEAR + 1) * 12
+
+# Коды статусов в массиве status
+OTHER, READING, READ = 0, 1, 2
+
+# Больше изменений за раз — дешевле перечитать все книги
+RELOAD_THRESHOLD = 5000
+
+_ROWS_SQL = '''
+    SELECT id,
+           CASE status WHEN 'Прочитано' THEN 2 WHEN 'Читаю' THEN 1 ELSE 0 END,
+           COALESCE(CAST(julianday(start_date) - 2440587.5 AS INTEGER), -1000000),
+           COALESCE(CAST(julianday(finish_date) - 2440587.5 AS INTEGER), -1000000),
+           COALESCE(MAX(pages, 0), 0)
+    FROM books
+'''
+
+
+def reading_analytics(db) -> 'ReadingAnalytics':
+    """Общий экземпляр аналитики для базы (создается при первом обращении)"""
+    return ReadingAnalytics.shared(db)
+
+
+def _day_index(days: np.ndarray) -> np.ndarray:
+    """Номер дня от 1970-01-01 -> индекс в массивах по дням, -1 вне диапазона"""
+    index = days - DAY_BASE
+    return np.where((index >= 0) & (index < DAYS), index, -1)
+
+
+def _month_index(days: np.ndarray) -> np.ndarray:
+    """Номер дня от 1970-01-01 -> индекс месяца, -1 вне диапазона"""
+    valid = _day_index(days) >= 0
+    months = np.where(valid, days, 0).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    return np.where(valid, months - MONTH_BASE, -1)
+
+
+def _trailing_run(flags: np.ndarray) -> int:
+    """Длина серии True в конце массива"""
+    gaps = np.flatnonzero(~flags)
+    return int(len(flags) - 1 - gaps[-1]) if len(gaps) else len(flags)
+
+
+class BookTracker:
+    """Данные по всем книгам, поддерживаемые по уведомлениям об изменении книг
+
+    Экземпляр подписывается на изменения книг и при refresh применяет их
+    инкрементально (update); если изменений слишком много или база менялась
+    в обход уведомлений (например, импортом), книги перечитываются целиком
+    (load). Наследник, хранящий книги в массивах NumPy по возрастанию id,
+    перечисляет их в COLUMNS и переносит перечитанные книги через _splice.
+    """
+
+    # Массивы по книгам, упорядоченные по id, в порядке столбцов запроса
+    COLUMNS: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Общие экземпляры по базам — свои у каждого наследника
+        cls._instances = weakref.WeakKeyDictionary()
+        cls._instances_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, db):
+        """Общий экземпляр для базы (создается при первом обращении)"""
+        with cls._instances_lock:
+            instance = cls._instances.get(db)
+            if instance is None:
+                instance = cls._instances[db] = cls(db)
+            return instance
+
+    def __init__(self, db):
+        self.db = db
+        self.loaded = False
+        self._lock = threading.Lock()
+        # Книги, измененные после последнего refresh
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        db.add_listener(self._on_book_changed)
+
+    def _on_book_changed(self, change: str, book_ids: List[int]):
+        with self._pending_lock:
+            self._pending.update(book_ids)
+
+    def _take_pending(self) -> set:
+        with self._pending_lock:
+            pending, self._pending = self._pending, set()
+            return pending
+
+    def load(self, conn=None):
+        """Читает все книги заново"""
+        raise NotImplementedError
+
+    def update(self, book_ids: Iterable[int], conn=None):
+        """Перечитывает изменившиеся книги"""
+        raise NotImplementedError
+
+    def _book_count(self) -> int:
+        """Число книг в загруженных данных"""
+        return len(self.ids)
+
+    def refresh(self):
+        """Приводит данные в соответствие с базой: инкрементально, если возможно"""
+        with self._lock:
+            conn = self.db.connect()
+            pending = self._take_pending()
+            if not self.loaded or len(pending) > RELOAD_THRESHOLD:
+                self.load(conn)
+                return
+
+            if pending:
+                self.update(pending, conn)
+            # Изменения в обход уведомлений (импорт) меняют число книг
+            total = conn.execute("SELECT total FROM stats_totals").fetchone()[0]
+            if total != self._book_count():
+                self.load(conn)
+
+    def _positions(self, book_ids: np.ndarray) -> np.ndarray:
+        """Позиции книг с данными id (отсутствующие пропускаются)"""
+        positions = np.searchsorted(self.ids, book_ids)
+        found = positions < len(self.ids)
+        found[found] = self.ids[positions[found]] == book_ids[found]
+        return positions[found]
+
+    def _splice(self, positions: np.ndarray, fetched: List[np.ndarray]):
+        """Переносит перечитанные книги в массивы COLUMNS
+
+        positions — позиции перечитанных книг до изменения, fetched — их
+        массивы из базы в порядке COLUMNS; книги, которых там нет, удалены.
+        """
+        # Измененные книги правятся на месте; копируются массивы только
+        # при удалении или добавлении
+        deleted = positions[~np.isin(self.ids[positions], fetched[0])]
+        existing = np.isin(fetched[0], self.ids[positions])
+        target = self._positions(fetched[0][existing])
+        for name, values in zip(self.COLUMNS, fetched):
+            getattr(self, name)[target] = values[existing]
+        if len(deleted):
+            for name in self.COLUMNS:
+                setattr(self, name, np.delete(getattr(self, name), deleted))
+        if not existing.all():
+            insert_at = np.searchsorted(self.ids, fetched[0][~existing])
+            for name, values in zip(self.COLUMNS, fetched):
+                setattr(self, name, np.insert(getattr(self, name), insert_at, values[~existing]))
+
+    def close(self):
+        """Отписывается от изменений книг"""
+        self.db.remove_listener(self._on_book_changed)
+
+
+class ReadingAnalytics(BookTracker):
+    """Длительность чтения, страницы в день, прочитанное по годам и месяцам, серии"""
+
+    COLUMNS = ('ids', 'status', 'start', 'finish', 'pages')
+
+    def __init__(self, db):
+        super().__init__(db)
+        self._reset()
+
+    def _reset(self):
+        # Книги, упорядоченные по id
+        self.ids = np.empty(0, dtype=np.int64)
+        self.status = np.empty(0, dtype=np.int8)
+        self.start = np.empty(0, dtype=np.int64)
+        self.finish = np.empty(0, dtype=np.int64)
+        self.pages = np.empty(0, dtype=np.int64)
+
+        # Прочитанные книги и страницы по месяцу окончания
+        self.month_books = np.zeros(MONTHS, dtype=np.int64)
+        self.month_pages = np.zeros(MONTHS, dtype=np.int64)
+        # Разностный массив: накопленная сумма — число книг, читаемых в этот день
+        self.coverage_diff = np.zeros(DAYS + 1, dtype=np.int64)
+        # Прочитанные книги с известными датами начала и окончания
+        self.timed_books = 0
+        self.timed_days = 0
+        # Страницы и дни только тех из них, у которых указаны страницы
+        self.paced_pages = 0
+        self.paced_days = 0
+
+    def _fetch(self, conn, ids: Optional[Iterable[int]] = None):
+        """Строки книг одним запросом: (id, статус, начало, окончание, страницы)"""
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        if ids is None:
+            cursor.execute(_ROWS_SQL + " ORDER BY id")
+        else:
+            ids = list(ids)
+            cursor.execute(_ROWS_SQL + f" WHERE id IN ({', '.join('?' * len(ids))}) ORDER BY id", ids)
+        rows = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 5)
+        return rows[:, 0], rows[:, 1].astype(np.int8), rows[:, 2], rows[:, 3], rows[:, 4]
+
+    def _apply(self, status, start, finish, pages, sign: int):
+        """Добавляет (sign=1) или вычитает (sign=-1) вклад книг в агрегаты"""
+        read = status == READ
+        finish_month = _month_index(finish)
+        finished = read & (finish_month >= 0)
+        self.month_books += sign * np.bincount(finish_month[finished], minlength=MONTHS)
+        self.month_pages += sign * np.bincount(finish_month[finished], weights=pages[finished],
+                                               minlength=MONTHS).astype(np.int64)
+
+        start_day = _day_index(start)
+        finish_day = _day_index(finish)
+        # Прочитанные книги: дни с начала по окончание включительно
+        timed = finished & (start_day >= 0) & (start_day <= finish_day)
+        # Книги в процессе чтения: с начала и до сегодняшнего дня
+        open_ended = (status == READING) & (start_day >= 0)
+        starts = np.concatenate([start_day[timed], start_day[open_ended]])
+        self.coverage_diff += sign * np.bincount(starts, minlength=DAYS + 1)
+        self.coverage_diff -= sign * np.bincount(finish_day[timed] + 1, minlength=DAYS + 1)
+
+        durations = finish_day[timed] - start_day[timed] + 1
+        paced = pages[timed] > 0
+        self.timed_books += sign * int(timed.sum())
+        self.timed_days += sign * int(durations.sum())
+        self.paced_pages += sign * int(pages[timed][paced].sum())
+        self.paced_days += sign * int(durations[paced].sum())
+
+    def load(self, conn=None):
+        """Загружает все книги и пересчитывает агрегаты"""
+        conn = conn or self.db.connect()
+        self._reset()
+        self.ids, self.status, self.start, self.finish, self.pages = self._fetch(conn)
+        self._apply(self.status, self.start, self.finish, self.pages, 1)
+        self.loaded = True
+
+    def update(self, book_ids: Iterable[int], conn=None):
+        """Перечитывает изменившиеся книги и поправляет агрегаты на их вклад"""
+        conn = conn or self.db.connect()
+        book_ids = np.unique(np.fromiter(book_ids, dtype=np.int64))
+        if not len(book_ids):
+            return
+
+        # Старый вклад измененных и удаленных книг
+        positions = self._positions(book_ids)
+        self._apply(self.status[positions], self.start[positions], self.finish[positions],
+                    self.pages[positions], -1)
+
+        # Новый вклад книг, которые есть в базе
+        fetched = self._fetch(conn, book_ids.tolist())
+        self._apply(*fetched[1:], 1)
+        self._splice(positions, list(fetched))
+
+    def summary(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """Итоговые показатели на дату today (по умолчанию — сегодня)"""
+        today = today or date.today()
+        today_index = (today - date(FIRST_YEAR, 1, 1)).days
+        month_index = (today.year - FIRST_YEAR) * 12 + today.month - 1
+
+        with self._lock:
+            # Дни, в которые читалась хотя бы одна книга
+            reading = np.cumsum(self.coverage_diff[:today_index + 1]) > 0
+            month_books = self.month_books.copy()
+            month_pages = self.month_pages.copy()
+            timed_books, timed_days = self.timed_books, self.timed_days
+            paced_pages, paced_days = self.paced_pages, self.paced_days
+
+        # Серии считаются живыми, пока не кончился следующий день или месяц
+        day_streak = _trailing_run(reading) or _trailing_run(reading[:-1])
+        has_books = month_books[:month_index + 1] > 0
+        month_streak = _trailing_run(has_books) or _trailing_run(has_books[:-1])
+
+        year_start = (today.year - FIRST_YEAR) * 12
+        last_12 = slice(max(0, month_index - 11), month_index + 1)
+
+        # Прочитанное по годам и скользящая сумма за 12 месяцев по месяцам
+        active = np.flatnonzero(month_books)
+        yearly, rolling = [], []
+        if len(active):
+            first_year, last_year = active[0] // 12, active[-1] // 12
+            books_by_year = month_books.reshape(-1, 12).sum(axis=1)
+            pages_by_year = month_pages.reshape(-1, 12).sum(axis=1)
+            yearly = [
+                {'year': FIRST_YEAR + year, 'books': int(books_by_year[year]), 'pages': int(pages_by_year[year])}
+                for year in range(first_year, last_year + 1)
+            ]
+            cumulative = np.concatenate([[0], np.cumsum(month_books)])
+            months = np.arange(active[0], max(active[-1], month_index) + 1)
+            window = cumulative[months + 1] - cumulative[np.maximum(months - 11, 0)]
+            rolling = [
+                {'month': f"{FIRST_YEAR + month // 12}-{month % 12 + 1:02d}", 'books': int(books)}
+                for month, books in zip(months, window)
+            ]
+
+        return {
+            'reading_days': int(np.count_nonzero(reading)),
+            'books_this_year': int(month_books[year_start:month_index + 1].sum()),
+            'pages_this_year': int(month_pages[year_start:month_index + 1].sum()),
+            'books_last_12_months': int(month_books[last_12].sum()),
+            'pages_last_12_months': int(month_pages[last_12].sum()),
+            'avg_duration': round(timed_days / timed_books, 1) if timed_books else 0,
+            'pages_per_day': round(paced_pages / paced_days, 1) if paced_days else 0,
+            'day_streak': day_streak,
+            'month_streak': month_streak,
+            'yearly': yearly,
+            'rolling_12_months': rolling,
+        }
\ No newline at end of file
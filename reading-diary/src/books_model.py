@@ -0,0 +1,377 @@
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt6.QtGui import QColor
+
+# Страница книг и курсор следующей страницы (см. Database.get_books_page)
+Page = Tuple[List[Dict[str, Any]], Optional[tuple]]
+
+# Колонки таблицы: ключ книги (он же ключ сортировки в базе) и заголовок
+COLUMNS = [
+    ('id', "ID"),
+    ('title', "Название"),
+    ('author', "Автор"),
+    ('genre_name', "Жанр"),
+    ('status', "Статус"),
+    ('start_date', "Начало"),
+    ('finish_date', "Конец"),
+    ('rating', "Оценка"),
+    ('pages', "Страниц"),
+]
+
+STATUS_COLORS = {
+    'Прочитано': QColor(Qt.GlobalColor.green),
+    'Читаю': QColor(Qt.GlobalColor.yellow),
+    'Хочу прочитать': QColor(Qt.GlobalColor.blue),
+    'Отложено': QColor(Qt.GlobalColor.red),
+}
+
+STATUS_COLUMN = 4
+RATING_COLUMN = 7
+
+
+class BooksTableModel(QAbstractTableModel):
+    """Модель списка книг: колонки хранятся в компактных массивах и подгружаются порциями"""
+
+    BATCH_SIZE = 500
+    # Больше разрозненных диапазонов удаляемых строк — сброс модели вместо
+    # отдельного beginRemoveRows на каждый диапазон
+    REMOVE_RANGES_LIMIT = 20
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Ключи сортировки [(ключ колонки, по убыванию), ...]; сортирует база
+        self.sort_keys: List[Tuple[str, bool]] = []
+        self._fetch_page: Optional[Callable[[int, Optional[tuple]], Page]] = None
+        # Курсор, с которого читается следующая порция
+        self._cursor: Optional[tuple] = None
+        self._exhausted = True
+        self._clear_columns()
+
+    def _clear_columns(self):
+        # Ключ позиции строки: ключи возрастают сверху вниз, а ключ книги не
+        # меняется при вставке и удалении других строк, поэтому номер строки
+        # находится двоичным поиском ключа, без пересчета по всем строкам
+        self._key_of: Dict[int, float] = {}
+        self._keys = array('d')
+        self._ids = array('q')
+        self._ratings = array('b')
+        self._pages = array('q')
+        self._texts: Dict[str, List[Optional[str]]] = {
+            key: [] for key in ('title', 'author', 'genre_name', 'status', 'start_date', 'finish_date')
+        }
+
+    def reset_source(self, fetch_page: Callable[[int, Optional[tuple]], Page],
+                     first_page: Optional[Page] = None):
+        """Задает источник данных fetch_page(limit, cursor) и загружает первую порцию
+
+        fetch_page возвращает (книги, курсор следующей порции или None).
+        first_page — уже полученная первая порция (например, фоновым поиском).
+        """
+        self.beginResetModel()
+        self._clear_columns()
+        self._fetch_page = fetch_page
+        self._cursor = None
+        self._exhausted = False
+        if first_page is not None:
+            books, self._cursor = first_page
+            for row, book in enumerate(books):
+                self._insert(row, book)
+            self._exhausted = self._cursor is None
+        self.endResetModel()
+
+        if first_page is None and self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    @staticmethod
+    def _text_values(book: Dict[str, Any]) -> Dict[str, Optional[str]]:
+        values = {key: book[key] for key in ('title', 'author', 'start_date', 'finish_date')}
+        # Повторяющиеся значения хранятся одним объектом строки
+        for key in ('genre_name', 'status'):
+            values[key] = sys.intern(book[key]) if book[key] else None
+        return values
+
+    def _new_key(self, row: int) -> float:
+        """Ключ для строки, вставляемой перед row"""
+        keys = self._keys
+        if not keys:
+            return 0.0
+        if row == 0:
+            return keys[0] - 1
+        if row == len(keys):
+            return keys[-1] + 1
+        key = (keys[row - 1] + keys[row]) / 2
+        if keys[row - 1] < key < keys[row]:
+            return key
+        # Между соседями не осталось чисел: ключи нумеруются заново (редко —
+        # только после десятков вставок в одно и то же место)
+        self._keys = keys = array('d', range(len(self._ids)))
+        self._key_of = {book_id: float(number) for number, book_id in enumerate(self._ids)}
+        return row - 0.5
+
+    def _insert(self, row: int, book: Dict[str, Any]):
+        position = self._new_key(row)
+        self._keys.insert(row, position)
+        self._key_of[book['id']] = position
+        self._ids.insert(row, book['id'])
+        self._ratings.insert(row, book['rating'] or 0)
+        self._pages.insert(row, book['pages'] or 0)
+        for key, value in self._text_values(book).items():
+            self._texts[key].insert(row, value)
+
+    def _remove(self, first: int, stop: int):
+        """Удаляет строки first..stop-1"""
+        for book_id in self._ids[first:stop]:
+            del self._key_of[book_id]
+        del self._keys[first:stop]
+        del self._ids[first:stop]
+        del self._ratings[first:stop]
+        del self._pages[first:stop]
+        for values in self._texts.values():
+            del values[first:stop]
+
+    def _keep(self, removed: set):
+        """Оставляет все строки, кроме removed, одним проходом по колонкам"""
+        keep = [row for row in range(len(self._ids)) if row not in removed]
+        for row in removed:
+            del self._key_of[self._ids[row]]
+        self._keys = array('d', (self._keys[row] for row in keep))
+        self._ids = array('q', (self._ids[row] for row in keep))
+        self._ratings = array('b', (self._ratings[row] for row in keep))
+        self._pages = array('q', (self._pages[row] for row in keep))
+        self._texts = {key: [values[row] for row in keep] for key, values in self._texts.items()}
+
+    def row_of(self, book_id: int) -> Optional[int]:
+        """Возвращает номер строки книги или None, если она не загружена"""
+        key = self._key_of.get(book_id)
+        if key is None:
+            return None
+        return bisect_left(self._keys, key)
+
+    # --- Ленивая подгрузка ---
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent: QModelIndex):
+        if parent.isValid() or self._exhausted:
+            return
+
+        books, self._cursor = self._fetch_page(self.BATCH_SIZE, self._cursor)
+        if self._cursor is None:
+            self._exhausted = True
+
+        # Книга, вставленная точечно, могла попасть и в порцию из базы
+        books = [book for book in books if self.row_of(book['id']) is None]
+        if not books:
+            return
+
+        first = len(self._ids)
+        self.beginInsertRows(QModelIndex(), first, first + len(books) - 1)
+        for row, book in enumerate(books, first):
+            self._insert(row, book)
+        self.endInsertRows()
+
+    # --- Точечные изменения ---
+
+    def _row_entry(self, row: int) -> tuple:
+        """Значения ключей сортировки и ID книги в строке"""
+        values = []
+        for key, _ in self.sort_keys:
+            if key == 'id':
+                values.append(self._ids[row])
+            elif key == 'rating':
+                values.append(self._ratings[row] or None)
+            elif key == 'pages':
+                values.append(self._pages[row])
+            else:
+                values.append(self._texts[key][row])
+        return tuple(values), self._ids[row]
+
+    def _book_entry(self, book: Dict[str, Any]) -> tuple:
+        """Значения ключей сортировки и ID книги в том виде, в каком их хранит модель"""
+        values = []
+        for key, _ in self.sort_keys:
+            if key == 'pages':
+                values.append(book['pages'] or 0)
+            elif key in ('rating', 'genre_name', 'status'):
+                values.append(book[key] or None)
+            else:
+                values.append(book[key])
+        return tuple(values), book['id']
+
+    def _precedes(self, first: tuple, second: tuple) -> bool:
+        """Идет ли first раньше second в порядке сортировки базы"""
+        for (_, descending), a, b in zip(self.sort_keys, first[0], second[0]):
+            if a == b:
+                continue
+            # Пустое значение меньше любого, как в SQLite
+            return (a is None or (b is not None and a < b)) != descending
+        # При равенстве ключей — по id в направлении последнего ключа
+        return (first[1] < second[1]) != self.sort_keys[-1][1]
+
+    def _sorted_row(self, entry: tuple, skip: Optional[int] = None) -> int:
+        """Номер строки для entry среди загруженных строк, кроме skip"""
+        low, high = 0, len(self._ids) - (skip is not None)
+        while low < high:
+            middle = (low + high) // 2
+            row = middle + 1 if skip is not None and middle >= skip else middle
+            if self._precedes(self._row_entry(row), entry):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def insert_book(self, book: Dict[str, Any]) -> bool:
+        """Вставляет новую книгу на ее место в текущей сортировке
+
+        Без ключей сортировки книга идет первой, как новые книги в порядке
+        базы. Книга, которая попадает за последнюю загруженную строку, не
+        вставляется: она придет со следующей порцией. Возвращает False, если
+        книга не вставлена.
+        """
+        if self.row_of(book['id']) is not None:
+            return self.update_book(book)
+
+        row = self._sorted_row(self._book_entry(book)) if self.sort_keys else 0
+        if row == len(self._ids) and not self._exhausted:
+            return False
+
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._insert(row, book)
+        self.endInsertRows()
+        return True
+
+    def update_book(self, book: Dict[str, Any]) -> bool:
+        """Обновляет строку книги; False, если книга не загружена
+
+        Если изменились значения ключей сортировки, строка переносится на
+        новое место (или убирается, если оно за последней загруженной строкой).
+        """
+        row = self.row_of(book['id'])
+        if row is None:
+            return False
+
+        if self.sort_keys:
+            entry = self._book_entry(book)
+            last = len(self._ids) - 1
+            in_order = ((row == 0 or self._precedes(self._row_entry(row - 1), entry)) and
+                        (row == last or self._precedes(entry, self._row_entry(row + 1))))
+            if not in_order:
+                target = self._sorted_row(entry, skip=row)
+                if target == last and not self._exhausted:
+                    self.remove_book(book['id'])
+                    return True
+                self.beginMoveRows(QModelIndex(), row, row, QModelIndex(),
+                                   target if target < row else target + 1)
+                self._remove(row, row + 1)
+                self._insert(target, book)
+                self.endMoveRows()
+                row = target
+
+        self._ratings[row] = book['rating'] or 0
+        self._pages[row] = book['pages'] or 0
+        for key, value in self._text_values(book).items():
+            self._texts[key][row] = value
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+        return True
+
+    def remove_book(self, book_id: int) -> bool:
+        """Удаляет строку книги; False, если книга не загружена"""
+        row = self.row_of(book_id)
+        if row is None:
+            return False
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._remove(row, row + 1)
+        self.endRemoveRows()
+        return True
+
+    def remove_books(self, book_ids: Iterable[int]) -> int:
+        """Удаляет строки книг, возвращает число удаленных строк
+
+        Подряд идущие строки удаляются одним диапазоном; если диапазонов
+        много, модель сбрасывается целиком.
+        """
+        rows = sorted({row for row in map(self.row_of, book_ids) if row is not None})
+        if not rows:
+            return 0
+
+        ranges: List[List[int]] = []
+        for row in rows:
+            if ranges and ranges[-1][1] == row - 1:
+                ranges[-1][1] = row
+            else:
+                ranges.append([row, row])
+
+        if len(ranges) > self.REMOVE_RANGES_LIMIT:
+            self.beginResetModel()
+            self._keep(set(rows))
+            self.endResetModel()
+            return len(rows)
+
+        # Снизу вверх, чтобы номера еще не удаленных диапазонов не сдвигались
+        for first, last in reversed(ranges):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self._remove(first, last + 1)
+            self.endRemoveRows()
+        return len(rows)
+
+    # --- Интерфейс модели ---
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            title = COLUMNS[section][1]
+            # Стрелка направления; при сортировке по нескольким колонкам — и номер ключа
+            for number, (key, descending) in enumerate(self.sort_keys, 1):
+                if key == COLUMNS[section][0]:
+                    arrow = "▼" if descending else "▲"
+                    return f"{title} {arrow}{number}" if len(self.sort_keys) > 1 else f"{title} {arrow}"
+            return title
+        return None
+
+    def set_sort_keys(self, sort_keys: List[Tuple[str, bool]]):
+        """Запоминает ключи сортировки для заголовков; строки перезагружает вызывающий"""
+        self.sort_keys = list(sort_keys)
+        self.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, len(COLUMNS) - 1)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row, column = index.row(), index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            key = COLUMNS[column][0]
+            if key == 'id':
+                return str(self._ids[row])
+            if key == 'rating':
+                return "★" * self._ratings[row]
+            if key == 'pages':
+                return str(self._pages[row])
+            if key == 'genre_name':
+                return self._texts[key][row] or 'Не указан'
+            return self._texts[key][row] or ''
+
+        if role == Qt.ItemDataRole.BackgroundRole and column == STATUS_COLUMN:
+            return STATUS_COLORS.get(self._texts['status'][row])
+
+        if role == Qt.ItemDataRole.TextAlignmentRole and column == RATING_COLUMN:
+            return Qt.AlignmentFlag.AlignCenter
+
+        return None
+
+    def book_id(self, row: int) -> Optional[int]:
+        """Возвращает ID книги в строке"""
+        if 0 <= row < len(self._ids):
+            return self._ids[row]
+        return None
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""Генерирует Python-классы интерфейса из qt/*.ui
+
+Запуск: python src/build_ui.py
+
+Результат складывается в src/ui_compiled (каталог не хранится в git) и
+подхватывается ui_loader.load_ui; без него интерфейс загружается из .ui.
+"""
+import glob
+import os
+import py_compile
+import re
+
+from PyQt6 import uic
+
+from ui_loader import COMPILED_DIR, UI_DIR
+
+
+def build():
+    """Компилирует все .ui-файлы, возвращает количество"""
+    os.makedirs(COMPILED_DIR, exist_ok=True)
+    init_path = os.path.join(COMPILED_DIR, '__init__.py')
+    if not os.path.exists(init_path):
+        open(init_path, 'w').close()
+
+    count = 0
+    for ui_path in sorted(glob.glob(os.path.join(UI_DIR, '*.ui'))):
+        name = os.path.splitext(os.path.basename(ui_path))[0]
+        compiled_path = os.path.join(COMPILED_DIR, f'{name}.py')
+        with open(compiled_path, 'w', encoding='utf-8') as output:
+            uic.compileUi(ui_path, output)
+
+        # Имя класса зависит от objectName корневого виджета;
+        # общий псевдоним избавляет загрузчик от его угадывания
+        with open(compiled_path, encoding='utf-8') as source:
+            class_name = re.search(r'^class (\w+)\(', source.read(), re.MULTILINE).group(1)
+        with open(compiled_path, 'a', encoding='utf-8') as output:
+            output.write(f"\n\nFORM_CLASS = {class_name}\n")
+        # Байт-код сразу, чтобы первый запуск не тратил время на компиляцию
+        py_compile.compile(compiled_path, doraise=True)
+
+        print(f"{os.path.relpath(ui_path)} -> {os.path.relpath(compiled_path)}")
+        count += 1
+    return count
+
+
+if __name__ == '__main__':
+    build()
\ No newline at end of file
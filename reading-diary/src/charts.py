@@ -0,0 +1,85 @@
+import importlib
+import os
+from typing import Dict, List
+
+from PyQt6.QtWidgets import QVBoxLayout, QWidget
+
+LOADING_TEXT = "Загрузка…"
+
+# Реализации графиков: имя -> (модуль, название для пользователя)
+CHART_BACKENDS = {
+    'qt': ('charts_qt', "Qt"),
+    'matplotlib': ('charts_mpl', "matplotlib"),
+}
+DEFAULT_BACKEND = 'qt'
+
+
+class ChartBackend:
+    """Набор графиков статистики: чтение по месяцам, жанры, оценки
+
+    Реализация размещает свои виджеты в переданных контейнерах диалога и
+    обновляет их через set_*; пустые данные показываются заглушкой.
+    """
+    name = ''
+
+    def __init__(self, monthly_container: QWidget, pie_container: QWidget, rating_container: QWidget):
+        self.containers = (monthly_container, pie_container, rating_container)
+
+    def widgets(self) -> List[QWidget]:
+        """Виджеты, добавленные в контейнеры"""
+        raise NotImplementedError
+
+    def show_loading(self):
+        """Показывает вместо всех графиков сообщение о загрузке"""
+        raise NotImplementedError
+
+    def set_monthly(self, months: List[str], counts: List[int]):
+        """Обновляет график прочитанных книг по месяцам"""
+        raise NotImplementedError
+
+    def set_genres(self, labels: List[str], sizes: List[int]):
+        """Обновляет круговую диаграмму по жанрам"""
+        raise NotImplementedError
+
+    def set_ratings(self, counts: Dict[int, int]):
+        """Обновляет столбцы оценок (оценка -> количество книг)"""
+        raise NotImplementedError
+
+    def close(self):
+        """Убирает виджеты графиков из контейнеров"""
+        for widget in self.widgets():
+            widget.setParent(None)
+            widget.deleteLater()
+
+
+def add_to_container(container: QWidget, widget: QWidget):
+    """Добавляет виджет в контейнер графика, создавая компоновку при первом вызове"""
+    layout = container.layout()
+    if layout is None:
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(0, 0, 0, 0)
+    layout.addWidget(widget)
+
+
+def backend_name(name: str = None) -> str:
+    """Имя реализации: явно заданное, из READING_DIARY_CHARTS или по умолчанию"""
+    name = name or os.environ.get('READING_DIARY_CHARTS') or DEFAULT_BACKEND
+    return name if name in CHART_BACKENDS else DEFAULT_BACKEND
+
+
+def create_backend(name: str, monthly_container: QWidget, pie_container: QWidget,
+                   rating_container: QWidget) -> ChartBackend:
+    """Создает графики выбранной реализации
+
+    Если ее модуль не загружается (например, не установлен matplotlib),
+    используется следующая доступная.
+    """
+    candidates = [name] + [other for other in CHART_BACKENDS if other != name]
+    for candidate in candidates:
+        try:
+            module = importlib.import_module(CHART_BACKENDS[candidate][0])
+        except ImportError as e:
+            print(f"Error loading chart backend {candidate}: {e}")
+            continue
+        return module.Charts(monthly_container, pie_container, rating_container)
+    raise ImportError("No chart backend available")
\ No newline at end of file
@@ -0,0 +1,177 @@
+from typing import Dict, List
+
+from PyQt6.QtWidgets import QLabel, QStackedWidget
+from PyQt6.QtCore import Qt
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+
+from charts import LOADING_TEXT, ChartBackend, add_to_container
+
+# Оценки на диаграмме всегда одни и те же, поэтому столбцы создаются один раз
+RATINGS = [1, 2, 3, 4, 5]
+RATING_COLORS = ['gold', 'silver', 'lightblue', 'lightgreen', 'pink']
+
+
+class ChartPanel(QStackedWidget):
+    """Холст matplotlib с заглушкой «нет данных»
+
+    Figure и холст создаются один раз; графики обновляются на месте и
+    перерисовываются через draw_idle.
+    """
+
+    def __init__(self, figsize, empty_text):
+        super().__init__()
+        self.figure = Figure(figsize=figsize)
+        self.canvas = FigureCanvas(self.figure)
+        self.axes = self.figure.add_subplot(111)
+
+        self.empty_text = empty_text
+        self.placeholder = QLabel(empty_text)
+        self.placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        self.addWidget(self.canvas)
+        self.addWidget(self.placeholder)
+        self.show_placeholder()
+
+    def show_placeholder(self, text: str = None):
+        """Показывает сообщение вместо графика (по умолчанию — об отсутствии данных)"""
+        self.placeholder.setText(text or self.empty_text)
+        self.setCurrentWidget(self.placeholder)
+
+    def redraw(self):
+        """Показывает график и перерисовывает его при следующей отрисовке окна"""
+        self.figure.tight_layout()
+        self.setCurrentWidget(self.canvas)
+        self.canvas.draw_idle()
+
+
+class Charts(ChartBackend):
+    """Графики статистики на matplotlib"""
+    name = 'matplotlib'
+
+    def __init__(self, monthly_container, pie_container, rating_container):
+        super().__init__(monthly_container, pie_container, rating_container)
+
+        self.monthly_panel = ChartPanel((6, 4), "Нет данных для графика")
+        self.monthly_panel.axes.set_xlabel('Месяц')
+        self.monthly_panel.axes.set_ylabel('Количество книг')
+        self.monthly_panel.axes.set_title('Чтение по месяцам')
+        self.monthly_bars = None
+        self.monthly_labels = []
+        add_to_container(monthly_container, self.monthly_panel)
+
+        self.pie_panel = ChartPanel((5, 5), "Нет данных для диаграммы")
+        self.pie_genres = None
+        add_to_container(pie_container, self.pie_panel)
+
+        self.rating_panel = ChartPanel((5, 5), "Нет данных для графика")
+        axes = self.rating_panel.axes
+        self.rating_bars = axes.bar(["★" * rating for rating in RATINGS], [0] * len(RATINGS),
+                                    color=RATING_COLORS)
+        self.rating_labels = [
+            axes.text(bar.get_x() + bar.get_width() / 2., 0, '', ha='center', va='bottom')
+            for bar in self.rating_bars
+        ]
+        axes.set_xlabel('Оценка')
+        axes.set_ylabel('Количество книг')
+        axes.set_title('Распределение оценок')
+        add_to_container(rating_container, self.rating_panel)
+
+    def widgets(self):
+        return [self.monthly_panel, self.pie_panel, self.rating_panel]
+
+    def show_loading(self):
+        # Диаграмма жанров будет построена заново
+        self.pie_genres = None
+        for panel in self.widgets():
+            panel.show_placeholder(LOADING_TEXT)
+
+    def set_monthly(self, months: List[str], counts: List[int]):
+        if not months:
+            self.monthly_panel.show_placeholder()
+            return
+
+        ax = self.monthly_panel.axes
+
+        # При том же числе месяцев меняются только высоты столбцов
+        if self.monthly_bars is not None and len(self.monthly_bars) == len(counts):
+            for bar, count in zip(self.monthly_bars, counts):
+                bar.set_height(count)
+        else:
+            if self.monthly_bars is not None:
+                self.monthly_bars.remove()
+            self.monthly_bars = ax.bar(range(len(months)), counts, color='lightblue')
+
+        # Простые подписи месяцев
+        if len(months) <= 12:
+            # Если месяцев немного, показываем все
+            ax.set_xticks(range(len(months)))
+            ax.set_xticklabels(months, rotation=45)
+        else:
+            # Если много месяцев, показываем каждый 3-й
+            ax.set_xticks(range(0, len(months), 3))
+            ax.set_xticklabels(months[::3], rotation=45)
+
+        # Добавляем значения на столбцы (только если их немного)
+        for label in self.monthly_labels:
+            label.remove()
+        self.monthly_labels = []
+        if len(self.monthly_bars) <= 15:
+            for bar in self.monthly_bars:
+                height = bar.get_height()
+                if height > 0:  # Только если есть значение
+                    self.monthly_labels.append(ax.text(bar.get_x() + bar.get_width() / 2., height,
+                                                       f'{int(height)}', ha='center', va='bottom'))
+
+        ax.relim()
+        ax.autoscale_view()
+        self.monthly_panel.redraw()
+
+    def set_genres(self, labels: List[str], sizes: List[int]):
+        if not labels:
+            self.pie_genres = None
+            self.pie_panel.show_placeholder()
+            return
+
+        if (labels, sizes) == self.pie_genres:
+            return
+        self.pie_genres = (labels, sizes)
+
+        # Секторы, подписи и проценты зависят друг от друга, поэтому
+        # пересоздается только содержимое осей, холст остается прежним
+        ax = self.pie_panel.axes
+        ax.clear()
+
+        # Простая круговая диаграмма
+        wedges, texts, autotexts = ax.pie(sizes,
+                                          labels=labels,
+                                          autopct='%1.1f%%',
+                                          startangle=90)
+
+        ax.set_title('Распределение по жанрам')
+
+        # Делаем подписи меньше
+        for autotext in autotexts:
+            autotext.set_fontsize(8)
+
+        for text in texts:
+            text.set_fontsize(8)
+
+        self.pie_panel.redraw()
+
+    def set_ratings(self, counts: Dict[int, int]):
+        if not counts:
+            self.rating_panel.show_placeholder()
+            return
+
+        for bar, label, rating in zip(self.rating_bars, self.rating_labels, RATINGS):
+            height = counts.get(rating, 0)
+            bar.set_height(height)
+            # Добавляем значения на столбцы
+            label.set_y(height)
+            label.set_text(f'{height}')
+
+        ax = self.rating_panel.axes
+        ax.relim()
+        ax.autoscale_view()
+        self.rating_panel.redraw()
\ No newline at end of file
@@ -0,0 +1,282 @@
+import math
+from typing import Dict, List
+
+from PyQt6.QtCore import QPointF, QRectF, Qt
+from PyQt6.QtGui import QColor, QFont, QPainter, QPen
+from PyQt6.QtWidgets import QSizePolicy, QWidget
+
+from charts import LOADING_TEXT, ChartBackend, add_to_container
+
+# Оценки на диаграмме всегда одни и те же
+RATINGS = [1, 2, 3, 4, 5]
+RATING_COLORS = ['gold', 'silver', 'lightblue', 'lightgreen', 'pink']
+# Палитра секторов — та же, что у matplotlib по умолчанию
+PIE_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+              '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+
+MARGIN = 8
+
+
+def nice_step(maximum: int, ticks: int = 5) -> int:
+    """Шаг делений оси Y: 1, 2 или 5, умноженные на степень десяти"""
+    raw = max(maximum, 1) / ticks
+    magnitude = 10 ** math.floor(math.log10(raw)) if raw >= 1 else 1
+    for factor in (1, 2, 5, 10):
+        if factor * magnitude >= raw:
+            return max(1, int(factor * magnitude))
+    return int(10 * magnitude)
+
+
+class ChartWidget(QWidget):
+    """График на QPainter: заголовок и заглушка, когда данных нет"""
+
+    def __init__(self, title: str, empty_text: str):
+        super().__init__()
+        self.title = title
+        self.empty_text = empty_text
+        # Данные еще загружаются: вместо заглушки «нет данных» — сообщение о загрузке
+        self.loading = False
+        self.setMinimumSize(200, 150)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+
+    def show_loading(self):
+        """Показывает сообщение о загрузке до следующего set_data"""
+        self.loading = True
+        self.update()
+
+    def has_data(self) -> bool:
+        raise NotImplementedError
+
+    def paint_chart(self, painter: QPainter, area: QRectF):
+        raise NotImplementedError
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillRect(self.rect(), Qt.GlobalColor.white)
+
+        if self.loading or not self.has_data():
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter,
+                             LOADING_TEXT if self.loading else self.empty_text)
+            return
+
+        title_font = QFont(self.font())
+        title_font.setBold(True)
+        painter.setFont(title_font)
+        title_height = painter.fontMetrics().height()
+        painter.drawText(QRectF(0, MARGIN, self.width(), title_height),
+                         Qt.AlignmentFlag.AlignCenter, self.title)
+        painter.setFont(self.font())
+
+        top = MARGIN * 2 + title_height
+        self.paint_chart(painter, QRectF(MARGIN, top, self.width() - MARGIN * 2,
+                                         self.height() - top - MARGIN))
+
+
+class BarChartWidget(ChartWidget):
+    """Столбчатая диаграмма с осями и подписями"""
+
+    def __init__(self, title: str, empty_text: str, x_title: str, y_title: str):
+        super().__init__(title, empty_text)
+        self.x_title = x_title
+        self.y_title = y_title
+        self.labels: List[str] = []
+        self.values: List[int] = []
+        self.colors: List[QColor] = []
+        # Подписывается каждая label_step-я метка оси X
+        self.label_step = 1
+        self.show_values = True
+
+    def set_data(self, labels: List[str], values: List[int], colors: List[str],
+                 label_step: int = 1, show_values: bool = True):
+        """Задает столбцы и перерисовывает график"""
+        self.labels = labels
+        self.values = values
+        self.colors = [QColor(color) for color in colors]
+        self.label_step = label_step
+        self.show_values = show_values
+        self.loading = False
+        self.update()
+
+    def has_data(self) -> bool:
+        return bool(self.values)
+
+    def paint_chart(self, painter: QPainter, area: QRectF):
+        metrics = painter.fontMetrics()
+        text_height = metrics.height()
+        step = nice_step(max(self.values))
+        top_value = max(step, math.ceil(max(self.values) / step) * step)
+        tick_width = metrics.horizontalAdvance(str(top_value))
+        # Подписи оси X повернуты, если не помещаются горизонтально
+        widest_label = max(metrics.horizontalAdvance(label) for label in self.labels[::self.label_step])
+        slot = area.width() / len(self.values)
+        rotate = widest_label > slot * self.label_step * 0.9
+        x_labels_height = widest_label * 0.75 + text_height if rotate else text_height
+
+        plot = QRectF(area.left() + text_height + tick_width + 6, area.top() + text_height,
+                      0, 0)
+        plot.setRight(area.right())
+        plot.setBottom(area.bottom() - x_labels_height - text_height - 4)
+        if plot.width() <= 0 or plot.height() <= 0:
+            return
+        scale = plot.height() / top_value
+
+        # Деления и сетка оси Y
+        grid_pen = QPen(QColor('#dddddd'))
+        for value in range(0, top_value + 1, step):
+            y = plot.bottom() - value * scale
+            painter.setPen(grid_pen)
+            painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+            painter.setPen(Qt.GlobalColor.black)
+            painter.drawText(QRectF(plot.left() - tick_width - 4, y - text_height / 2, tick_width, text_height),
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, str(value))
+
+        # Столбцы
+        slot = plot.width() / len(self.values)
+        bar_width = slot * 0.8
+        painter.setPen(Qt.PenStyle.NoPen)
+        for index, value in enumerate(self.values):
+            painter.setBrush(self.colors[index % len(self.colors)])
+            painter.drawRect(QRectF(plot.left() + slot * index + (slot - bar_width) / 2,
+                                    plot.bottom() - value * scale, bar_width, value * scale))
+
+        painter.setPen(Qt.GlobalColor.black)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawLine(plot.bottomLeft(), plot.bottomRight())
+        painter.drawLine(plot.bottomLeft(), plot.topLeft())
+
+        # Значения над столбцами
+        if self.show_values:
+            for index, value in enumerate(self.values):
+                if value > 0:
+                    x = plot.left() + slot * index
+                    painter.drawText(QRectF(x, plot.bottom() - value * scale - text_height, slot, text_height),
+                                     Qt.AlignmentFlag.AlignCenter, str(value))
+
+        # Подписи оси X
+        for index in range(0, len(self.labels), self.label_step):
+            center = plot.left() + slot * (index + 0.5)
+            if rotate:
+                painter.save()
+                painter.translate(center, plot.bottom() + 4)
+                painter.rotate(-45)
+                width = metrics.horizontalAdvance(self.labels[index])
+                painter.drawText(QRectF(-width, 0, width, text_height),
+                                 Qt.AlignmentFlag.AlignRight, self.labels[index])
+                painter.restore()
+            else:
+                painter.drawText(QRectF(center - slot * self.label_step / 2, plot.bottom() + 2,
+                                        slot * self.label_step, text_height),
+                                 Qt.AlignmentFlag.AlignHCenter, self.labels[index])
+
+        # Названия осей
+        painter.drawText(QRectF(plot.left(), area.bottom() - text_height, plot.width(), text_height),
+                         Qt.AlignmentFlag.AlignCenter, self.x_title)
+        painter.save()
+        painter.translate(area.left(), plot.center().y())
+        painter.rotate(-90)
+        painter.drawText(QRectF(-plot.height() / 2, 0, plot.height(), text_height),
+                         Qt.AlignmentFlag.AlignCenter, self.y_title)
+        painter.restore()
+
+
+class PieChartWidget(ChartWidget):
+    """Круговая диаграмма с подписями и процентами"""
+
+    def __init__(self, title: str, empty_text: str):
+        super().__init__(title, empty_text)
+        self.labels: List[str] = []
+        self.sizes: List[int] = []
+
+    def set_data(self, labels: List[str], sizes: List[int]):
+        """Задает секторы и перерисовывает диаграмму"""
+        self.labels = labels
+        self.sizes = sizes
+        self.loading = False
+        self.update()
+
+    def has_data(self) -> bool:
+        return sum(self.sizes) > 0
+
+    def paint_chart(self, painter: QPainter, area: QRectF):
+        small_font = QFont(self.font())
+        small_font.setPointSizeF(max(6.0, small_font.pointSizeF() * 0.85))
+        painter.setFont(small_font)
+        metrics = painter.fontMetrics()
+        text_height = metrics.height()
+
+        # Место по бокам под подписи жанров
+        label_width = max(metrics.horizontalAdvance(label) for label in self.labels)
+        radius = min(area.width() / 2 - label_width * 0.7, area.height() / 2 - text_height * 1.5) / 1.1
+        radius = max(radius, min(area.width(), area.height()) / 4)
+        center = area.center()
+        pie_rect = QRectF(center.x() - radius, center.y() - radius, radius * 2, radius * 2)
+
+        total = sum(self.sizes)
+        # Как в matplotlib: от 90° против часовой стрелки
+        angle = 90.0
+        painter.setPen(QPen(Qt.GlobalColor.white, 1))
+        spans = []
+        for index, size in enumerate(self.sizes):
+            span = 360.0 * size / total
+            painter.setBrush(QColor(PIE_COLORS[index % len(PIE_COLORS)]))
+            painter.drawPie(pie_rect, round(angle * 16), round(span * 16))
+            spans.append((angle, span))
+            angle += span
+
+        painter.setPen(Qt.GlobalColor.black)
+        for (start, span), label, size in zip(spans, self.labels, self.sizes):
+            middle = math.radians(start + span / 2)
+            dx, dy = math.cos(middle), -math.sin(middle)
+
+            # Процент внутри сектора
+            inner = QPointF(center.x() + dx * radius * 0.6, center.y() + dy * radius * 0.6)
+            text = f"{size / total * 100:.1f}%"
+            painter.drawText(QRectF(inner.x() - 40, inner.y() - text_height / 2, 80, text_height),
+                             Qt.AlignmentFlag.AlignCenter, text)
+
+            # Подпись жанра снаружи, выровненная от круга
+            outer = QPointF(center.x() + dx * radius * 1.1, center.y() + dy * radius * 1.1)
+            width = metrics.horizontalAdvance(label)
+            left = outer.x() if dx >= 0 else outer.x() - width
+            painter.drawText(QRectF(left, outer.y() - text_height / 2, width, text_height),
+                             Qt.AlignmentFlag.AlignCenter, label)
+
+
+class Charts(ChartBackend):
+    """Графики статистики, нарисованные средствами Qt без matplotlib"""
+    name = 'qt'
+
+    def __init__(self, monthly_container, pie_container, rating_container):
+        super().__init__(monthly_container, pie_container, rating_container)
+        self.monthly_chart = BarChartWidget('Чтение по месяцам', "Нет данных для графика",
+                                            'Месяц', 'Количество книг')
+        self.pie_chart = PieChartWidget('Распределение по жанрам', "Нет данных для диаграммы")
+        self.rating_chart = BarChartWidget('Распределение оценок', "Нет данных для графика",
+                                           'Оценка', 'Количество книг')
+        add_to_container(monthly_container, self.monthly_chart)
+        add_to_container(pie_container, self.pie_chart)
+        add_to_container(rating_container, self.rating_chart)
+
+    def widgets(self):
+        return [self.monthly_chart, self.pie_chart, self.rating_chart]
+
+    def show_loading(self):
+        for chart in self.widgets():
+            chart.show_loading()
+
+    def set_monthly(self, months: List[str], counts: List[int]):
+        # Если месяцев много, подписываем каждый 3-й, значения — только у немногих столбцов
+        self.monthly_chart.set_data(months, counts, ['lightblue'],
+                                    label_step=1 if len(months) <= 12 else 3,
+                                    show_values=len(months) <= 15)
+
+    def set_genres(self, labels: List[str], sizes: List[int]):
+        self.pie_chart.set_data(labels, sizes)
+
+    def set_ratings(self, counts: Dict[int, int]):
+        if not counts:
+            self.rating_chart.set_data([], [], RATING_COLORS)
+            return
+        self.rating_chart.set_data(["★" * rating for rating in RATINGS],
+                                   [counts.get(rating, 0) for rating in RATINGS], RATING_COLORS)
\ No newline at end of file
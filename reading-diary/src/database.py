@@ -1,28 +1,293 @@
 import sqlite3
+import csv
+import gzip
+import hashlib
+import io
 import os
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import re
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Iterable, List, Dict, Any, Optional, Sequence, Tuple
 import json
+from migrations import SCHEMA_VERSION, apply_migrations, fill_books_fts, fill_statistics, get_schema_version
+
+# Виды изменений, о которых Database уведомляет подписчиков
+BOOK_INSERTED = 'inserted'
+BOOK_UPDATED = 'updated'
+BOOK_DELETED = 'deleted'
+
+# Колонки карточки книги; обложка загружается отдельно через get_cover
+BOOK_COLUMNS = '''
+    b.id, b.title, b.author, b.genre_id, b.status, b.start_date, b.finish_date,
+    b.rating, b.review, b.pages, b.created_at, b.updated_at, g.name as genre_name
+'''
+
+# Колонки, которые отображаются в таблице главного окна
+BOOK_LIST_COLUMNS = '''
+    b.id, b.title, b.author, b.genre_id, b.status, b.start_date, b.finish_date,
+    b.rating, b.pages, b.created_at, g.name as genre_name
+'''
+
+# Колонки списка, по которым его можно сортировать: выражение значения,
+# условие «значения нет» и условие «значение есть» (None — колонка всегда
+# заполнена). Книги без жанра ищутся по genre_id, а жанры с названием —
+# диапазоном по имени, чтобы SQLite перебирал жанры по индексу их имен
+SORT_COLUMNS = {
+    'id': ('b.id', None, None),
+    'title': ('b.title', None, None),
+    'author': ('b.author', None, None),
+    'genre_name': ('g.name', 'b.genre_id IS NULL', "g.name >= ''"),
+    'status': ('b.status', 'b.status IS NULL', 'b.status IS NOT NULL'),
+    'start_date': ('b.start_date', 'b.start_date IS NULL', 'b.start_date IS NOT NULL'),
+    'finish_date': ('b.finish_date', 'b.finish_date IS NULL', 'b.finish_date IS NOT NULL'),
+    'rating': ('b.rating', 'b.rating IS NULL', 'b.rating IS NOT NULL'),
+    'pages': ('b.pages', 'b.pages IS NULL', 'b.pages IS NOT NULL'),
+    'created_at': ('b.created_at', 'b.created_at IS NULL', 'b.created_at IS NOT NULL'),
+}
+
+# Порядок списка без поиска: новые книги сверху
+DEFAULT_SORT_COLUMN = 'created_at'
+
+# Фасетные фильтры списка (см. facets.py): фильтр -> колонка books.
+# Значение фильтра — набор выбранных значений колонки, None в нем — «не указано»
+FACET_COLUMNS = {
+    'status': 'status',
+    'genre': 'genre_id',
+    'rating': 'rating',
+    'year': 'finish_year',
+    'pages': 'pages',
+}
+
+# Диапазоны объема для фильтра 'pages' — [от, до); в фильтре выбираются
+# номера диапазонов, None — объем не указан
+PAGE_RANGES = [(1, 100), (100, 300), (300, 500), (500, 1000), (1000, None)]
+
+# Колонки CSV при экспорте и импорте
+CSV_FIELDS = ['id', 'title', 'author', 'genre', 'status',
+              'start_date', 'finish_date', 'rating', 'pages', 'review']
+
+# Размер буфера записи при экспорте
+EXPORT_BUFFER_SIZE = 256 * 1024
+
+# Поля, которые update_books может менять по отдельности
+_UPDATABLE_FIELDS = ('title', 'author', 'genre', 'status', 'start_date', 'finish_date',
+                     'rating', 'review', 'pages')
+
+# Допустимые статусы книги (как в ограничении CHECK таблицы books)
+BOOK_STATUSES = ('Хочу прочитать', 'Читаю', 'Прочитано', 'Отложено')
+
+# Сколько ошибочных строк импорта запоминается для отчета
+MAX_IMPORT_ERRORS = 100
+
+# Построчные триггеры, которые массовый импорт заменяет одним проходом в конце
+_BULK_SUSPENDED_TRIGGERS = ('books_fts_insert', 'stats_insert')
+
+_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}$')
+
+# Списки статистики и поле, по которому сверяются их элементы
+_STATS_LIST_LABELS = {
+    'genres_stats': 'genre',
+    'ratings_stats': 'rating',
+    'monthly_stats': 'month',
+    'yearly_stats': 'year',
+}
+
+# Сессии чтения: номер дня считается от этой даты (как в analytics)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_SESSION_INSERT = (
+    "INSERT INTO reading_sessions (book_id, started_at, day, pages, duration) VALUES (?, ?, ?, ?, ?)"
+)
+
+# Разделы статистики в порядке показа (см. get_statistics_section)
+STATISTICS_SECTIONS = ('totals', 'genres', 'ratings', 'monthly')
+
+
+class DatabaseSettings:
+    """Профиль производительности: PRAGMA, применяемые к каждому новому соединению
+
+    journal_mode=WAL позволяет читать статистику, пока идет запись, и
+    фиксирует транзакции без записи всего журнала отката; при
+    synchronous=NORMAL fsync выполняется только при контрольной точке.
+    cache_size_kb и mmap_size задают кеш страниц и объем файла, читаемый
+    через отображение в память (0 — не использовать). read_only открывает
+    файл только для чтения; immutable дополнительно обещает SQLite, что файл
+    никто не меняет, и снимает блокировки. Незавершенный журнал WAL в этом
+    режиме не читается, поэтому так открывают только закрытые всеми
+    копиями программы базы.
+    """
+
+    def __init__(self, journal_mode: str = 'WAL', synchronous: str = 'NORMAL',
+                 cache_size_kb: int = 16384, mmap_size: int = 256 * 1024 * 1024,
+                 temp_store: str = 'MEMORY', read_only: bool = False, immutable: bool = False):
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.temp_store = temp_store
+        self.read_only = read_only or immutable
+        self.immutable = immutable
+
+    def uri(self, db_path: str) -> Optional[str]:
+        """URI для открытия файла только для чтения (None — обычное открытие)"""
+        if not self.read_only:
+            return None
+        uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+        return uri + '&immutable=1' if self.immutable else uri
+
+    def pragmas(self) -> List[str]:
+        """PRAGMA профиля в порядке применения"""
+        pragmas = []
+        # Режим журнала хранится в файле и не меняется при открытии только для чтения
+        if self.journal_mode and not self.read_only:
+            pragmas.append(f"PRAGMA journal_mode = {self.journal_mode}")
+        if self.synchronous:
+            pragmas.append(f"PRAGMA synchronous = {self.synchronous}")
+        if self.cache_size_kb:
+            # Отрицательное значение — размер в КиБ, а не в страницах
+            pragmas.append(f"PRAGMA cache_size = -{self.cache_size_kb}")
+        if self.mmap_size is not None:
+            pragmas.append(f"PRAGMA mmap_size = {self.mmap_size}")
+        if self.temp_store:
+            pragmas.append(f"PRAGMA temp_store = {self.temp_store}")
+        return pragmas
+
+
+# Именованные профили соединений (см. database_settings)
+DATABASE_PROFILES = {
+    # Обычная работа программы
+    'default': DatabaseSettings(),
+    # Настройки SQLite по умолчанию: журнал отката и fsync при каждой фиксации.
+    # Нужен для сетевых дисков, где WAL не работает
+    'compatible': DatabaseSettings(journal_mode='DELETE', synchronous='FULL', cache_size_kb=2000,
+                                   mmap_size=0, temp_store='DEFAULT'),
+    # Просмотр без изменений, например копии базы на съемном носителе
+    'viewer': DatabaseSettings(read_only=True, immutable=True),
+}
+DEFAULT_PROFILE = 'default'
+
+
+def database_settings(profile: str = None) -> DatabaseSettings:
+    """Профиль соединений: явно заданный, из READING_DIARY_DB_PROFILE или по умолчанию"""
+    profile = profile or os.environ.get('READING_DIARY_DB_PROFILE') or DEFAULT_PROFILE
+    return DATABASE_PROFILES.get(profile, DATABASE_PROFILES[DEFAULT_PROFILE])
 
 
 class Database:
-    def __init__(self, db_path: str = "reading_diary.db"):
+    def __init__(self, db_path: str = "reading_diary.db", settings: Optional[DatabaseSettings] = None):
         self.db_path = db_path
+        self.settings = settings or database_settings()
         self.connection = None
 
-    def connect(self):
-        """Устанавливает соединение с базой данных"""
-        self.connection = sqlite3.connect(self.db_path)
-        self.connection.row_factory = sqlite3.Row
-        return self.connection
+        # Пул соединений: одно долгоживущее соединение на поток
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._generation = 0
+
+        # Подписчики на изменения книг
+        self._listeners: List[Callable[[str, List[int]], None]] = []
+
+        # Кеш справочника жанров, загружается при первом обращении
+        self._genres: Optional[Dict[str, Any]] = None
+        self._genres_lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[str, List[int]], None]):
+        """Подписывает на изменения книг: listener(change, book_ids)
+
+        change — BOOK_INSERTED, BOOK_UPDATED или BOOK_DELETED, book_ids — все
+        книги, измененные одной транзакцией. Уведомление вызывается после
+        фиксации транзакции в том потоке, где было изменение.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, List[int]], None]):
+        """Отписывает от изменений книг"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, change: str, book_ids: List[int]):
+        """Уведомляет подписчиков об изменении книг"""
+        if not book_ids:
+            return
+        for listener in list(self._listeners):
+            listener(change, book_ids)
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """Открывает новое соединение с базой данных"""
+        # check_same_thread=False нужен только для того, чтобы close()
+        # мог закрыть соединения рабочих потоков; каждое соединение
+        # по-прежнему используется только своим потоком
+        uri = self.settings.uri(self.db_path)
+        if uri:
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in self.settings.pragmas():
+            conn.execute(pragma)
+        return conn
+
+    @property
+    def read_only(self) -> bool:
+        """Открыта ли база только для чтения"""
+        return self.settings.read_only
+
+    def connect(self) -> sqlite3.Connection:
+        """Возвращает соединение текущего потока, открывая его при первом обращении"""
+        local = self._local
+        if getattr(local, 'generation', None) == self._generation:
+            return local.connection
+
+        conn = self._open_connection()
+        with self._lock:
+            self._connections.append(conn)
+            if self.connection is None:
+                self.connection = conn
+            local.connection = conn
+            local.generation = self._generation
+        return conn
+
+    def release_thread_connection(self):
+        """Закрывает соединение текущего потока (в конце фоновой задачи)"""
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            return
+
+        conn = local.connection
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+            if self.connection is conn:
+                self.connection = None
+        local.connection = None
+        local.generation = None
+        conn.close()
 
     def close(self):
-        """Закрывает соединение с базой данных"""
-        if self.connection:
-            self.connection.close()
+        """Закрывает все соединения с базой данных"""
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+            self.connection = None
+            # Соединения, закешированные в потоках, становятся недействительными
+            self._generation += 1
+
+        for conn in connections:
+            conn.close()
 
     def init_db(self):
         """Инициализирует базу данных (создает таблицы если их нет)"""
+        if self.read_only:
+            # Схему базы только для чтения обновить нельзя, ее можно лишь проверить
+            version = get_schema_version(self.connect())
+            if version != SCHEMA_VERSION:
+                raise sqlite3.OperationalError(
+                    f"Версия схемы базы {version}, нужна {SCHEMA_VERSION}: "
+                    f"откройте базу один раз без режима только для чтения"
+                )
+            return
+
         with self.connect() as conn:
             cursor = conn.cursor()
 
@@ -69,25 +334,25 @@ class Database:
 
             conn.commit()
 
+            # Обновляем схему существующих баз до актуальной версии
+            apply_migrations(conn)
+
+        self.invalidate_genres()
+
     def add_book(self, book_data: Dict[str, Any]) -> int:
         """Добавляет новую книгу в базу данных"""
         with self.connect() as conn:
             cursor = conn.cursor()
 
-            # Получаем ID жанра по имени
-            genre_id = None
-            if book_data.get('genre'):
-                cursor.execute("SELECT id FROM genres WHERE name = ?", (book_data['genre'],))
-                result = cursor.fetchone()
-                if result:
-                    genre_id = result['id']
+            # ID жанра берется из кеша; новый жанр создается
+            genre_id = self._resolve_genre(cursor, book_data.get('genre'))
 
             # Вставляем книгу
             cursor.execute('''
                 INSERT INTO books 
                 (title, author, genre_id, status, start_date, finish_date, 
-                 rating, review, cover_image, pages)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 rating, review, pages)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 book_data['title'],
                 book_data['author'],
@@ -97,32 +362,31 @@ class Database:
                 book_data['finish_date'],
                 book_data['rating'],
                 book_data['review'],
-                book_data.get('cover_image'),
                 book_data.get('pages', 0)
             ))
 
             book_id = cursor.lastrowid
+            self._save_cover(cursor, book_id, book_data.get('cover_image'),
+                             book_data.get('cover_thumbnails'))
             conn.commit()
-            return book_id
+
+        self._release_genre_changes()
+        self._notify(BOOK_INSERTED, [book_id])
+        return book_id
 
     def update_book(self, book_id: int, book_data: Dict[str, Any]) -> bool:
         """Обновляет данные книги"""
         with self.connect() as conn:
             cursor = conn.cursor()
 
-            # Получаем ID жанра по имени
-            genre_id = None
-            if book_data.get('genre'):
-                cursor.execute("SELECT id FROM genres WHERE name = ?", (book_data['genre'],))
-                result = cursor.fetchone()
-                if result:
-                    genre_id = result['id']
+            # ID жанра берется из кеша; новый жанр создается
+            genre_id = self._resolve_genre(cursor, book_data.get('genre'))
 
             cursor.execute('''
                 UPDATE books 
                 SET title = ?, author = ?, genre_id = ?, status = ?, 
                     start_date = ?, finish_date = ?, rating = ?, review = ?,
-                    cover_image = ?, pages = ?, updated_at = CURRENT_TIMESTAMP
+                    pages = ?, updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
             ''', (
                 book_data['title'],
@@ -133,28 +397,214 @@ class Database:
                 book_data['finish_date'],
                 book_data['rating'],
                 book_data['review'],
-                book_data.get('cover_image'),
                 book_data.get('pages', 0),
                 book_id
             ))
 
+            # Обложка перезаписывается, только если она передана
+            updated = cursor.rowcount > 0
+            if updated and 'cover_image' in book_data:
+                self._save_cover(cursor, book_id, book_data['cover_image'],
+                                 book_data.get('cover_thumbnails'))
+
+            conn.commit()
+
+        self._release_genre_changes()
+        if updated:
+            self._notify(BOOK_UPDATED, [book_id])
+        return updated
+
+    def add_books(self, books: Iterable[Dict[str, Any]]) -> List[int]:
+        """Добавляет несколько книг в одной транзакции, возвращает их ID"""
+        book_ids = []
+        with self.connect() as conn:
+            cursor = conn.cursor()
+
+            for book_data in books:
+                cursor.execute('''
+                    INSERT INTO books
+                    (title, author, genre_id, status, start_date, finish_date,
+                     rating, review, pages)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    book_data['title'],
+                    book_data['author'],
+                    self._resolve_genre(cursor, book_data.get('genre')),
+                    book_data['status'],
+                    book_data['start_date'],
+                    book_data['finish_date'],
+                    book_data['rating'],
+                    book_data['review'],
+                    book_data.get('pages', 0)
+                ))
+                book_ids.append(cursor.lastrowid)
+                if book_data.get('cover_image'):
+                    self._save_cover(cursor, book_ids[-1], book_data['cover_image'],
+                                     book_data.get('cover_thumbnails'))
+            conn.commit()
+
+        self._release_genre_changes()
+        self._notify(BOOK_INSERTED, book_ids)
+        return book_ids
+
+    def update_books(self, updates: Iterable[Tuple[int, Dict[str, Any]]]) -> List[int]:
+        """Обновляет несколько книг в одной транзакции, возвращает ID измененных
+
+        updates — пары (ID книги, данные). В отличие от update_book, данные
+        могут быть неполными: меняются только переданные поля, например
+        [(book_id, {'status': 'Прочитано'}), ...].
+        """
+        book_ids = []
+        with self.connect() as conn:
+            cursor = conn.cursor()
+
+            for book_id, book_data in updates:
+                fields = [key for key in _UPDATABLE_FIELDS if key in book_data]
+                if fields:
+                    # Одинаковый набор полей дает одинаковый текст запроса,
+                    # и sqlite3 повторно использует подготовленный оператор
+                    assignments = ', '.join(
+                        'genre_id = ?' if key == 'genre' else f'{key} = ?' for key in fields
+                    )
+                    values = [self._resolve_genre(cursor, book_data['genre']) if key == 'genre'
+                              else book_data[key] for key in fields]
+                    cursor.execute(
+                        f"UPDATE books SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                        values + [book_id]
+                    )
+                    if cursor.rowcount == 0:
+                        continue
+                elif not conn.execute("SELECT 1 FROM books WHERE id = ?", (book_id,)).fetchone():
+                    continue
+
+                if 'cover_image' in book_data:
+                    self._save_cover(cursor, book_id, book_data['cover_image'],
+                                     book_data.get('cover_thumbnails'))
+                book_ids.append(book_id)
+            conn.commit()
+
+        self._release_genre_changes()
+        self._notify(BOOK_UPDATED, book_ids)
+        return book_ids
+
+    def _store_cover_image(self, cursor: sqlite3.Cursor, image: bytes,
+                           thumbnails: Optional[Dict[str, bytes]] = None) -> str:
+        """Сохраняет изображение обложки один раз на содержимое, возвращает его хеш"""
+        thumbnails = thumbnails or {}
+        digest = hashlib.sha256(image).hexdigest()
+        cursor.execute('''
+            INSERT INTO cover_images (hash, image, thumb_large, thumb_small)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (hash) DO UPDATE SET
+                thumb_large = COALESCE(cover_images.thumb_large, excluded.thumb_large),
+                thumb_small = COALESCE(cover_images.thumb_small, excluded.thumb_small)
+        ''', (digest, image, thumbnails.get('large'), thumbnails.get('small')))
+        return digest
+
+    def _save_cover(self, cursor: sqlite3.Cursor, book_id: int, image: Optional[bytes],
+                    thumbnails: Optional[Dict[str, bytes]] = None):
+        """Сохраняет или удаляет обложку книги вместе с миниатюрами"""
+        if image:
+            digest = self._store_cover_image(cursor, image, thumbnails)
+            # UPSERT, а не REPLACE: триггер освобождения старого изображения
+            # срабатывает только на UPDATE
+            cursor.execute('''
+                INSERT INTO covers (book_id, hash) VALUES (?, ?)
+                ON CONFLICT (book_id) DO UPDATE SET hash = excluded.hash
+            ''', (book_id, digest))
+        else:
+            cursor.execute("DELETE FROM covers WHERE book_id = ?", (book_id,))
+
+    def save_thumbnails(self, book_id: int, thumbnails: Dict[str, bytes]):
+        """Сохраняет миниатюры уже загруженной обложки"""
+        with self.connect() as conn:
+            conn.execute('''
+                UPDATE cover_images SET thumb_large = ?, thumb_small = ?
+                WHERE hash = (SELECT hash FROM covers WHERE book_id = ?)
+            ''', (thumbnails.get('large'), thumbnails.get('small'), book_id))
+            conn.commit()
+
+    def get_cover(self, book_id: int) -> Optional[bytes]:
+        """Загружает обложку книги (отдельно от остальных данных)"""
+        with self.connect() as conn:
+            row = conn.execute('''
+                SELECT i.image FROM covers c
+                JOIN cover_images i ON i.hash = c.hash
+                WHERE c.book_id = ?
+            ''', (book_id,)).fetchone()
+            return row['image'] if row else None
+
+    def get_thumbnail(self, book_id: int, size: str) -> Optional[bytes]:
+        """Загружает миниатюру обложки ('large' или 'small')"""
+        column = {'large': 'thumb_large', 'small': 'thumb_small'}[size]
+        with self.connect() as conn:
+            row = conn.execute(f'''
+                SELECT i.{column} FROM covers c
+                JOIN cover_images i ON i.hash = c.hash
+                WHERE c.book_id = ?
+            ''', (book_id,)).fetchone()
+            return row[0] if row else None
+
+    def get_cover_hashes(self) -> List[str]:
+        """Возвращает хеши всех хранимых изображений обложек"""
+        with self.connect() as conn:
+            return [row['hash'] for row in conn.execute("SELECT hash FROM cover_images")]
+
+    def get_cover_image(self, digest: str) -> Optional[bytes]:
+        """Загружает изображение обложки по хешу"""
+        with self.connect() as conn:
+            row = conn.execute("SELECT image FROM cover_images WHERE hash = ?", (digest,)).fetchone()
+            return row['image'] if row else None
+
+    def replace_cover_image(self, digest: str, image: bytes, thumbnails: Dict[str, bytes]) -> str:
+        """Заменяет хранимое изображение новым (например, пережатым) для всех книг"""
+        with self.connect() as conn:
+            cursor = conn.cursor()
+            new_digest = hashlib.sha256(image).hexdigest()
+            if new_digest == digest:
+                cursor.execute(
+                    "UPDATE cover_images SET thumb_large = ?, thumb_small = ? WHERE hash = ?",
+                    (thumbnails.get('large'), thumbnails.get('small'), digest)
+                )
+            else:
+                self._store_cover_image(cursor, image, thumbnails)
+                # Старое изображение удалит триггер, когда на него не останется ссылок
+                cursor.execute("UPDATE covers SET hash = ? WHERE hash = ?", (new_digest, digest))
             conn.commit()
-            return cursor.rowcount > 0
+            return new_digest
 
     def delete_book(self, book_id: int) -> bool:
         """Удаляет книгу из базы данных"""
         with self.connect() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM books WHERE id = ?", (book_id,))
+            deleted = cursor.rowcount > 0
+            conn.commit()
+
+        if deleted:
+            self._notify(BOOK_DELETED, [book_id])
+        return deleted
+
+    def delete_books(self, book_ids: Iterable[int]) -> List[int]:
+        """Удаляет несколько книг в одной транзакции, возвращает ID удаленных"""
+        deleted = []
+        with self.connect() as conn:
+            cursor = conn.cursor()
+            for book_id in book_ids:
+                cursor.execute("DELETE FROM books WHERE id = ?", (book_id,))
+                if cursor.rowcount > 0:
+                    deleted.append(book_id)
             conn.commit()
-            return cursor.rowcount > 0
+
+        self._notify(BOOK_DELETED, deleted)
+        return deleted
 
     def get_book(self, book_id: int) -> Optional[Dict[str, Any]]:
         """Получает информацию о книге по ID"""
         with self.connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT b.*, g.name as genre_name 
+            cursor.execute(f'''
+                SELECT {BOOK_COLUMNS}
                 FROM books b
                 LEFT JOIN genres g ON b.genre_id = g.id
                 WHERE b.id = ?
@@ -165,68 +615,609 @@ class Database:
                 return dict(row)
             return None
 
-    def get_all_books(self, search_text: str = "") -> List[Dict[str, Any]]:
-        """Получает список всех книг с возможностью поиска"""
+    def get_all_books(self, search_text: str = "", limit: Optional[int] = None,
+                      offset: int = 0) -> List[Dict[str, Any]]:
+        """Получает список всех книг с возможностью поиска (или его часть при limit)"""
         with self.connect() as conn:
             cursor = conn.cursor()
+            page = (limit if limit is not None else -1, offset)
 
-            if search_text:
-                search_pattern = f"%{search_text}%"
-                cursor.execute('''
-                    SELECT b.*, g.name as genre_name 
-                    FROM books b
+            match_query = self._fts_query(search_text)
+            if match_query:
+                # Полнотекстовый поиск, результаты упорядочены по релевантности (bm25)
+                cursor.execute(f'''
+                    SELECT {BOOK_LIST_COLUMNS}
+                    FROM books_fts
+                    JOIN books b ON b.id = books_fts.rowid
                     LEFT JOIN genres g ON b.genre_id = g.id
-                    WHERE b.title LIKE ? OR b.author LIKE ?
-                    ORDER BY b.created_at DESC
-                ''', (search_pattern, search_pattern))
+                    WHERE books_fts MATCH ?
+                    ORDER BY rank
+                    LIMIT ? OFFSET ?
+                ''', (match_query, *page))
             else:
-                cursor.execute('''
-                    SELECT b.*, g.name as genre_name 
+                cursor.execute(f'''
+                    SELECT {BOOK_LIST_COLUMNS}
                     FROM books b
                     LEFT JOIN genres g ON b.genre_id = g.id
                     ORDER BY b.created_at DESC
-                ''')
+                    LIMIT ? OFFSET ?
+                ''', page)
 
             return [dict(row) for row in cursor.fetchall()]
 
+    def get_books_page(self, search_text: str = "", sort: Sequence[Tuple[str, bool]] = (),
+                       after: Optional[tuple] = None, limit: int = 500,
+                       filters: Optional[Dict[str, Iterable]] = None
+                       ) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+        """Страница списка книг после курсора after; возвращает (книги, курсор следующей страницы)
+
+        sort — ключи сортировки [(колонка из SORT_COLUMNS, по убыванию), ...]
+        в порядке старшинства; при равенстве всех ключей книги упорядочены
+        по id в направлении последнего ключа. Пустые значения идут первыми
+        по возрастанию и последними по убыванию. Без ключей порядок как в
+        get_all_books: по релевантности при поиске, иначе новые сверху.
+        filters — фасетные фильтры {фильтр из FACET_COLUMNS: выбранные значения}.
+        Поиск, фильтры и сортировка выполняются одним запросом. Курсор — значения
+        ключей и id последней книги страницы, None — страниц больше нет.
+        Каждая страница читается поиском по индексу от курсора, поэтому ее
+        стоимость не зависит от того, как далеко пролистан список.
+        """
+        match_query = self._fts_query(search_text)
+        if match_query and not sort:
+            return self._get_relevance_page(match_query, after, limit, filters)
+        sort = self._sort_keys(sort)
+
+        query = f"SELECT {BOOK_LIST_COLUMNS} FROM books b LEFT JOIN genres g ON b.genre_id = g.id WHERE "
+        books = []
+        with self.connect() as conn:
+            conditions, filter_params = self._filter_conditions(conn, filters, limit, bool(match_query))
+            if match_query:
+                conditions.append("b.id IN (SELECT rowid FROM books_fts WHERE books_fts MATCH ?)")
+                filter_params.append(match_query)
+
+            # Части выборки идут подряд в порядке сортировки; следующая
+            # читается, только если предыдущей не хватило на страницу
+            for condition, params, order in self._page_segments(sort, after):
+                rows = conn.execute(
+                    query + ' AND '.join(conditions + [condition]) + f" ORDER BY {order} LIMIT ?",
+                    (*filter_params, *params, limit - len(books))
+                ).fetchall()
+                books.extend(dict(row) for row in rows)
+                if len(books) >= limit:
+                    last = books[-1]
+                    return books, tuple(last[column] for column, _ in sort) + (last['id'],)
+        return books, None
+
+    @staticmethod
+    def _sort_keys(sort: Sequence[Tuple[str, bool]]) -> List[Tuple[str, bool]]:
+        """Ключи сортировки без повторов; ключи после id ничего не меняют и отбрасываются"""
+        keys = []
+        for column, descending in sort or [(DEFAULT_SORT_COLUMN, True)]:
+            if column not in SORT_COLUMNS:
+                raise ValueError(f"Нельзя сортировать по колонке {column}")
+            if column not in (key for key, _ in keys):
+                keys.append((column, bool(descending)))
+            if column == 'id':
+                break
+        return keys
+
+    @staticmethod
+    def _page_segments(sort: List[Tuple[str, bool]], after: Optional[tuple]) -> List[tuple]:
+        """Части выборки после курсора: (условие, параметры, ORDER BY) в порядке сортировки
+
+        Условие вида (a, b, id) > (?, ?, ?) SQLite ищет в индексе только по
+        первой колонке и просматривает все книги с тем же значением до
+        курсора. Поэтому курсор разбивается на части: «все ключи те же, id
+        дальше», затем для каждого ключа с последнего по первый — «старшие
+        ключи те же, этот ключ дальше». Каждая часть — поиск по индексу.
+        """
+        def order_from(position: int) -> str:
+            terms = [f"{SORT_COLUMNS[column][0]} {'DESC' if descending else 'ASC'}"
+                     for column, descending in sort[position:] if column != 'id']
+            return ', '.join(terms + [f"b.id {'DESC' if sort[-1][1] else 'ASC'}"])
+
+        if after is None:
+            # Младшие ключи упорядочивает сам ORDER BY, а книги без значения
+            # старшего ключа выбираются отдельно — для жанра это позволяет
+            # перебирать жанры по индексу имен
+            column, descending = sort[0]
+            _, null_sql, present_sql = SORT_COLUMNS[column]
+            if null_sql is None:
+                return [('1', (), order_from(0))]
+            nulls = [(null_sql, (), order_from(1))]
+            values = [(present_sql, (), order_from(0))]
+            return values + nulls if descending else nulls + values
+
+        def equal(position: int):
+            """Условие «ключи до position совпадают с курсором»"""
+            conditions, params = [], []
+            for (column, _), value in zip(sort[:position], after):
+                value_sql, null_sql, _ = SORT_COLUMNS[column]
+                if value is None:
+                    conditions.append(null_sql)
+                else:
+                    conditions.append(f"{value_sql} = ?")
+                    params.append(value)
+            return conditions, params
+
+        # Все ключи совпадают: дальше по id (если id сам не последний ключ)
+        segments = []
+        if sort[-1][0] != 'id':
+            conditions, params = equal(len(sort))
+            conditions.append(f"b.id {'<' if sort[-1][1] else '>'} ?")
+            segments.append((' AND '.join(conditions), tuple(params + [after[-1]]), order_from(len(sort))))
+
+        for position in range(len(sort) - 1, -1, -1):
+            column, descending = sort[position]
+            value_sql, null_sql, present_sql = SORT_COLUMNS[column]
+            value = after[position]
+            beyond = '<' if descending else '>'
+            prefix, params = equal(position)
+            order = order_from(position)
+
+            # Пустые значения SQLite считает наименьшими
+            if value is not None:
+                segments.append((' AND '.join(prefix + [f"{value_sql} {beyond} ?"]),
+                                 tuple(params + [value]), order))
+                if descending and null_sql:
+                    segments.append((' AND '.join(prefix + [null_sql]), tuple(params), order_from(position + 1)))
+            elif not descending:
+                segments.append((' AND '.join(prefix + [present_sql or '1']), tuple(params), order))
+        return segments
+
+    def _get_relevance_page(self, match_query: str, after: Optional[tuple], limit: int,
+                            filters: Optional[Dict[str, Iterable]]
+                            ) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+        """Страница результатов поиска по релевантности; курсор — (bm25, id)"""
+        with self.connect() as conn:
+            conditions, params = self._filter_conditions(conn, filters, limit, True)
+            if after is not None:
+                conditions.append("(books_fts.rank, b.id) > (?, ?)")
+                params.extend(after)
+
+            # Сортируются только найденные строки
+            rows = conn.execute(f'''
+                SELECT {BOOK_LIST_COLUMNS}, books_fts.rank AS search_rank
+                FROM books_fts
+                JOIN books b ON b.id = books_fts.rowid
+                LEFT JOIN genres g ON b.genre_id = g.id
+                WHERE {' AND '.join(['books_fts MATCH ?'] + conditions)}
+                ORDER BY books_fts.rank, b.id
+                LIMIT ?
+            ''', (match_query, *params, limit)).fetchall()
+
+        books = [dict(row) for row in rows]
+        if len(books) < limit:
+            return books, None
+        return books, (books[-1]['search_rank'], books[-1]['id'])
+
+    def get_book_row(self, book_id: int, search_text: str = "",
+                     filters: Optional[Dict[str, Iterable]] = None) -> Optional[Dict[str, Any]]:
+        """Получает строку списка для одной книги, если она подходит под поиск и фильтры"""
+        with self.connect() as conn:
+            conditions, params = self._filter_conditions(conn, filters, searching=True)
+            match_query = self._fts_query(search_text)
+            if match_query:
+                conditions.append("b.id IN (SELECT rowid FROM books_fts WHERE books_fts MATCH ?)")
+                params.append(match_query)
+            row = conn.execute(f'''
+                SELECT {BOOK_LIST_COLUMNS}
+                FROM books b
+                LEFT JOIN genres g ON b.genre_id = g.id
+                WHERE {' AND '.join(['b.id = ?'] + conditions)}
+            ''', (book_id, *params)).fetchone()
+            return dict(row) if row else None
+
+    def count_books(self, search_text: str = "", filters: Optional[Dict[str, Iterable]] = None) -> int:
+        """Возвращает количество книг, подходящих под поиск и фильтры"""
+        with self.connect() as conn:
+            match_query = self._fts_query(search_text)
+            conditions, params = self._filter_conditions(conn, filters, searching=bool(match_query))
+            if match_query and not conditions:
+                row = conn.execute(
+                    "SELECT COUNT(*) FROM books_fts WHERE books_fts MATCH ?", (match_query,)
+                ).fetchone()
+            elif conditions:
+                if match_query:
+                    conditions.append("b.id IN (SELECT rowid FROM books_fts WHERE books_fts MATCH ?)")
+                    params.append(match_query)
+                row = conn.execute(
+                    f"SELECT COUNT(*) FROM books b WHERE {' AND '.join(conditions)}", params
+                ).fetchone()
+            else:
+                # Число книг поддерживается триггерами статистики, подсчет не нужен
+                row = conn.execute("SELECT total FROM stats_totals").fetchone()
+            return row[0]
+
+    def find_book_ids(self, search_text: str) -> Optional[List[int]]:
+        """ID книг, подходящих под поиск; None — в строке поиска нет слов"""
+        match_query = self._fts_query(search_text)
+        if not match_query:
+            return None
+        with self.connect() as conn:
+            # Одной строкой: это быстрее, чем строка результата на каждую книгу
+            ids = conn.execute(
+                "SELECT group_concat(rowid) FROM books_fts WHERE books_fts MATCH ?", (match_query,)
+            ).fetchone()[0]
+        return [int(book_id) for book_id in ids.split(',')] if ids else []
+
+    def _filter_conditions(self, conn: sqlite3.Connection, filters: Optional[Dict[str, Iterable]],
+                           limit: Optional[int] = None,
+                           searching: bool = False) -> Tuple[List[str], List[Any]]:
+        """Условия WHERE для фасетных фильтров: (условия, параметры)
+
+        Без собранной статистики SQLite берет индекс первого подходящего
+        фильтра и сортирует все найденные им строки. Поэтому по индексу
+        ищется только фильтр, который по счетчикам stats_counts отбирает
+        меньше всего книг, остальные проверяются построчно (унарный +
+        запрещает индекс). Для страницы из limit книг и этот индекс не
+        нужен, если подходящих книг много: идя по индексу сортировки, до
+        конца страницы придется просмотреть около limit * всего / подходящих
+        строк, а это дешевле, чем найти и отсортировать все подходящие.
+        Без limit (для подсчета) индекс берется всегда. При поиске
+        (searching) книги отбирает полнотекстовый индекс.
+        """
+        filters = {facet: set(values) for facet, values in (filters or {}).items() if values}
+        for facet in filters:
+            if facet not in FACET_COLUMNS:
+                raise ValueError(f"Нельзя фильтровать по {facet}")
+        if not filters:
+            return [], []
+
+        indexed = None
+        if not searching:
+            total, fractions = self._facet_fractions(conn, filters)
+            matches = total
+            for fraction in fractions.values():
+                matches *= fraction
+            # Строка, просмотренная в индексе, в несколько раз дешевле найденной и отсортированной
+            if limit is None or 4 * matches * matches < limit * total:
+                indexed = min(fractions, key=fractions.get)
+
+        conditions, params = [], []
+        for facet in FACET_COLUMNS:
+            if facet in filters:
+                condition, values = self._facet_condition(facet, filters[facet], facet == indexed)
+                if facet == indexed and limit is not None:
+                    # Подзапросом: иначе SQLite может предпочесть индекс сортировки
+                    condition = f"b.id IN (SELECT b.id FROM books b WHERE {condition})"
+                conditions.append(condition)
+                params.extend(values)
+        return conditions, params
+
+    @staticmethod
+    def _facet_fractions(conn: sqlite3.Connection,
+                         filters: Dict[str, set]) -> Tuple[int, Dict[str, float]]:
+        """Число книг и доля книг, проходящих каждый фильтр, по счетчикам stats_counts
+
+        Счетчиков по объему нет: книги выбранных диапазонов считаются по
+        индексу объема, не читая строк таблицы.
+        """
+        total = conn.execute("SELECT total FROM stats_totals").fetchone()[0]
+        fractions = {}
+        for facet, values in filters.items():
+            if not total:
+                fractions[facet] = 1.0
+                continue
+            if facet == 'pages':
+                # Каждый диапазон отдельно: для OR нескольких диапазонов SQLite
+                # собрал бы все найденные id в множество
+                count = 0
+                for value in values:
+                    condition, params = Database._facet_condition(facet, {value}, True)
+                    count += conn.execute(f"SELECT COUNT(*) FROM books b WHERE {condition}", params).fetchone()[0]
+                fractions[facet] = count / total
+                continue
+            counts = {row[0]: row[1] for row in conn.execute(
+                "SELECT value, count FROM stats_counts WHERE dimension = ?", (facet,)
+            )}
+            # Книги без значения в счетчики не попадают
+            counts[None] = total - sum(counts.values())
+            fractions[facet] = sum(counts.get(value, 0) for value in values) / total
+        return total, fractions
+
+    @staticmethod
+    def _facet_condition(facet: str, values: set, indexed: bool) -> Tuple[str, List[Any]]:
+        """Условие «значение колонки фильтра — одно из выбранных» и его параметры"""
+        column = ('b.' if indexed else '+b.') + FACET_COLUMNS[facet]
+        terms, params = [], []
+        known = sorted(value for value in values if value is not None)
+        if facet == 'pages':
+            for value in known:
+                if not 0 <= value < len(PAGE_RANGES):
+                    raise ValueError(f"Нет диапазона объема с номером {value}")
+                low, high = PAGE_RANGES[value]
+                if high is None:
+                    terms.append(f"{column} >= ?")
+                    params.append(low)
+                else:
+                    terms.append(f"{column} >= ? AND {column} < ?")
+                    params.extend((low, high))
+            if None in values:
+                terms.append(f"{column} IS NULL OR {column} < {PAGE_RANGES[0][0]}")
+        else:
+            if known:
+                terms.append(f"{column} IN ({', '.join('?' * len(known))})")
+                params.extend(known)
+            if None in values:
+                terms.append(f"{column} IS NULL")
+        return f"({' OR '.join(terms)})", params
+
+    @staticmethod
+    def _fts_query(search_text: str) -> str:
+        """Превращает строку поиска в запрос FTS5: каждое слово ищется как префикс"""
+        words = re.findall(r'\w+', search_text.replace('ё', 'е').replace('Ё', 'Е'))
+        return ' '.join(f'"{word}"*' for word in words)
+
+    # --- Справочник жанров ---
+
+    def _genre_cache(self) -> Dict[str, Any]:
+        """Возвращает кеш жанров: список по алфавиту и словари имя→ID и ID→имя"""
+        with self._genres_lock:
+            if self._genres is not None:
+                return self._genres
+
+            conn = self.connect()
+            genres = [dict(row) for row in conn.execute("SELECT * FROM genres ORDER BY name")]
+            cache = {
+                'list': genres,
+                'by_name': {genre['name']: genre['id'] for genre in genres},
+                'by_id': {genre['id']: genre['name'] for genre in genres},
+            }
+            # В незавершенной транзакции могут быть незафиксированные жанры:
+            # такой снимок используется, но не запоминается
+            if not conn.in_transaction:
+                self._genres = cache
+            return cache
+
+    def invalidate_genres(self):
+        """Сбрасывает кеш жанров; он будет загружен заново при следующем обращении"""
+        with self._genres_lock:
+            self._genres = None
+
+    def _resolve_genre(self, cursor: sqlite3.Cursor, name: Optional[str]) -> Optional[int]:
+        """Возвращает ID жанра по имени, создавая новый жанр в текущей транзакции"""
+        if not name:
+            return None
+
+        genre_id = self._genre_cache()['by_name'].get(name)
+        if genre_id is None:
+            cursor.execute("INSERT OR IGNORE INTO genres (name) VALUES (?)", (name,))
+            if cursor.rowcount > 0:
+                # Кеш сбрасывается после фиксации, в _release_genre_changes
+                self._local.genres_created = True
+            cursor.execute("SELECT id FROM genres WHERE name = ?", (name,))
+            genre_id = cursor.fetchone()['id']
+        return genre_id
+
+    def _release_genre_changes(self):
+        """Сбрасывает кеш жанров, если текущий поток создавал жанры"""
+        if getattr(self._local, 'genres_created', False):
+            self._local.genres_created = False
+            self.invalidate_genres()
+
+    def add_genre(self, name: str) -> int:
+        """Добавляет пользовательский жанр (если его еще нет), возвращает его ID"""
+        name = name.strip()
+        if not name:
+            raise ValueError("Название жанра не может быть пустым")
+
+        with self.connect() as conn:
+            genre_id = self._resolve_genre(conn.cursor(), name)
+            conn.commit()
+
+        self._release_genre_changes()
+        return genre_id
+
+    def get_genre_id(self, name: str) -> Optional[int]:
+        """Возвращает ID жанра по названию"""
+        return self._genre_cache()['by_name'].get(name)
+
+    def get_genre_name(self, genre_id: int) -> Optional[str]:
+        """Возвращает название жанра по ID"""
+        return self._genre_cache()['by_id'].get(genre_id)
+
     def get_all_genres(self) -> List[Dict[str, Any]]:
         """Получает список всех жанров"""
+        return [dict(genre) for genre in self._genre_cache()['list']]
+
+    @staticmethod
+    def _session_row(book_id: int, pages: int, duration: int = 0,
+                     started_at: Optional[datetime] = None) -> Tuple[int, int, int, int, int]:
+        """Строка reading_sessions; started_at — местное время начала (по умолчанию сейчас)"""
+        if pages < 0 or duration < 0:
+            raise ValueError("Страницы и длительность не могут быть отрицательными")
+        started_at = started_at or datetime.now()
+        day = started_at.date().toordinal() - _EPOCH_ORDINAL
+        return book_id, int(started_at.timestamp()), day, pages, duration
+
+    def log_reading_session(self, book_id: int, pages: int, duration: int = 0,
+                            started_at: Optional[datetime] = None) -> int:
+        """Записывает сессию чтения (страницы, длительность в секундах), возвращает ее ID"""
         with self.connect() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM genres ORDER BY name")
-            return [dict(row) for row in cursor.fetchall()]
+            cursor = conn.execute(_SESSION_INSERT, self._session_row(book_id, pages, duration, started_at))
+            return cursor.lastrowid
+
+    def log_reading_sessions(self, sessions: Iterable[Tuple[int, int, int, Optional[datetime]]]) -> int:
+        """Записывает сессии (book_id, pages, duration, started_at) одной транзакцией"""
+        with self.connect() as conn:
+            cursor = conn.executemany(_SESSION_INSERT, (self._session_row(*session) for session in sessions))
+            return cursor.rowcount
+
+    def get_reading_sessions(self, book_id: Optional[int] = None, start: Optional[datetime] = None,
+                             end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Сессии чтения книги и/или за период [start, end), от последней к первой"""
+        conditions, params = [], []
+        if book_id is not None:
+            conditions.append("book_id = ?")
+            params.append(book_id)
+        if start is not None:
+            conditions.append("started_at >= ?")
+            params.append(int(start.timestamp()))
+        if end is not None:
+            conditions.append("started_at < ?")
+            params.append(int(end.timestamp()))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self.connect() as conn:
+            rows = conn.execute(f'''
+                SELECT id, book_id, started_at, pages, duration
+                FROM reading_sessions
+                {where}
+                ORDER BY started_at DESC
+            ''', params).fetchall()
+        return [
+            {'id': row['id'], 'book_id': row['book_id'],
+             'started_at': datetime.fromtimestamp(row['started_at']),
+             'pages': row['pages'], 'duration': row['duration']}
+            for row in rows
+        ]
+
+    def get_daily_reading(self, start: date, end: date) -> List[Dict[str, Any]]:
+        """Итоги чтения по дням за [start, end] из предагрегированной таблицы; дни без чтения пропущены"""
+        with self.connect() as conn:
+            rows = conn.execute('''
+                SELECT day, sessions, pages, duration
+                FROM reading_daily
+                WHERE day BETWEEN ? AND ?
+                ORDER BY day
+            ''', (start.toordinal() - _EPOCH_ORDINAL, end.toordinal() - _EPOCH_ORDINAL)).fetchall()
+        return [
+            {'day': date.fromordinal(row['day'] + _EPOCH_ORDINAL), 'sessions': row['sessions'],
+             'pages': row['pages'], 'duration': row['duration']}
+            for row in rows
+        ]
+
+    def get_reading_streak(self, today: Optional[date] = None) -> int:
+        """Сколько дней подряд были сессии чтения, заканчивая сегодня (или вчера)"""
+        today_day = (today or date.today()).toordinal() - _EPOCH_ORDINAL
+        streak = 0
+        with self.connect() as conn:
+            # Просматриваются только дни серии, от последнего назад
+            rows = conn.execute("SELECT day FROM reading_daily WHERE day <= ? ORDER BY day DESC", (today_day,))
+            expected = None
+            for (day,) in rows:
+                if expected is None:
+                    if day < today_day - 1:
+                        break
+                elif day != expected:
+                    break
+                streak += 1
+                expected = day - 1
+        return streak
+
+    def get_book_progress(self, book_id: int) -> Dict[str, Any]:
+        """Прогресс чтения книги по сессиям: страницы, доля от объема, время, последнее чтение"""
+        with self.connect() as conn:
+            row = conn.execute('''
+                SELECT COUNT(*) AS sessions, COALESCE(SUM(pages), 0) AS pages_read,
+                       COALESCE(SUM(duration), 0) AS duration, MAX(started_at) AS last_read,
+                       (SELECT pages FROM books WHERE id = ?) AS pages
+                FROM reading_sessions
+                WHERE book_id = ?
+            ''', (book_id, book_id)).fetchone()
+
+        pages = row['pages'] or 0
+        return {
+            'sessions': row['sessions'],
+            'pages_read': row['pages_read'],
+            'pages': pages,
+            'percent': min(100, round(row['pages_read'] * 100 / pages)) if pages > 0 else None,
+            'duration': row['duration'],
+            'last_read': datetime.fromtimestamp(row['last_read']) if row['last_read'] is not None else None,
+        }
 
     def get_statistics(self) -> Dict[str, Any]:
-        """Получает статистику по книгам"""
+        """Получает статистику по книгам из материализованных агрегатов"""
+        stats = self.get_statistics_totals()
+        stats.update(self.get_statistics_section('genres'))
+        stats.update(self.get_statistics_section('ratings'))
+        stats.update(self.get_statistics_section('monthly'))
+        stats['yearly_stats'] = [{'year': item['value'], 'count': item['count']}
+                                 for item in self._get_stats_counts('year')]
+        return stats
+
+    def get_statistics_totals(self) -> Dict[str, Any]:
+        """Общие показатели статистики и ее версия"""
         with self.connect() as conn:
-            cursor = conn.cursor()
+            totals = conn.execute("SELECT * FROM stats_totals").fetchone()
+        status_counts = {item['value']: item['count'] for item in self._get_stats_counts('status')}
+        avg_rating = totals['rating_sum'] / totals['rated_count'] if totals['rated_count'] else 0
+
+        return {
+            'total': totals['total'],
+            'read_count': status_counts.get('Прочитано', 0),
+            'reading_count': status_counts.get('Читаю', 0),
+            'wishlist_count': status_counts.get('Хочу прочитать', 0),
+            'avg_rating': round(avg_rating, 2) if avg_rating else 0,
+            'total_pages': totals['total_pages'],
+            'version': totals['version']
+        }
+
+    def get_statistics_section(self, section: str) -> Dict[str, Any]:
+        """Раздел статистики по имени из STATISTICS_SECTIONS, в формате get_statistics"""
+        if section == 'totals':
+            return self.get_statistics_totals()
+
+        if section == 'genres':
+            genre_names = self._genre_cache()['by_id']
+            genres_stats = [
+                {'genre': genre_names.get(item['value']), 'count': item['count']}
+                for item in self._get_stats_counts('genre') if item['value'] in genre_names
+            ]
+            genres_stats.sort(key=lambda item: item['count'], reverse=True)
+            return {'genres_stats': genres_stats}
 
-            # Общая статистика
-            cursor.execute("SELECT COUNT(*) as total FROM books")
-            total = cursor.fetchone()['total']
+        if section == 'ratings':
+            return {'ratings_stats': [{'rating': item['value'], 'count': item['count']}
+                                      for item in self._get_stats_counts('rating')]}
 
-            cursor.execute("SELECT COUNT(*) as read_count FROM books WHERE status = 'Прочитано'")
-            read_count = cursor.fetchone()['read_count']
+        if section == 'monthly':
+            return {'monthly_stats': [{'month': item['value'], 'count': item['count']}
+                                      for item in self._get_stats_counts('month')]}
 
-            cursor.execute("SELECT COUNT(*) as reading_count FROM books WHERE status = 'Читаю'")
-            reading_count = cursor.fetchone()['reading_count']
+        raise ValueError(f"Неизвестный раздел статистики: {section}")
 
-            cursor.execute("SELECT COUNT(*) as wishlist_count FROM books WHERE status = 'Хочу прочитать'")
-            wishlist_count = cursor.fetchone()['wishlist_count']
+    def _get_stats_counts(self, dimension: str) -> List[Dict[str, Any]]:
+        """Счетчики одного измерения статистики, по возрастанию значения"""
+        with self.connect() as conn:
+            return [
+                {'value': row['value'], 'count': row['count']}
+                for row in conn.execute(
+                    "SELECT value, count FROM stats_counts WHERE dimension = ? ORDER BY value",
+                    (dimension,)
+                )
+            ]
 
-            cursor.execute("SELECT AVG(rating) as avg_rating FROM books WHERE rating IS NOT NULL")
-            avg_rating = cursor.fetchone()['avg_rating'] or 0
+    def get_statistics_version(self) -> int:
+        """Возвращает номер версии статистики, который растет при каждом изменении книг"""
+        with self.connect() as conn:
+            return conn.execute("SELECT version FROM stats_totals").fetchone()[0]
 
-            cursor.execute("SELECT SUM(pages) as total_pages FROM books WHERE pages > 0")
-            total_pages = cursor.fetchone()['total_pages'] or 0
+    def compute_statistics(self) -> Dict[str, Any]:
+        """Вычисляет статистику заново по таблице books, без материализованных агрегатов"""
+        with self.connect() as conn:
+            cursor = conn.cursor()
+
+            # Общие показатели за один проход по таблице
+            cursor.execute('''
+                SELECT COUNT(*) as total,
+                       COALESCE(SUM(status = 'Прочитано'), 0) as read_count,
+                       COALESCE(SUM(status = 'Читаю'), 0) as reading_count,
+                       COALESCE(SUM(status = 'Хочу прочитать'), 0) as wishlist_count,
+                       AVG(rating) as avg_rating,
+                       COALESCE(SUM(CASE WHEN pages > 0 THEN pages ELSE 0 END), 0) as total_pages
+                FROM books
+            ''')
+            totals = dict(cursor.fetchone())
+            avg_rating = totals['avg_rating'] or 0
 
             # Статистика по жанрам
             cursor.execute('''
                 SELECT g.name as genre, COUNT(b.id) as count
                 FROM genres g
-                LEFT JOIN books b ON g.id = b.genre_id
+                JOIN books b ON g.id = b.genre_id
                 GROUP BY g.name
-                HAVING COUNT(b.id) > 0
                 ORDER BY count DESC
             ''')
             genres_stats = [dict(row) for row in cursor.fetchall()]
@@ -243,64 +1234,257 @@ class Database:
 
             # Книги по месяцам
             cursor.execute('''
-                SELECT strftime('%Y-%m', finish_date) as month, COUNT(*) as count
+                SELECT finish_month as month, COUNT(*) as count
                 FROM books
-                WHERE finish_date IS NOT NULL
-                GROUP BY strftime('%Y-%m', finish_date)
-                ORDER BY month
+                WHERE finish_month IS NOT NULL
+                GROUP BY finish_month
+                ORDER BY finish_month
             ''')
             monthly_stats = [dict(row) for row in cursor.fetchall()]
 
             # Книги по годам
             cursor.execute('''
-                SELECT strftime('%Y', finish_date) as year, COUNT(*) as count
+                SELECT finish_year as year, COUNT(*) as count
                 FROM books
-                WHERE finish_date IS NOT NULL
-                GROUP BY strftime('%Y', finish_date)
-                ORDER BY year
+                WHERE finish_year IS NOT NULL
+                GROUP BY finish_year
+                ORDER BY finish_year
             ''')
             yearly_stats = [dict(row) for row in cursor.fetchall()]
 
             return {
-                'total': total,
-                'read_count': read_count,
-                'reading_count': reading_count,
-                'wishlist_count': wishlist_count,
+                'total': totals['total'],
+                'read_count': totals['read_count'],
+                'reading_count': totals['reading_count'],
+                'wishlist_count': totals['wishlist_count'],
                 'avg_rating': round(avg_rating, 2) if avg_rating else 0,
-                'total_pages': total_pages,
+                'total_pages': totals['total_pages'],
                 'genres_stats': genres_stats,
                 'ratings_stats': ratings_stats,
                 'monthly_stats': monthly_stats,
                 'yearly_stats': yearly_stats
             }
 
-    def export_to_csv(self, file_path: str) -> bool:
-        """Экспортирует данные в CSV файл"""
+    def rebuild_statistics(self):
+        """Перестраивает материализованную статистику по таблице books"""
+        with self.connect() as conn:
+            fill_statistics(conn)
+
+    def check_statistics(self, repair: bool = False) -> Dict[str, Any]:
+        """Сверяет материализованную статистику с вычисленной заново
+
+        Возвращает расхождения в виде {показатель: (сохранено, вычислено)};
+        при repair=True агрегаты с расхождениями перестраиваются.
+        """
+        stored = self.get_statistics()
+        fresh = self.compute_statistics()
+
+        differences = {}
+        for key, value in fresh.items():
+            if isinstance(value, list):
+                # Списки сравниваются как словари {значение: количество},
+                # порядок книг с равным количеством не важен
+                label = _STATS_LIST_LABELS[key]
+                stored_value = {item[label]: item['count'] for item in stored[key]}
+                value = {item[label]: item['count'] for item in value}
+            else:
+                stored_value = stored[key]
+            if stored_value != value:
+                differences[key] = (stored_value, value)
+
+        if differences and repair:
+            self.rebuild_statistics()
+        return differences
+
+    def export_to_csv(self, file_path: str, compress: Optional[bool] = None,
+                      progress: Optional[Callable[[int, int], None]] = None,
+                      batch_size: int = 1000) -> bool:
+        """Экспортирует данные в CSV файл, потоково и с постоянным расходом памяти
+
+        compress — сжимать ли gzip (по умолчанию — если имя оканчивается на .gz);
+        progress(записано, всего) вызывается после каждой порции строк.
+        """
+        if compress is None:
+            compress = file_path.lower().endswith('.gz')
+
+        # Файл пишется под временным именем и заменяет целевой только целиком
+        part_path = file_path + '.part'
         try:
-            import csv
-            books = self.get_all_books()
-
-            with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['id', 'title', 'author', 'genre', 'status',
-                              'start_date', 'finish_date', 'rating', 'pages', 'review']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-                writer.writeheader()
-                for book in books:
-                    writer.writerow({
-                        'id': book['id'],
-                        'title': book['title'],
-                        'author': book['author'],
-                        'genre': book.get('genre_name', ''),
-                        'status': book['status'],
-                        'start_date': book['start_date'],
-                        'finish_date': book['finish_date'],
-                        'rating': book['rating'] or '',
-                        'pages': book['pages'] or 0,
-                        'review': book['review'] or ''
-                    })
+            with self.connect() as conn:
+                total = conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
 
+                # Только экспортируемые колонки, без обложек, уже в виде значений CSV
+                cursor = conn.execute('''
+                    SELECT b.id, b.title, b.author, COALESCE(g.name, ''), b.status,
+                           b.start_date, b.finish_date, COALESCE(b.rating, ''),
+                           COALESCE(b.pages, 0), COALESCE(b.review, '')
+                    FROM books b
+                    LEFT JOIN genres g ON b.genre_id = g.id
+                    ORDER BY b.created_at DESC
+                ''')
+
+                if compress:
+                    csvfile = gzip.open(part_path, 'wt', compresslevel=6, newline='', encoding='utf-8')
+                else:
+                    csvfile = open(part_path, 'w', newline='', encoding='utf-8',
+                                   buffering=EXPORT_BUFFER_SIZE)
+                with csvfile:
+                    writer = csv.writer(csvfile)
+                    writer.writerow(CSV_FIELDS)
+
+                    written = 0
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        writer.writerows(rows)
+                        written += len(rows)
+                        if progress:
+                            progress(written, total)
+
+            os.replace(part_path, file_path)
             return True
         except Exception as e:
             print(f"Error exporting to CSV: {e}")
-            return False
\ No newline at end of file
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            return False
+
+    @staticmethod
+    def _parse_import_row(row: Dict[str, str]) -> tuple:
+        """Проверяет строку CSV и возвращает значения (жанр отдельно); ValueError при ошибке"""
+        title = (row.get('title') or '').strip()
+        author = (row.get('author') or '').strip()
+        if not title or not author:
+            raise ValueError("не указано название или автор")
+
+        status = (row.get('status') or '').strip()
+        if status not in BOOK_STATUSES:
+            raise ValueError(f"неизвестный статус «{status}»")
+
+        dates = []
+        for key in ('start_date', 'finish_date'):
+            value = (row.get(key) or '').strip()
+            if value and not _DATE_RE.match(value):
+                raise ValueError(f"дата {key} не в формате ГГГГ-ММ-ДД: «{value}»")
+            dates.append(value or None)
+
+        rating = (row.get('rating') or '').strip()
+        pages = (row.get('pages') or '').strip()
+        try:
+            rating = int(rating) if rating else None
+            pages = int(pages) if pages else 0
+        except ValueError:
+            raise ValueError("оценка и количество страниц должны быть числами")
+        if rating is not None and not 1 <= rating <= 5:
+            raise ValueError(f"оценка вне диапазона 1–5: {rating}")
+        if pages < 0:
+            raise ValueError(f"отрицательное количество страниц: {pages}")
+
+        return (title, author, (row.get('genre') or '').strip(), status,
+                dates[0], dates[1], rating, row.get('review') or '', pages)
+
+    def import_from_csv(self, file_path: str,
+                        progress: Optional[Callable[[int, int], None]] = None,
+                        batch_size: int = 5000) -> Dict[str, Any]:
+        """Импортирует книги из CSV в формате export_to_csv (в том числе .gz)
+
+        Файл читается потоково, порциями по batch_size строк; все книги
+        добавляются в одной транзакции. Строки с ошибками пропускаются и
+        попадают в отчет, ошибки чтения файла и базы отменяют импорт целиком.
+        progress(прочитано байт, размер файла) вызывается после каждой порции.
+        Возвращает {'imported': добавлено, 'skipped': пропущено,
+        'errors': [(номер строки, описание), ...]}.
+        """
+        total_bytes = os.path.getsize(file_path)
+        imported = 0
+        skipped = 0
+        errors = []
+
+        with open(file_path, 'rb') as raw:
+            stream = gzip.GzipFile(fileobj=raw) if file_path.lower().endswith('.gz') else raw
+            # utf-8-sig: файлы из табличных редакторов часто начинаются с BOM
+            reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+            missing = {'title', 'author', 'status'} - set(reader.fieldnames or [])
+            if missing:
+                raise ValueError(f"В файле нет колонок: {', '.join(sorted(missing))}")
+
+            conn = self.connect()
+            pragmas = {name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+                       for name in ('synchronous', 'cache_size', 'temp_store')}
+            # Одна большая транзакция: крупный кеш страниц, временные данные в памяти,
+            # без fsync после каждой страницы журнала
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA cache_size = -65536")
+            conn.execute("PRAGMA temp_store = MEMORY")
+            try:
+                with conn:
+                    # Явный BEGIN: удаление триггеров ниже должно откатываться вместе с импортом
+                    conn.execute("BEGIN")
+                    last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM books").fetchone()[0]
+                    genre_ids = dict(self._genre_cache()['by_name'])
+
+                    # Индекс поиска и статистика достраиваются в конце одним проходом,
+                    # а не триггерами на каждую строку
+                    placeholders = ', '.join('?' * len(_BULK_SUSPENDED_TRIGGERS))
+                    suspended = conn.execute(
+                        f"SELECT type, name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+                        _BULK_SUSPENDED_TRIGGERS
+                    ).fetchall()
+                    # В пустую библиотеку быстрее вставить строки без индексов и построить их один раз
+                    if not conn.execute("SELECT EXISTS (SELECT 1 FROM books)").fetchone()[0]:
+                        suspended += conn.execute(
+                            "SELECT type, name, sql FROM sqlite_master "
+                            "WHERE type = 'index' AND tbl_name = 'books' AND sql IS NOT NULL"
+                        ).fetchall()
+                    for item in suspended:
+                        conn.execute(f"DROP {item['type'].upper()} {item['name']}")
+
+                    batch = []
+                    for row in reader:
+                        try:
+                            values = self._parse_import_row(row)
+                        except ValueError as e:
+                            skipped += 1
+                            if len(errors) < MAX_IMPORT_ERRORS:
+                                errors.append((reader.line_num, str(e)))
+                            continue
+
+                        # Жанры сопоставляются по имени в памяти, новые создаются
+                        genre = values[2]
+                        genre_id = genre_ids.get(genre) if genre else None
+                        if genre and genre_id is None:
+                            genre_id = genre_ids[genre] = self._resolve_genre(conn.cursor(), genre)
+                        batch.append(values[:2] + (genre_id,) + values[3:])
+
+                        if len(batch) >= batch_size:
+                            imported += self._insert_import_batch(conn, batch)
+                            batch = []
+                            if progress:
+                                progress(raw.tell(), total_bytes)
+
+                    imported += self._insert_import_batch(conn, batch)
+
+                    for item in suspended:
+                        conn.execute(item['sql'])
+                    fill_books_fts(conn, last_id)
+                    fill_statistics(conn)
+
+                    if progress:
+                        progress(total_bytes, total_bytes)
+            finally:
+                for name, value in pragmas.items():
+                    conn.execute(f"PRAGMA {name} = {value}")
+                self._release_genre_changes()
+
+        return {'imported': imported, 'skipped': skipped, 'errors': errors}
+
+    @staticmethod
+    def _insert_import_batch(conn: sqlite3.Connection, batch: List[tuple]) -> int:
+        """Добавляет порцию импортируемых книг одним executemany"""
+        conn.executemany('''
+            INSERT INTO books
+            (title, author, genre_id, status, start_date, finish_date, rating, review, pages)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+        return len(batch)
\ No newline at end of file
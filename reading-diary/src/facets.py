@@ -0,0 +1,168 @@
+"""Счетчики фасетных фильтров списка по битовым картам
+
+Для каждого значения фильтра (статус, жанр, оценка, год окончания,
+диапазон объема — см. FACET_COLUMNS) хранится битовая карта книг: целое
+Python, в котором установлены биты с номерами id книг. Книги, прошедшие
+фильтры, — пересечение объединений выбранных карт, счетчик значения —
+число единиц в пересечении его карты с остальными фильтрами
+(int.bit_count). Операции идут в C над машинными словами, без прохода по
+книгам: при 500 тыс. книг карта занимает около 62 КБ, а все счетчики
+пересчитываются за единицы миллисекунд.
+
+Карты строятся одним запросом на фильтр (GROUP BY по индексу колонки) и
+поддерживаются по уведомлениям об изменении книг (см. BookTracker в
+analytics.py).
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from analytics import BookTracker
+from database import FACET_COLUMNS, PAGE_RANGES
+
+# Номер диапазона объема из PAGE_RANGES (диапазоны идут подряд по возрастанию);
+# пусто, если объем не указан
+_PAGE_RANGE_SQL = 'CASE {} END'.format(' '.join(
+    f"WHEN pages >= {low} THEN {number}"
+    for number, (low, _) in reversed(list(enumerate(PAGE_RANGES)))
+))
+
+# Значение каждого фильтра в запросе к books
+_VALUE_SQL = dict(FACET_COLUMNS, pages=_PAGE_RANGE_SQL)
+
+_ONE = ord('1')
+
+
+def facet_index(db) -> 'FacetIndex':
+    """Общий индекс фильтров для базы (создается при первом обращении)"""
+    return FacetIndex.shared(db)
+
+
+def _parse_ids(text: Optional[str]) -> List[int]:
+    """ID книг из результата group_concat"""
+    return [int(book_id) for book_id in text.split(',')] if text else []
+
+
+def _bitmap(book_ids: Iterable[int]) -> int:
+    """Битовая карта книг с данными id
+
+    Биты собираются строкой из '0' и '1' и переводятся в число одним
+    вызовом int(..., 2) — это линейно, в отличие от сложения 1 << id.
+    """
+    book_ids = list(book_ids)
+    if not book_ids:
+        return 0
+    bits = bytearray(b'0') * (max(book_ids) + 1)
+    for book_id in book_ids:
+        bits[book_id] = _ONE
+    bits.reverse()
+    return int(bits, 2)
+
+
+def _intersection(bitmaps: List[int]) -> Optional[int]:
+    """Пересечение карт; None — ограничений нет (все книги)"""
+    result = None
+    for value in bitmaps:
+        result = value if result is None else result & value
+    return result
+
+
+class FacetIndex(BookTracker):
+    """Битовые карты значений фильтров и счетчики книг по ним
+
+    При refresh биты измененных книг снимаются со всех карт и ставятся
+    заново по перечитанным строкам.
+    """
+
+    def __init__(self, db):
+        super().__init__(db)
+        # Карты по фильтрам: {фильтр: {значение: карта}}; None — значение не указано
+        self.bitmaps: Dict[str, Dict[Any, int]] = {facet: {} for facet in FACET_COLUMNS}
+        self.book_count = 0
+        # Карта найденных книг последнего поиска: (текст поиска, карта или None)
+        self._search: Optional[Tuple[str, Optional[int]]] = None
+
+    def load(self, conn=None):
+        """Строит карты всех фильтров по таблице books"""
+        cursor = (conn or self.db.connect()).cursor()
+        cursor.row_factory = None
+        bitmaps = {}
+        for facet, value_sql in _VALUE_SQL.items():
+            # id всех книг с одним значением приходят одной строкой
+            cursor.execute(f"SELECT {value_sql} AS value, group_concat(id) FROM books GROUP BY value")
+            bitmaps[facet] = {value: _bitmap(_parse_ids(ids)) for value, ids in cursor.fetchall()}
+
+        self.bitmaps = bitmaps
+        # У каждой книги есть ровно одно значение статуса (в том числе None)
+        self.book_count = sum(value.bit_count() for value in bitmaps['status'].values())
+        self._search = None
+        self.loaded = True
+
+    def update(self, book_ids: Iterable[int], conn=None):
+        """Перечитывает изменившиеся книги и переставляет их биты"""
+        book_ids = list(book_ids)
+        if not book_ids:
+            return
+
+        cursor = (conn or self.db.connect()).cursor()
+        cursor.row_factory = None
+        cursor.execute(
+            f"SELECT id, {', '.join(_VALUE_SQL.values())} FROM books "
+            f"WHERE id IN ({', '.join('?' * len(book_ids))})", book_ids
+        )
+        rows = cursor.fetchall()
+
+        # Удаленные книги просто не вернутся из запроса
+        cleared = ~_bitmap(book_ids)
+        for position, facet in enumerate(_VALUE_SQL, 1):
+            added: Dict[Any, List[int]] = {}
+            for row in rows:
+                added.setdefault(row[position], []).append(row[0])
+
+            bitmaps = {value: bits & cleared for value, bits in self.bitmaps[facet].items()}
+            for value, ids in added.items():
+                bitmaps[value] = bitmaps.get(value, 0) | _bitmap(ids)
+            self.bitmaps[facet] = {value: bits for value, bits in bitmaps.items() if bits}
+
+        self.book_count = sum(value.bit_count() for value in self.bitmaps['status'].values())
+        self._search = None
+
+    def _book_count(self) -> int:
+        return self.book_count
+
+    def _search_bitmap(self, search_text: str) -> Optional[int]:
+        """Карта книг, найденных поиском (None — поиска нет); последний поиск запоминается"""
+        if self._search is None or self._search[0] != search_text:
+            book_ids = self.db.find_book_ids(search_text)
+            self._search = (search_text, None if book_ids is None else _bitmap(book_ids))
+        return self._search[1]
+
+    def counts(self, filters: Optional[Dict[str, Iterable]] = None,
+               search_text: str = "") -> Tuple[int, Dict[str, Dict[Any, int]]]:
+        """Число книг под поиском и фильтрами и счетчики значений каждого фильтра
+
+        Счетчик значения — сколько книг осталось бы, если бы в его фильтре
+        было выбрано только оно, а поиск и остальные фильтры не менялись.
+        """
+        with self._lock:
+            search = self._search_bitmap(search_text)
+            selected = {}
+            for facet, values in (filters or {}).items():
+                if values:
+                    union = 0
+                    for value in values:
+                        union |= self.bitmaps[facet].get(value, 0)
+                    selected[facet] = union
+
+            searched = [] if search is None else [search]
+            matched = _intersection(searched + list(selected.values()))
+            counts = {}
+            for facet, bitmaps in self.bitmaps.items():
+                base = matched
+                if facet in selected:
+                    base = _intersection(searched + [bits for other, bits in selected.items() if other != facet])
+                counts[facet] = {
+                    value: (bits if base is None else bits & base).bit_count()
+                    for value, bits in bitmaps.items()
+                }
+
+            total = self.book_count if matched is None else matched.bit_count()
+        return total, counts
\ No newline at end of file
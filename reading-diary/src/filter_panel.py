@@ -0,0 +1,139 @@
+from typing import Any, Dict
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtWidgets import QTreeWidget, QTreeWidgetItem
+
+from database import BOOK_STATUSES, FACET_COLUMNS, PAGE_RANGES
+
+# Заголовки фильтров в порядке показа
+FACET_TITLES = {
+    'status': "Статус",
+    'genre': "Жанр",
+    'rating': "Оценка",
+    'year': "Год окончания",
+    'pages': "Объем",
+}
+
+VALUE_ROLE = Qt.ItemDataRole.UserRole
+
+
+class FilterPanel(QObject):
+    """Фасетные фильтры в дереве: фильтры сверху, под ними значения с флажками
+
+    Рядом со значением показывается, сколько книг останется, если выбрать
+    его (счетчики FacetIndex.counts). Значения добавляются по мере
+    появления в счетчиках; выбранные видны всегда, даже с нулем книг.
+    """
+
+    # Выбранные значения {фильтр: множество значений}
+    filters_changed = pyqtSignal(object)
+
+    def __init__(self, tree: QTreeWidget, db, parent=None):
+        super().__init__(parent)
+        self.tree = tree
+        self.db = db
+        self._updating = False
+
+        self.facet_items: Dict[str, QTreeWidgetItem] = {}
+        for facet in FACET_COLUMNS:
+            item = QTreeWidgetItem(self.tree, [FACET_TITLES[facet]])
+            item.setFlags(Qt.ItemFlag.ItemIsEnabled)
+            self.facet_items[facet] = item
+        self.tree.expandAll()
+        self.tree.itemChanged.connect(self._on_item_changed)
+
+    def label(self, facet: str, value: Any) -> str:
+        """Подпись значения фильтра"""
+        if value is None:
+            return "Не указано"
+        if facet == 'genre':
+            return self.db.get_genre_name(value) or "?"
+        if facet == 'rating':
+            return "★" * value
+        if facet == 'pages':
+            low, high = PAGE_RANGES[value]
+            return f"{low}–{high - 1} стр." if high else f"{low} стр. и больше"
+        return str(value)
+
+    def _order(self, facet: str, value: Any):
+        """Ключ порядка значений: статусы как в BOOK_STATUSES, оценки и годы по убыванию"""
+        if value is None:
+            return (1, 0)
+        if facet == 'status':
+            return (0, BOOK_STATUSES.index(value) if value in BOOK_STATUSES else len(BOOK_STATUSES))
+        if facet == 'genre':
+            return (0, self.label(facet, value).lower())
+        if facet in ('rating', 'year'):
+            return (0, -int(value))
+        return (0, value)
+
+    def filters(self) -> Dict[str, set]:
+        """Выбранные значения по фильтрам (фильтры без выбора не входят)"""
+        filters = {}
+        for facet, parent in self.facet_items.items():
+            values = {
+                parent.child(row).data(0, VALUE_ROLE)
+                for row in range(parent.childCount())
+                if parent.child(row).checkState(0) == Qt.CheckState.Checked
+            }
+            if values:
+                filters[facet] = values
+        return filters
+
+    def set_counts(self, counts: Dict[str, Dict[Any, int]]):
+        """Обновляет счетчики значений; новые значения вставляются на свои места"""
+        self._updating = True
+        try:
+            for facet, parent in self.facet_items.items():
+                facet_counts = counts.get(facet, {})
+                items = {parent.child(row).data(0, VALUE_ROLE): parent.child(row)
+                         for row in range(parent.childCount())}
+
+                for value, item in items.items():
+                    count = facet_counts.get(value, 0)
+                    # Значение, которого больше нет ни у одной книги, убирается, если не выбрано
+                    if value not in facet_counts and item.checkState(0) != Qt.CheckState.Checked:
+                        parent.removeChild(item)
+                        continue
+                    self._show_count(item, facet, value, count)
+
+                for value, count in facet_counts.items():
+                    if value not in items:
+                        self._insert_value(parent, facet, value, count)
+        finally:
+            self._updating = False
+
+    def _insert_value(self, parent: QTreeWidgetItem, facet: str, value: Any, count: int):
+        item = QTreeWidgetItem()
+        item.setFlags(Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsUserCheckable)
+        item.setCheckState(0, Qt.CheckState.Unchecked)
+        item.setData(0, VALUE_ROLE, value)
+        self._show_count(item, facet, value, count)
+
+        order = self._order(facet, value)
+        row = 0
+        while row < parent.childCount() and self._order(facet, parent.child(row).data(0, VALUE_ROLE)) < order:
+            row += 1
+        parent.insertChild(row, item)
+
+    def _show_count(self, item: QTreeWidgetItem, facet: str, value: Any, count: int):
+        item.setText(0, f"{self.label(facet, value)} ({count})")
+        # Значения без книг видны, но приглушены
+        item.setDisabled(count == 0 and item.checkState(0) != Qt.CheckState.Checked)
+
+    def clear(self):
+        """Снимает все флажки; сигнал отправляется один раз, если выбор был"""
+        had_filters = bool(self.filters())
+        self._updating = True
+        try:
+            for parent in self.facet_items.values():
+                for row in range(parent.childCount()):
+                    parent.child(row).setCheckState(0, Qt.CheckState.Unchecked)
+        finally:
+            self._updating = False
+        if had_filters:
+            self.filters_changed.emit({})
+
+    def _on_item_changed(self, item: QTreeWidgetItem, column: int):
+        if not self._updating and item.parent() is not None:
+            self.filters_changed.emit(self.filters())
\ No newline at end of file
@@ -0,0 +1,159 @@
+import os
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import Callable, Dict, Optional, Tuple
+
+from PIL import Image, ImageOps, features
+
+# Размеры миниатюр, в которых обложка показывается в интерфейсе
+THUMBNAIL_SIZES = {
+    'large': (200, 300),  # карточка книги в главном окне
+    'small': (150, 200),  # превью в диалоге добавления книги
+}
+
+# Максимальный размер хранимой обложки: с запасом для экранов высокой плотности
+MAX_COVER_SIZE = (800, 1200)
+
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def image_pool() -> ThreadPoolExecutor:
+    """Возвращает общий пул потоков для обработки изображений"""
+    global _pool
+    if _pool is None:
+        # Pillow отпускает GIL при декодировании и масштабировании
+        _pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1),
+                                   thread_name_prefix='images')
+    return _pool
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """Приводит изображение к RGB, подкладывая белый фон под прозрачность"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def normalize_cover(image_data: bytes) -> bytes:
+    """Пережимает обложку: ограничивает размер, убирает метаданные, кодирует в WebP
+
+    Без поддержки WebP в сборке Pillow используется прогрессивный JPEG.
+    Метаданные (EXIF, ICC, XMP) не переносятся, поэтому одинаковые
+    изображения дают одинаковый результат и дедуплицируются по хешу.
+    """
+    with Image.open(BytesIO(image_data)) as image:
+        image = _flatten(image)
+    if image.width > MAX_COVER_SIZE[0] or image.height > MAX_COVER_SIZE[1]:
+        image = ImageOps.contain(image, MAX_COVER_SIZE, Image.Resampling.LANCZOS)
+
+    output = BytesIO()
+    if features.check('webp'):
+        image.save(output, 'WEBP', quality=80, method=4)
+    else:
+        image.save(output, 'JPEG', quality=82, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def is_normalized(image_data: bytes) -> bool:
+    """Проверяет по заголовку, что обложка уже пережата normalize_cover"""
+    target = 'WEBP' if features.check('webp') else 'JPEG'
+    with Image.open(BytesIO(image_data)) as image:
+        return (image.format == target and not image.info.get('exif')
+                and image.width <= MAX_COVER_SIZE[0] and image.height <= MAX_COVER_SIZE[1])
+
+
+def make_thumbnail(image_data: bytes, size) -> bytes:
+    """Вписывает изображение в заданный размер с сохранением пропорций"""
+    with Image.open(BytesIO(image_data)) as image:
+        thumbnail = ImageOps.contain(_flatten(image), size, Image.Resampling.LANCZOS)
+
+    output = BytesIO()
+    thumbnail.save(output, 'JPEG', quality=85)
+    return output.getvalue()
+
+
+def make_thumbnails(image_data: bytes) -> Dict[str, bytes]:
+    """Создает миниатюры всех размеров, используемых интерфейсом"""
+    return {name: make_thumbnail(image_data, size) for name, size in THUMBNAIL_SIZES.items()}
+
+
+def store_thumbnails_later(db, book_id: int, image_data: bytes) -> Future:
+    """Создает миниатюры для уже сохраненной обложки и записывает их в базу"""
+    def task():
+        db.save_thumbnails(book_id, make_thumbnails(image_data))
+
+    return image_pool().submit(task)
+
+
+def prepare_cover(file_path: str) -> Tuple[bytes, Dict[str, bytes]]:
+    """Читает выбранный файл и готовит обложку к сохранению вместе с миниатюрами"""
+    with open(file_path, 'rb') as f:
+        image = normalize_cover(f.read())
+    return image, make_thumbnails(image)
+
+
+def submit_cover(file_path: str) -> Future:
+    """Запускает подготовку обложки в пуле потоков"""
+    return image_pool().submit(prepare_cover, file_path)
+
+
+def recompress_covers(db, progress: Optional[Callable[[int, int], None]] = None) -> Tuple[int, int, int]:
+    """Пережимает все хранимые обложки; возвращает (количество, байт до, байт после)"""
+    hashes = db.get_cover_hashes()
+    bytes_before = bytes_after = 0
+
+    def recompress(digest):
+        image = db.get_cover_image(digest)
+        try:
+            # Повторное пережатие только ухудшило бы качество
+            if is_normalized(image):
+                return digest, image, None, None
+            normalized = normalize_cover(image)
+            # Уже сжатое изображение не заменяем более тяжелым
+            if len(normalized) >= len(image):
+                normalized = image
+            return digest, image, normalized, make_thumbnails(normalized)
+        except Exception as e:
+            print(f"Error recompressing cover {digest}: {e}")
+            return digest, image, None, None
+
+    for done, (digest, image, normalized, thumbnails) in enumerate(image_pool().map(recompress, hashes), 1):
+        bytes_before += len(image)
+        if normalized is None:
+            bytes_after += len(image)
+        else:
+            db.replace_cover_image(digest, normalized, thumbnails)
+            bytes_after += len(normalized)
+        if progress:
+            progress(done, len(hashes))
+
+    return len(hashes), bytes_before, bytes_after
+
+
+def main():
+    """Пакетное пережатие обложек: python images.py --recompress [путь к базе]"""
+    if len(sys.argv) < 2 or sys.argv[1] != '--recompress':
+        print(main.__doc__)
+        return 1
+
+    from database import Database
+
+    db = Database(sys.argv[2] if len(sys.argv) > 2 else "reading_diary.db")
+    db.init_db()
+    count, before, after = recompress_covers(
+        db, lambda done, total: print(f"\r{done}/{total}", end='', flush=True)
+    )
+    db.close()
+
+    print(f"\nОбложек: {count}, было {before / 1024:.0f} КБ, стало {after / 1024:.0f} КБ, "
+          f"сэкономлено {(before - after) / 1024:.0f} КБ")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -1,22 +1,49 @@
 import sys
 import os
+import logging
+
+# --profile-startup: отчет о времени импортов и до первого окна.
+# Профилировщик запускается до остальных импортов, чтобы учесть их время;
+# --exit-after-startup дополнительно закрывает программу после отчета
+if '--profile-startup' in sys.argv:
+    from startup_profile import StartupProfiler
+    profiler = StartupProfiler()
+    profiler.start()
+else:
+    profiler = None
+
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QThreadPool
 from PyQt6.QtGui import QIcon
 from main_window import MainWindow
-from database import Database
+from database import Database, database_settings
 
 
 def main():
+    # READING_DIARY_TRACE=1 включает отладочный журнал (в том числе задержки поиска)
+    if os.environ.get('READING_DIARY_TRACE'):
+        logging.basicConfig(level=logging.DEBUG,
+                            format='%(relativeCreated)8.0f %(name)s: %(message)s')
+
     app = QApplication(sys.argv)
     app.setApplicationName("Читательский дневник")
 
-    db = Database()
+    # --viewer: просмотр базы только для чтения (профиль 'viewer'); иначе профиль
+    # соединений берется из READING_DIARY_DB_PROFILE
+    db = Database(settings=database_settings('viewer' if '--viewer' in sys.argv else None))
     db.init_db()
 
     window = MainWindow(db)
+    if profiler:
+        profiler.watch_window(window, app.quit if '--exit-after-startup' in sys.argv else None)
     window.show()
 
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    # Дожидаемся фоновых задач, прежде чем закрыть их соединения
+    window.search_controller.cancel()
+    QThreadPool.globalInstance().waitForDone()
+    db.close()
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
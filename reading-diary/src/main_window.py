@@ -1,24 +1,47 @@
-import os
 from PyQt6.QtWidgets import (
-    QMainWindow, QMessageBox, QFileDialog, QInputDialog,
-    QTableWidgetItem, QMenu, QHeaderView
+    QApplication, QMainWindow, QMessageBox, QFileDialog, QInputDialog,
+    QMenu, QHeaderView
 )
-from PyQt6.QtCore import Qt, QDate, pyqtSlot
+from PyQt6.QtCore import Qt, QDate, QTimer, pyqtSignal, pyqtSlot
 from PyQt6.QtGui import QAction, QPixmap, QImage, QShortcut, QKeySequence
-from PyQt6 import uic
 from add_book_dialog import AddBookDialog
-from statistics_dialog import StatisticsDialog
+from reading_session_dialog import ReadingSessionDialog
+from books_model import COLUMNS, BooksTableModel
+from database import BOOK_INSERTED, BOOK_UPDATED, BOOK_DELETED, BOOK_STATUSES
+from filter_panel import FilterPanel
+from search_controller import SearchController
+from workers import ExportTask, FacetIndexTask, ImportTask
+from pixmap_cache import cover_pixmap, watch_covers
+from ui_loader import load_ui
 
 
 class MainWindow(QMainWindow):
+    # Изменение книг в базе (вид изменения, ID книг); доставляется в поток интерфейса
+    book_changed = pyqtSignal(str, object)
+
     def __init__(self, db):
         super().__init__()
         self.db = db
         self.current_book_id = None
-
-        # Загружаем интерфейс из файла .ui
-        ui_path = os.path.join(os.path.dirname(__file__), '..', 'qt', 'main_window.ui')
-        uic.loadUi(ui_path, self)
+        self.books_found = 0
+        # Текст поиска и фильтры, по которым построен текущий список
+        self.current_search = ""
+        self.current_filters = {}
+        # Индекс фильтров (FacetIndex) строится при первом показе панели фильтров
+        self.facets = None
+        # Фоновое построение или обновление индекса; изменения книг, пришедшие
+        # во время него, применит следующее обновление
+        self.facet_task = None
+        self.facet_refresh_pending = False
+        # Выполняющийся фоновый экспорт
+        self.export_task = None
+        # Выполняющийся фоновый импорт
+        self.import_task = None
+        # Диалог статистики создается при первом открытии и переиспользуется
+        self.statistics_dialog = None
+
+        # Загружаем интерфейс (сгенерированный класс или файл .ui)
+        load_ui('main_window', self)
 
         self.setup_ui()
         self.setup_signals()
@@ -26,10 +49,15 @@ class MainWindow(QMainWindow):
 
     def setup_ui(self):
         """Настраивает интерфейс"""
-        # Настраиваем таблицу книг
-        headers = ["ID", "Название", "Автор", "Жанр", "Статус", "Начало", "Конец", "Оценка", "Страниц"]
-        self.table_books.setColumnCount(len(headers))
-        self.table_books.setHorizontalHeaderLabels(headers)
+        # Настраиваем таблицу книг: модель с ленивой подгрузкой
+        self.books_model = BooksTableModel(self)
+        self.table_books.setModel(self.books_model)
+
+        # Сортирует база: щелчок по заголовку перезапрашивает список (см. on_header_clicked),
+        # направление показывается в тексте заголовка
+        self.table_books.setSortingEnabled(False)
+        self.table_books.horizontalHeader().setSectionsClickable(True)
+        self.table_books.horizontalHeader().setSortIndicatorShown(False)
 
         # Настраиваем ширину колонок
         self.table_books.hideColumn(0)  # Скрываем ID
@@ -39,6 +67,26 @@ class MainWindow(QMainWindow):
         # Устанавливаем заголовки для детальной информации
         self.lbl_cover.setText("")
 
+        # Панель фильтров скрыта, пока ее не включат: только тогда строятся битовые карты
+        self.filter_panel = FilterPanel(self.tree_filters, self.db, self)
+        self.group_filters.hide()
+        # После изменений книг счетчики фильтров пересчитываются один раз за серию
+        self.facet_timer = QTimer(self)
+        self.facet_timer.setSingleShot(True)
+        self.facet_timer.setInterval(200)
+        self.facet_timer.timeout.connect(self.update_facet_counts)
+
+        if self.db.read_only:
+            self.setup_read_only()
+
+    def setup_read_only(self):
+        """Отключает изменение данных, когда база открыта только для чтения"""
+        self.setWindowTitle(f"{self.windowTitle()} (только чтение)")
+        for widget in (self.btn_add, self.btn_edit, self.btn_delete, self.action_new,
+                       self.action_edit, self.action_delete, self.action_import,
+                       self.action_log_session):
+            widget.setEnabled(False)
+
     def setup_signals(self):
         """Настраивает сигналы и слоты"""
         # Кнопки
@@ -48,13 +96,31 @@ class MainWindow(QMainWindow):
         self.btn_stats.clicked.connect(self.show_statistics)
         self.btn_export.clicked.connect(self.export_data)
 
-        # Поиск
-        self.search_input.textChanged.connect(self.load_books)
+        # Изменения в базе применяются к таблице точечно
+        self.book_changed.connect(self.on_book_changed)
+        # Кеш обложек сбрасывается раньше, чем карточка книги покажется заново
+        watch_covers(self.db)
+        self.db.add_listener(self.book_changed.emit)
+
+        # Поиск: с задержкой ввода и в фоновом потоке
+        self.search_controller = SearchController(self.db, BooksTableModel.BATCH_SIZE, self)
+        self.search_controller.results_ready.connect(self.on_search_results)
+        self.search_controller.search_failed.connect(
+            lambda error: self.statusbar.showMessage(f"Ошибка поиска: {error}")
+        )
+        self.search_input.textChanged.connect(self.search_controller.on_text_changed)
+
+        # Фильтры: список и счетчики перезапрашиваются сразу при смене флажка
+        self.action_filters.toggled.connect(self.toggle_filters)
+        self.filter_panel.filters_changed.connect(self.on_filters_changed)
+        self.btn_clear_filters.clicked.connect(self.filter_panel.clear)
 
-        # Таблица - используем signal currentCellChanged
-        self.table_books.currentCellChanged.connect(self.on_book_selected)
+        # Таблица - отслеживаем смену текущей строки
+        self.table_books.selectionModel().currentRowChanged.connect(self.on_book_selected)
         self.table_books.customContextMenuRequested.connect(self.show_context_menu)
-        self.table_books.doubleClicked.connect(self.edit_book)
+        self.table_books.horizontalHeader().sectionClicked.connect(self.on_header_clicked)
+        if not self.db.read_only:
+            self.table_books.doubleClicked.connect(self.edit_book)
 
         # Меню
         self.action_new.triggered.connect(self.add_book)
@@ -63,18 +129,21 @@ class MainWindow(QMainWindow):
         self.action_export.triggered.connect(self.export_data)
         self.action_import.triggered.connect(self.import_data)
         self.action_stats.triggered.connect(self.show_statistics)
+        self.action_log_session.triggered.connect(self.log_reading_session)
+        self.btn_log_session.clicked.connect(self.log_reading_session)
         self.action_about.triggered.connect(self.show_about)
         self.action_exit.triggered.connect(self.close)
 
         # Горячие клавиши
-        shortcut_add = QShortcut(QKeySequence("Ctrl+N"), self)
-        shortcut_add.activated.connect(self.add_book)
+        if not self.db.read_only:
+            shortcut_add = QShortcut(QKeySequence("Ctrl+N"), self)
+            shortcut_add.activated.connect(self.add_book)
 
-        shortcut_edit = QShortcut(QKeySequence("Ctrl+E"), self)
-        shortcut_edit.activated.connect(self.edit_book)
+            shortcut_edit = QShortcut(QKeySequence("Ctrl+E"), self)
+            shortcut_edit.activated.connect(self.edit_book)
 
-        shortcut_delete = QShortcut(QKeySequence("Delete"), self)
-        shortcut_delete.activated.connect(self.delete_book)
+            shortcut_delete = QShortcut(QKeySequence("Delete"), self)
+            shortcut_delete.activated.connect(self.delete_book)
 
         shortcut_search = QShortcut(QKeySequence("Ctrl+F"), self)
         shortcut_search.activated.connect(self.focus_search)
@@ -87,71 +156,191 @@ class MainWindow(QMainWindow):
     def load_books(self):
         """Загружает список книг в таблицу"""
         search_text = self.search_input.text().strip()
-        books = self.db.get_all_books(search_text)
-
-        self.table_books.setRowCount(len(books))
-
-        for row, book in enumerate(books):
-            # ID
-            self.table_books.setItem(row, 0, QTableWidgetItem(str(book['id'])))
-
-            # Название
-            self.table_books.setItem(row, 1, QTableWidgetItem(book['title']))
-
-            # Автор
-            self.table_books.setItem(row, 2, QTableWidgetItem(book['author']))
-
-            # Жанр
-            genre = book.get('genre_name', 'Не указан')
-            self.table_books.setItem(row, 3, QTableWidgetItem(genre))
-
-            # Статус
-            status_item = QTableWidgetItem(book['status'])
-            # Раскрашиваем статусы
-            if book['status'] == 'Прочитано':
-                status_item.setBackground(Qt.GlobalColor.green)
-            elif book['status'] == 'Читаю':
-                status_item.setBackground(Qt.GlobalColor.yellow)
-            elif book['status'] == 'Хочу прочитать':
-                status_item.setBackground(Qt.GlobalColor.blue)
-            elif book['status'] == 'Отложено':
-                status_item.setBackground(Qt.GlobalColor.red)
-            self.table_books.setItem(row, 4, status_item)
-
-            # Дата начала
-            start_date = book['start_date'] or ''
-            self.table_books.setItem(row, 5, QTableWidgetItem(start_date))
-
-            # Дата окончания
-            finish_date = book['finish_date'] or ''
-            self.table_books.setItem(row, 6, QTableWidgetItem(finish_date))
-
-            # Оценка
-            rating = book['rating'] or ''
-            if rating:
-                rating_item = QTableWidgetItem("★" * rating)
-                rating_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.table_books.setItem(row, 7, rating_item)
+        filters = self.search_controller.filters
+        self.current_search = search_text
+        self.current_filters = filters
+
+        # Строки подгружаются порциями по мере прокрутки, каждая — от курсора предыдущей
+        sort = self.books_model.sort_keys
+        self.books_model.reset_source(
+            lambda limit, cursor: self.db.get_books_page(search_text, sort, cursor, limit, filters)
+        )
+
+        # Обновляем статус бар
+        self.books_found = self.db.count_books(search_text, filters)
+        self.show_books_found()
+
+    def on_search_results(self, search_text, page, total, counts, latency_ms):
+        """Показывает результаты фонового поиска"""
+        # Устаревшие результаты отбрасывает контроллер, так что фильтры — его текущие
+        filters = self.search_controller.filters
+        self.current_search = search_text
+        self.current_filters = filters
+        sort = self.books_model.sort_keys
+        self.books_model.reset_source(
+            lambda limit, cursor: self.db.get_books_page(search_text, sort, cursor, limit, filters),
+            page
+        )
+        self.books_found = total
+        if counts is not None:
+            self.filter_panel.set_counts(counts)
+        self.statusbar.showMessage(f"Найдено книг: {total} (поиск {latency_ms:.0f} мс)")
+
+    def toggle_filters(self, visible):
+        """Показывает или скрывает панель фильтров"""
+        self.group_filters.setVisible(visible)
+        if not visible:
+            # Скрытые фильтры не ограничивают список, а счетчики не нужны
+            self.search_controller.facets = None
+            self.facet_timer.stop()
+            self.filter_panel.clear()
+            return
+
+        if self.facets is not None:
+            self.search_controller.facets = self.facets
+            self.update_facet_counts()
+        elif self.facet_task is None:
+            # Битовые карты строятся в фоне; до этого значения фильтров не показаны
+            self.statusbar.showMessage("Подготовка фильтров…")
+            self.start_facet_task()
+
+    def start_facet_task(self):
+        """Строит или обновляет индекс фильтров в фоновом потоке"""
+        self.facet_task = FacetIndexTask(self.db)
+        self.facet_task.signals.finished.connect(self.on_facets_ready)
+        self.facet_task.signals.failed.connect(self.on_facets_failed)
+        self.facet_task.start()
+
+    def on_facets_ready(self, facets):
+        """Подключает построенный или обновленный индекс фильтров и показывает счетчики"""
+        self.facet_task = None
+        built = self.facets is None
+        self.facets = facets
+        if self.action_filters.isChecked():
+            self.search_controller.facets = facets
+            self.show_facet_counts()
+        if built:
+            self.show_books_found()
+
+        if self.facet_refresh_pending:
+            self.facet_refresh_pending = False
+            self.start_facet_task()
+
+    def on_facets_failed(self, error):
+        """Сообщает, что фильтры построить не удалось"""
+        self.facet_task = None
+        self.facet_refresh_pending = False
+        self.statusbar.showMessage(f"Ошибка подготовки фильтров: {error}")
+
+    def on_filters_changed(self, filters):
+        """Перезапрашивает список и счетчики с новыми фильтрами"""
+        self.search_controller.filters = filters
+        self.search_controller.search_now()
+
+    def update_facet_counts(self):
+        """Обновляет индекс фильтров в фоне, затем пересчитывает счетчики"""
+        if self.search_controller.facets is None:
+            return
+        if self.facet_task is not None:
+            self.facet_refresh_pending = True
+            return
+        self.start_facet_task()
+
+    def show_facet_counts(self):
+        """Пересчитывает счетчики фильтров для текущего списка по готовому индексу"""
+        _, counts = self.facets.counts(self.current_filters, self.current_search)
+        self.filter_panel.set_counts(counts)
+
+    def on_header_clicked(self, section):
+        """Меняет сортировку: по возрастанию, по убыванию, исходный порядок
+
+        Shift+щелчок добавляет колонку к сортировке следующим ключом или
+        меняет направление уже выбранной.
+        """
+        column = COLUMNS[section][0]
+        sort = list(self.books_model.sort_keys)
+        directions = dict(sort)
+
+        if QApplication.keyboardModifiers() & Qt.KeyboardModifier.ShiftModifier:
+            if column in directions:
+                sort[[key for key, _ in sort].index(column)] = (column, not directions[column])
             else:
-                self.table_books.setItem(row, 7, QTableWidgetItem(''))
+                sort.append((column, False))
+        elif sort == [(column, False)]:
+            sort = [(column, True)]
+        elif sort == [(column, True)]:
+            sort = []
+        else:
+            sort = [(column, False)]
 
-            # Страницы
-            pages = book.get('pages', 0) or 0
-            self.table_books.setItem(row, 8, QTableWidgetItem(str(pages)))
+        self.books_model.set_sort_keys(sort)
+        # Список перезапрашивается сразу с текущим текстом поиска
+        self.search_controller.sort = sort
+        self.search_controller.cancel()
+        self.load_books()
 
-        # Обновляем статус бар
-        self.statusbar.showMessage(f"Найдено книг: {len(books)}")
+    def show_books_found(self):
+        """Показывает количество найденных книг в статус баре"""
+        self.statusbar.showMessage(f"Найдено книг: {self.books_found}")
+
+    def update_books_found(self):
+        """Пересчитывает найденные книги в базе
+
+        Удаленные и измененные книги могут быть еще не загружены в таблицу
+        или войти в результат поиска, поэтому счетчик не выводится из строк.
+        """
+        self.books_found = self.db.count_books(self.current_search, self.current_filters)
+        self.show_books_found()
+
+    def on_book_changed(self, change, book_ids):
+        """Обновляет только затронутые строки таблицы, сохраняя выделение и прокрутку"""
+        if self.search_controller.facets is not None:
+            self.facet_timer.start()
+
+        if change == BOOK_DELETED:
+            self.books_model.remove_books(book_ids)
+            if self.current_book_id in book_ids:
+                self.current_book_id = None
+                self.clear_book_details()
+            self.update_books_found()
+            return
+
+        for book_id in book_ids:
+            # Строка в том виде, в котором она попала бы в текущий результат поиска
+            book = self.db.get_book_row(book_id, self.current_search, self.current_filters)
+
+            if change == BOOK_INSERTED and book:
+                self.books_model.insert_book(book)
+                self.books_found += 1
+            elif change == BOOK_UPDATED:
+                if book:
+                    if not self.books_model.update_book(book) and self.books_model.sort_keys:
+                        # При сортировке по колонке книга могла переместиться
+                        # из еще не загруженной части списка в загруженную
+                        self.books_model.insert_book(book)
+                else:
+                    # После изменения книга перестала подходить под поиск
+                    self.books_model.remove_book(book_id)
+
+                if book_id == self.current_book_id:
+                    details = self.db.get_book(book_id)
+                    if details:
+                        self.show_book_details(details)
+
+        if change == BOOK_INSERTED:
+            self.show_books_found()
+        else:
+            self.update_books_found()
 
-    def on_book_selected(self, current_row, current_column, previous_row, previous_column):
+    def on_book_selected(self, current, previous):
         """Обрабатывает выбор книги в таблице"""
-        if current_row < 0:  # Если строка не выбрана
+        if not current.isValid():  # Если строка не выбрана
             return
 
-        book_id_item = self.table_books.item(current_row, 0)
-        if not book_id_item:
+        book_id = self.books_model.book_id(current.row())
+        if book_id is None:
             return
 
-        book_id = int(book_id_item.text())
         self.current_book_id = book_id
 
         # Загружаем детальную информацию
@@ -187,22 +376,61 @@ class MainWindow(QMainWindow):
         pages = book.get('pages', 0) or 0
         self.lbl_pages.setText(str(pages))
 
+        # Прогресс по сессиям чтения
+        self.show_book_progress(book['id'])
+
         # Отзыв
         self.text_review.setText(book['review'] or "")
 
-        # Обложка
-        if book['cover_image']:
-            pixmap = QPixmap()
-            pixmap.loadFromData(book['cover_image'])
-            self.lbl_cover.setPixmap(pixmap.scaled(200, 300, Qt.AspectRatioMode.KeepAspectRatio))
+        # Обложка: готовая миниатюра из кеша или из базы
+        pixmap = cover_pixmap(self.db, book['id'], 'large')
+        if pixmap:
+            self.lbl_cover.setPixmap(pixmap)
         else:
             self.lbl_cover.setText("Нет обложки")
 
+    def show_book_progress(self, book_id):
+        """Показывает прогресс чтения книги по записанным сессиям"""
+        progress = self.db.get_book_progress(book_id)
+        self.btn_log_session.setEnabled(not self.db.read_only)
+
+        if progress['percent'] is None:
+            self.progress_reading.setValue(0)
+            self.progress_reading.setFormat("Объем не указан")
+        else:
+            self.progress_reading.setValue(progress['percent'])
+            self.progress_reading.setFormat("%p%")
+
+        if not progress['sessions']:
+            self.lbl_progress.setText("Сессий чтения нет")
+            return
+
+        text = f"Прочитано {progress['pages_read']}"
+        if progress['pages']:
+            text += f" из {progress['pages']}"
+        text += f" стр. за {progress['sessions']} сесс."
+        if progress['duration']:
+            hours, minutes = divmod(progress['duration'] // 60, 60)
+            text += f", {hours} ч {minutes} мин" if hours else f", {minutes} мин"
+        text += f"\nПоследнее чтение: {progress['last_read']:%Y-%m-%d %H:%M}"
+        self.lbl_progress.setText(text)
+
+    def clear_book_details(self):
+        """Очищает панель с информацией о книге"""
+        self.lbl_title.setText("Не выбрано")
+        for label in (self.lbl_author, self.lbl_genre, self.lbl_dates,
+                      self.lbl_rating, self.lbl_status, self.lbl_pages, self.lbl_progress):
+            label.setText("-")
+        self.progress_reading.setValue(0)
+        self.progress_reading.setFormat("%p%")
+        self.btn_log_session.setEnabled(False)
+        self.text_review.clear()
+        self.lbl_cover.setText("")
+
     def add_book(self):
         """Добавляет новую книгу"""
         dialog = AddBookDialog(self.db, self)
         if dialog.exec():
-            self.load_books()
             self.statusbar.showMessage("Книга успешно добавлена", 3000)
 
     def edit_book(self):
@@ -213,50 +441,167 @@ class MainWindow(QMainWindow):
 
         dialog = AddBookDialog(self.db, self, self.current_book_id)
         if dialog.exec():
-            self.load_books()
             self.statusbar.showMessage("Книга успешно обновлена", 3000)
 
-    def delete_book(self):
-        """Удаляет выбранную книгу"""
+    def log_reading_session(self):
+        """Записывает сессию чтения текущей книги"""
         if not self.current_book_id:
+            QMessageBox.warning(self, "Предупреждение", "Выберите книгу")
+            return
+
+        book = self.db.get_book(self.current_book_id)
+        if not book:
+            return
+
+        dialog = ReadingSessionDialog(self.db, book, self)
+        if dialog.exec():
+            self.show_book_progress(book['id'])
+            self.statusbar.showMessage("Сессия чтения записана", 3000)
+
+    def selected_book_ids(self):
+        """Возвращает ID выделенных книг (или текущей, если выделения нет)"""
+        book_ids = [
+            self.books_model.book_id(index.row())
+            for index in self.table_books.selectionModel().selectedRows()
+        ]
+        book_ids = [book_id for book_id in book_ids if book_id is not None]
+        if not book_ids and self.current_book_id:
+            book_ids = [self.current_book_id]
+        return book_ids
+
+    def delete_book(self):
+        """Удаляет выбранные книги"""
+        book_ids = self.selected_book_ids()
+        if not book_ids:
             QMessageBox.warning(self, "Предупреждение", "Выберите книгу для удаления")
             return
 
+        if len(book_ids) == 1:
+            question = "Вы уверены, что хотите удалить эту книгу?"
+        else:
+            question = f"Вы уверены, что хотите удалить выбранные книги ({len(book_ids)})?"
         reply = QMessageBox.question(
-            self, "Подтверждение",
-            f"Вы уверены, что хотите удалить эту книгу?",
+            self, "Подтверждение", question,
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            if self.db.delete_book(self.current_book_id):
-                self.current_book_id = None
-                self.load_books()
+            deleted = self.db.delete_books(book_ids)
+            if len(deleted) == 1:
                 self.statusbar.showMessage("Книга успешно удалена", 3000)
+            elif deleted:
+                self.statusbar.showMessage(f"Удалено книг: {len(deleted)}", 3000)
             else:
                 QMessageBox.critical(self, "Ошибка", "Не удалось удалить книгу")
 
+    def change_status(self, status):
+        """Меняет статус выбранных книг"""
+        book_ids = self.selected_book_ids()
+        if not book_ids:
+            return
+
+        changed = self.db.update_books((book_id, {'status': status}) for book_id in book_ids)
+        self.statusbar.showMessage(f"Статус «{status}» установлен для книг: {len(changed)}", 3000)
+
     def show_statistics(self):
         """Показывает диалог статистики"""
-        dialog = StatisticsDialog(self.db, self)
-        dialog.exec()
+        # Диалог и графики (а с ними, возможно, matplotlib) загружаются при первом открытии
+        if self.statistics_dialog is None:
+            from statistics_dialog import StatisticsDialog
+            self.statistics_dialog = StatisticsDialog(self.db, self)
+        else:
+            # Графики перестраиваются, только если статистика изменилась
+            self.statistics_dialog.load_statistics()
+        self.statistics_dialog.exec()
 
     def export_data(self):
-        """Экспортирует данные в CSV"""
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Экспорт данных", "", "CSV Files (*.csv)"
+        """Экспортирует данные в CSV в фоновом потоке"""
+        if self.export_task is not None:
+            return
+
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Экспорт данных", "", "CSV Files (*.csv);;CSV, сжатый gzip (*.csv.gz)"
         )
+        if not file_path:
+            return
+        if selected_filter.startswith("CSV, сжатый") and not file_path.lower().endswith('.gz'):
+            file_path += '.gz' if file_path.lower().endswith('.csv') else '.csv.gz'
 
-        if file_path:
-            if self.db.export_to_csv(file_path):
-                QMessageBox.information(self, "Успех", f"Данные экспортированы в {file_path}")
-            else:
-                QMessageBox.critical(self, "Ошибка", "Не удалось экспортировать данные")
+        self.set_export_enabled(False)
+        self.export_task = ExportTask(self.db, file_path)
+        self.export_task.signals.progress.connect(
+            lambda done, total: self.statusbar.showMessage(f"Экспорт: {done} из {total} книг")
+        )
+        self.export_task.signals.finished.connect(
+            lambda exported: self.on_export_finished(file_path, exported)
+        )
+        self.export_task.signals.failed.connect(
+            lambda error: self.on_export_finished(file_path, False)
+        )
+        self.export_task.start()
+
+    def on_export_finished(self, file_path, exported):
+        """Сообщает о завершении экспорта"""
+        self.export_task = None
+        self.set_export_enabled(True)
+        self.show_books_found()
+
+        if exported:
+            QMessageBox.information(self, "Успех", f"Данные экспортированы в {file_path}")
+        else:
+            QMessageBox.critical(self, "Ошибка", "Не удалось экспортировать данные")
+
+    def set_export_enabled(self, enabled):
+        """Разрешает или запрещает запуск экспорта"""
+        self.btn_export.setEnabled(enabled)
+        self.action_export.setEnabled(enabled)
 
     def import_data(self):
-        """Импортирует данные из CSV"""
-        QMessageBox.information(self, "Информация",
-                                "Функция импорта будет реализована в следующей версии")
+        """Импортирует данные из CSV в фоновом потоке"""
+        if self.import_task is not None:
+            return
+
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Импорт данных", "", "CSV Files (*.csv *.csv.gz)"
+        )
+        if not file_path:
+            return
+
+        self.action_import.setEnabled(False)
+        self.import_task = ImportTask(self.db, file_path)
+        self.import_task.signals.progress.connect(
+            lambda done, total: self.statusbar.showMessage(f"Импорт: {done * 100 // max(total, 1)}%")
+        )
+        self.import_task.signals.finished.connect(self.on_import_finished)
+        self.import_task.signals.failed.connect(self.on_import_failed)
+        self.import_task.start()
+
+    def on_import_finished(self, report):
+        """Показывает итог импорта и перезагружает список"""
+        self.import_task = None
+        self.action_import.setEnabled(True)
+        if self.search_controller.facets is not None:
+            # Импорт идет в обход уведомлений: карты фильтров перестроятся в фоне
+            self.search_controller.search_now()
+        else:
+            self.load_books()
+
+        text = f"Импортировано книг: {report['imported']}"
+        if report['skipped']:
+            text += f"\nПропущено строк с ошибками: {report['skipped']}\n\n"
+            text += "\n".join(f"Строка {line}: {error}" for line, error in report['errors'][:10])
+            if report['skipped'] > 10:
+                text += "\n..."
+            QMessageBox.warning(self, "Импорт завершен", text)
+        else:
+            QMessageBox.information(self, "Успех", text)
+
+    def on_import_failed(self, error):
+        """Сообщает об ошибке импорта; изменения в базе отменены"""
+        self.import_task = None
+        self.action_import.setEnabled(True)
+        self.show_books_found()
+        QMessageBox.critical(self, "Ошибка", f"Не удалось импортировать данные: {error}")
 
     def show_about(self):
         """Показывает информацию о программе"""
@@ -270,7 +615,7 @@ class MainWindow(QMainWindow):
             <li>Ведение отзывов и заметок</li>
             <li>Загрузка обложек книг</li>
             <li>Статистика чтения</li>
-            <li>Экспорт данных в CSV</li>
+            <li>Экспорт и импорт данных в CSV</li>
         </ul>
         <p>© 2025 Читательский дневник</p>
         """
@@ -278,17 +623,26 @@ class MainWindow(QMainWindow):
 
     def show_context_menu(self, position):
         """Показывает контекстное меню для таблицы"""
-        # Получаем элемент по позиции
-        item = self.table_books.itemAt(position)
-        if item:
-            # Выделяем строку, на которой было вызвано меню
-            self.table_books.selectRow(item.row())
+        # Получаем строку по позиции
+        index = self.table_books.indexAt(position)
+        if index.isValid() and not self.table_books.selectionModel().isRowSelected(index.row()):
+            # Выделяем строку, на которой было вызвано меню, если она не в выделении
+            self.table_books.selectRow(index.row())
+
+        # В меню только действия, меняющие данные
+        if self.db.read_only:
+            return
 
         menu = QMenu()
 
         add_action = menu.addAction("Добавить книгу")
         edit_action = menu.addAction("Редактировать")
         delete_action = menu.addAction("Удалить")
+        session_action = menu.addAction("Записать чтение…")
+
+        # Статус меняется сразу у всех выделенных книг
+        status_menu = menu.addMenu("Изменить статус")
+        status_actions = {status_menu.addAction(status): status for status in BOOK_STATUSES}
 
         action = menu.exec(self.table_books.mapToGlobal(position))
 
@@ -297,4 +651,8 @@ class MainWindow(QMainWindow):
         elif action == edit_action:
             self.edit_book()
         elif action == delete_action:
-            self.delete_book()
\ No newline at end of file
+            self.delete_book()
+        elif action == session_action:
+            self.log_reading_session()
+        elif action in status_actions:
+            self.change_status(status_actions[action])
\ No newline at end of file
@@ -0,0 +1,421 @@
+import hashlib
+import sqlite3
+from typing import Callable, List
+
+
+def _add_query_indexes(conn: sqlite3.Connection):
+    """Индексы для сортировки списка, фильтров статистики и группировок по датам"""
+    # Месяц и год окончания как виртуальные вычисляемые колонки,
+    # чтобы группировки в статистике шли по индексу
+    conn.execute('''
+        ALTER TABLE books ADD COLUMN finish_month TEXT
+        GENERATED ALWAYS AS (strftime('%Y-%m', finish_date)) VIRTUAL
+    ''')
+    conn.execute('''
+        ALTER TABLE books ADD COLUMN finish_year TEXT
+        GENERATED ALWAYS AS (strftime('%Y', finish_date)) VIRTUAL
+    ''')
+
+    for column in ('created_at', 'status', 'genre_id', 'finish_date',
+                   'finish_month', 'finish_year', 'rating', 'pages'):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_books_{column} ON books ({column})")
+
+
+def _fold_yo(expression: str) -> str:
+    """SQL-выражение, заменяющее ё на е (unicode61 не снимает диакритику с кириллицы)"""
+    return f"replace(replace({expression}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def _add_fulltext_search(conn: sqlite3.Connection):
+    """Полнотекстовый индекс FTS5 по названию, автору, отзыву и жанру"""
+    # unicode61 приводит к нижнему регистру любые алфавиты, включая кириллицу;
+    # remove_diacritics убирает диакритику латиницы, ё сворачивается вручную.
+    # Префиксные индексы ускоряют поиск по началу слова при наборе
+    conn.execute('''
+        CREATE VIRTUAL TABLE books_fts USING fts5(
+            title, author, review, genre,
+            prefix = '2 3',
+            tokenize = "unicode61 remove_diacritics 2"
+        )
+    ''')
+    # Ранжирование bm25: совпадение в названии важнее автора, жанра и отзыва
+    conn.execute("INSERT INTO books_fts (books_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0, 2.0)')")
+
+    values = ', '.join(_fold_yo(column) for column in (
+        'new.title', 'new.author', 'new.review',
+        '(SELECT name FROM genres WHERE id = new.genre_id)'
+    ))
+
+    conn.execute(f'''
+        CREATE TRIGGER books_fts_insert AFTER INSERT ON books BEGIN
+            INSERT INTO books_fts (rowid, title, author, review, genre)
+            VALUES (new.id, {values});
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER books_fts_delete AFTER DELETE ON books BEGIN
+            DELETE FROM books_fts WHERE rowid = old.id;
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER books_fts_update AFTER UPDATE OF title, author, review, genre_id ON books BEGIN
+            DELETE FROM books_fts WHERE rowid = old.id;
+            INSERT INTO books_fts (rowid, title, author, review, genre)
+            VALUES (new.id, {values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER genres_fts_update AFTER UPDATE OF name ON genres BEGIN
+            UPDATE books_fts SET genre = {_fold_yo('new.name')}
+            WHERE rowid IN (SELECT id FROM books WHERE genre_id = new.id);
+        END
+    ''')
+
+    fill_books_fts(conn)
+
+
+def fill_books_fts(conn: sqlite3.Connection, after_id: int = 0):
+    """Добавляет в полнотекстовый индекс книги с ID больше after_id"""
+    conn.execute(f'''
+        INSERT INTO books_fts (rowid, title, author, review, genre)
+        SELECT b.id, {_fold_yo('b.title')}, {_fold_yo('b.author')},
+               {_fold_yo('b.review')}, {_fold_yo('g.name')}
+        FROM books b
+        LEFT JOIN genres g ON b.genre_id = g.id
+        WHERE b.id > ?
+    ''', (after_id,))
+
+
+def _move_covers_to_table(conn: sqlite3.Connection):
+    """Переносит обложки из books в отдельную таблицу covers"""
+    conn.execute('''
+        CREATE TABLE covers (
+            book_id INTEGER PRIMARY KEY,
+            image BLOB NOT NULL,
+            FOREIGN KEY (book_id) REFERENCES books (id)
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO covers (book_id, image)
+        SELECT id, cover_image FROM books WHERE cover_image IS NOT NULL
+    ''')
+    conn.execute('''
+        CREATE TRIGGER covers_delete AFTER DELETE ON books BEGIN
+            DELETE FROM covers WHERE book_id = old.id;
+        END
+    ''')
+
+    # DROP COLUMN появился в SQLite 3.35; в более старых версиях колонка
+    # остается пустой и больше нигде не читается
+    if sqlite3.sqlite_version_info >= (3, 35, 0):
+        conn.execute("ALTER TABLE books DROP COLUMN cover_image")
+    else:
+        conn.execute("UPDATE books SET cover_image = NULL WHERE cover_image IS NOT NULL")
+
+
+def _add_cover_thumbnails(conn: sqlite3.Connection):
+    """Колонки для миниатюр обложек в размерах, используемых интерфейсом"""
+    conn.execute("ALTER TABLE covers ADD COLUMN thumb_large BLOB")
+    conn.execute("ALTER TABLE covers ADD COLUMN thumb_small BLOB")
+
+
+def _deduplicate_covers(conn: sqlite3.Connection):
+    """Хранит каждое изображение обложки один раз, по SHA-256 содержимого"""
+    conn.execute('''
+        CREATE TABLE cover_images (
+            hash TEXT PRIMARY KEY,
+            image BLOB NOT NULL,
+            thumb_large BLOB,
+            thumb_small BLOB
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE book_covers (
+            book_id INTEGER PRIMARY KEY,
+            hash TEXT NOT NULL,
+            FOREIGN KEY (book_id) REFERENCES books (id),
+            FOREIGN KEY (hash) REFERENCES cover_images (hash)
+        )
+    ''')
+
+    rows = conn.execute("SELECT book_id, image, thumb_large, thumb_small FROM covers")
+    for book_id, image, thumb_large, thumb_small in rows.fetchall():
+        digest = hashlib.sha256(image).hexdigest()
+        conn.execute(
+            "INSERT OR IGNORE INTO cover_images (hash, image, thumb_large, thumb_small) "
+            "VALUES (?, ?, ?, ?)",
+            (digest, image, thumb_large, thumb_small)
+        )
+        conn.execute("INSERT INTO book_covers (book_id, hash) VALUES (?, ?)", (book_id, digest))
+
+    conn.execute("DROP TRIGGER covers_delete")
+    conn.execute("DROP TABLE covers")
+    conn.execute("ALTER TABLE book_covers RENAME TO covers")
+    conn.execute("CREATE INDEX idx_covers_hash ON covers (hash)")
+
+    conn.execute('''
+        CREATE TRIGGER covers_delete AFTER DELETE ON books BEGIN
+            DELETE FROM covers WHERE book_id = old.id;
+        END
+    ''')
+    # Изображение удаляется, когда на него больше не ссылается ни одна книга
+    conn.execute('''
+        CREATE TRIGGER cover_images_release_delete AFTER DELETE ON covers BEGIN
+            DELETE FROM cover_images
+            WHERE hash = old.hash
+              AND NOT EXISTS (SELECT 1 FROM covers WHERE hash = old.hash);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER cover_images_release_update AFTER UPDATE OF hash ON covers
+        WHEN new.hash <> old.hash BEGIN
+            DELETE FROM cover_images
+            WHERE hash = old.hash
+              AND NOT EXISTS (SELECT 1 FROM covers WHERE hash = old.hash);
+        END
+    ''')
+
+
+# Разрезы материализованной статистики: имя и колонка books
+STATS_DIMENSIONS = [
+    ('status', 'status'),
+    ('rating', 'rating'),
+    ('genre', 'genre_id'),
+    ('month', 'finish_month'),
+    ('year', 'finish_year'),
+]
+
+# Колонки, от которых зависит статистика
+_STATS_COLUMNS = ('status', 'rating', 'genre_id', 'finish_date', 'pages')
+# Колонки, при изменении которых растет версия статистики: еще и дата
+# начала, от которой зависит аналитика чтения в диалоге статистики
+_VERSION_COLUMNS = _STATS_COLUMNS + ('start_date',)
+
+
+def fill_statistics(conn: sqlite3.Connection):
+    """Пересчитывает материализованную статистику по таблице books"""
+    conn.execute("DELETE FROM stats_counts")
+    for dimension, column in STATS_DIMENSIONS:
+        conn.execute(f'''
+            INSERT INTO stats_counts (dimension, value, count)
+            SELECT '{dimension}', {column}, COUNT(*)
+            FROM books
+            WHERE {column} IS NOT NULL
+            GROUP BY {column}
+        ''')
+
+    conn.execute('''
+        UPDATE stats_totals SET
+            (total, rated_count, rating_sum, total_pages) = (
+                SELECT COUNT(*), COUNT(rating), COALESCE(SUM(rating), 0),
+                       COALESCE(SUM(CASE WHEN pages > 0 THEN pages ELSE 0 END), 0)
+                FROM books
+            ),
+            version = version + 1
+    ''')
+
+
+def _stats_trigger_body(row: str, sign: str) -> str:
+    """Операторы триггера, добавляющие (+) или вычитающие (-) строку books из статистики"""
+    statements = [f'''
+        UPDATE stats_totals SET
+            total = total {sign} 1,
+            rated_count = rated_count {sign} ({row}.rating IS NOT NULL),
+            rating_sum = rating_sum {sign} COALESCE({row}.rating, 0),
+            total_pages = total_pages {sign} MAX(COALESCE({row}.pages, 0), 0),
+            version = version + 1;
+    ''']
+
+    for dimension, column in STATS_DIMENSIONS:
+        if sign == '+':
+            statements.append(f'''
+                INSERT INTO stats_counts (dimension, value, count)
+                SELECT '{dimension}', {row}.{column}, 1 WHERE {row}.{column} IS NOT NULL
+                ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+            ''')
+        else:
+            statements.append(f'''
+                UPDATE stats_counts SET count = count - 1
+                WHERE dimension = '{dimension}' AND value = {row}.{column};
+            ''')
+
+    if sign == '-':
+        statements.append("DELETE FROM stats_counts WHERE count <= 0;")
+    return ''.join(statements)
+
+
+def _add_statistics_aggregates(conn: sqlite3.Connection):
+    """Материализованная статистика, которую поддерживают триггеры на books"""
+    # Количество книг по статусу, оценке, жанру, месяцу и году окончания
+    conn.execute('''
+        CREATE TABLE stats_counts (
+            dimension TEXT NOT NULL,
+            value NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+    ''')
+    # Итоги в одной строке; version растет при каждом изменении
+    conn.execute('''
+        CREATE TABLE stats_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total INTEGER NOT NULL DEFAULT 0,
+            rated_count INTEGER NOT NULL DEFAULT 0,
+            rating_sum INTEGER NOT NULL DEFAULT 0,
+            total_pages INTEGER NOT NULL DEFAULT 0,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute("INSERT INTO stats_totals (id) VALUES (1)")
+    fill_statistics(conn)
+
+    conn.execute(f'''
+        CREATE TRIGGER stats_insert AFTER INSERT ON books BEGIN
+            {_stats_trigger_body('new', '+')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER stats_delete AFTER DELETE ON books BEGIN
+            {_stats_trigger_body('old', '-')}
+        END
+    ''')
+    _create_stats_update_trigger(conn, _STATS_COLUMNS)
+
+
+def _create_stats_update_trigger(conn: sqlite3.Connection, columns):
+    """Триггер, переносящий измененную книгу в статистике, если изменилась одна из columns"""
+    changed = ' OR '.join(f"old.{column} IS NOT new.{column}" for column in columns)
+    conn.execute(f'''
+        CREATE TRIGGER stats_update AFTER UPDATE OF {', '.join(columns)} ON books
+        WHEN {changed} BEGIN
+            {_stats_trigger_body('old', '-')}
+            {_stats_trigger_body('new', '+')}
+        END
+    ''')
+
+
+def _rollup_trigger_body(row: str, sign: str) -> str:
+    """Операторы триггера, добавляющие (+) или вычитающие (-) сессию из дневных итогов"""
+    if sign == '+':
+        return f'''
+            INSERT INTO reading_daily (day, sessions, pages, duration)
+            VALUES ({row}.day, 1, {row}.pages, {row}.duration)
+            ON CONFLICT (day) DO UPDATE SET
+                sessions = sessions + 1,
+                pages = pages + excluded.pages,
+                duration = duration + excluded.duration;
+        '''
+    return f'''
+        UPDATE reading_daily SET
+            sessions = sessions - 1,
+            pages = pages - {row}.pages,
+            duration = duration - {row}.duration
+        WHERE day = {row}.day;
+        DELETE FROM reading_daily WHERE day = {row}.day AND sessions <= 0;
+    '''
+
+
+def _add_reading_sessions(conn: sqlite3.Connection):
+    """Журнал сессий чтения и дневные итоги, которые поддерживают триггеры"""
+    # started_at — время начала в секундах Unix, day — номер местного дня от 1970-01-01,
+    # duration — длительность в секундах
+    conn.execute('''
+        CREATE TABLE reading_sessions (
+            id INTEGER PRIMARY KEY,
+            book_id INTEGER NOT NULL,
+            started_at INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            pages INTEGER NOT NULL DEFAULT 0,
+            duration INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (book_id) REFERENCES books (id)
+        )
+    ''')
+    # Покрывающий индекс: прогресс книги считается без чтения таблицы
+    conn.execute('''
+        CREATE INDEX idx_sessions_book
+        ON reading_sessions (book_id, started_at, pages, duration)
+    ''')
+    conn.execute("CREATE INDEX idx_sessions_started_at ON reading_sessions (started_at)")
+
+    conn.execute('''
+        CREATE TABLE reading_daily (
+            day INTEGER PRIMARY KEY,
+            sessions INTEGER NOT NULL,
+            pages INTEGER NOT NULL,
+            duration INTEGER NOT NULL
+        )
+    ''')
+
+    conn.execute(f'''
+        CREATE TRIGGER reading_daily_insert AFTER INSERT ON reading_sessions BEGIN
+            {_rollup_trigger_body('new', '+')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER reading_daily_delete AFTER DELETE ON reading_sessions BEGIN
+            {_rollup_trigger_body('old', '-')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER reading_daily_update AFTER UPDATE OF day, pages, duration ON reading_sessions BEGIN
+            {_rollup_trigger_body('old', '-')}
+            {_rollup_trigger_body('new', '+')}
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER sessions_delete AFTER DELETE ON books BEGIN
+            DELETE FROM reading_sessions WHERE book_id = old.id;
+        END
+    ''')
+
+
+def _add_sort_indexes(conn: sqlite3.Connection):
+    """Индексы для постраничной выборки списка, отсортированного по любой колонке"""
+    for column in ('title', 'author', 'start_date'):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_books_{column} ON books ({column})")
+
+
+def _version_on_start_date(conn: sqlite3.Connection):
+    """Версия статистики растет и при изменении даты начала книги"""
+    conn.execute("DROP TRIGGER stats_update")
+    _create_stats_update_trigger(conn, _VERSION_COLUMNS)
+
+
+# Миграции применяются по порядку; номер версии схемы = индекс миграции + 1
+MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _add_query_indexes,
+    _add_fulltext_search,
+    _move_covers_to_table,
+    _add_cover_thumbnails,
+    _deduplicate_covers,
+    _add_statistics_aggregates,
+    _add_reading_sessions,
+    _add_sort_indexes,
+    _version_on_start_date,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Возвращает текущую версию схемы базы данных"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """Применяет недостающие миграции, каждую в отдельной транзакции"""
+    version = get_schema_version(conn)
+
+    for number in range(version + 1, SCHEMA_VERSION + 1):
+        migration = MIGRATIONS[number - 1]
+        conn.execute("BEGIN")
+        try:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = number
+
+    return version
\ No newline at end of file
@@ -0,0 +1,135 @@
+import weakref
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Set
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPixmap
+
+from database import BOOK_INSERTED
+from images import THUMBNAIL_SIZES, store_thumbnails_later
+
+
+class PixmapCache:
+    """LRU-кеш декодированных изображений с ограничением по занимаемой памяти"""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, QPixmap]" = OrderedDict()
+        self._size = 0
+        # Книги, у которых обложки нет: повторный показ не идет в базу
+        self._no_cover: Set[int] = set()
+
+    @staticmethod
+    def _cost(pixmap: QPixmap) -> int:
+        """Примерный объем памяти, занимаемый изображением"""
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def get(self, key: Hashable) -> Optional[QPixmap]:
+        """Возвращает изображение и отмечает его как недавно использованное"""
+        pixmap = self._items.get(key)
+        if pixmap is not None:
+            self._items.move_to_end(key)
+        return pixmap
+
+    def put(self, key: Hashable, pixmap: QPixmap):
+        """Добавляет изображение, вытесняя давно не использованные"""
+        self.discard(key)
+        cost = self._cost(pixmap)
+        if cost > self.max_bytes:
+            return
+
+        self._items[key] = pixmap
+        self._size += cost
+        while self._size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self._size -= self._cost(evicted)
+
+    def discard(self, key: Hashable):
+        """Удаляет изображение из кеша"""
+        pixmap = self._items.pop(key, None)
+        if pixmap is not None:
+            self._size -= self._cost(pixmap)
+
+    def has_no_cover(self, book_id: int) -> bool:
+        """Известно ли, что у книги нет обложки"""
+        return book_id in self._no_cover
+
+    def mark_no_cover(self, book_id: int):
+        """Запоминает, что у книги нет обложки"""
+        self._no_cover.add(book_id)
+
+    def discard_book(self, book_id: int):
+        """Удаляет все миниатюры обложки книги и отметку об ее отсутствии"""
+        for size in THUMBNAIL_SIZES:
+            self.discard((book_id, size))
+        self._no_cover.discard(book_id)
+
+    def clear(self):
+        """Очищает кеш"""
+        self._items.clear()
+        self._size = 0
+        self._no_cover.clear()
+
+
+# Общий кеш обложек для главного окна и диалога редактирования
+cover_cache = PixmapCache()
+
+# Книги, для которых миниатюры уже создаются в фоне (по одной задаче на книгу)
+_thumbnails_queued: Set[int] = set()
+
+# Базы, изменения книг в которых сбрасывают кеш обложек
+_watched: 'weakref.WeakSet' = weakref.WeakSet()
+
+
+def _on_book_changed(change: str, book_ids: List[int]):
+    # У новых книг в кеше ничего нет
+    if change != BOOK_INSERTED:
+        for book_id in book_ids:
+            cover_cache.discard_book(book_id)
+
+
+def watch_covers(db):
+    """Сбрасывает кеш обложек книг, измененных или удаленных в базе
+
+    Подписчики уведомляются по порядку подписки, поэтому вызывается до
+    подписки окон, которые показывают обложки по тому же уведомлению.
+    """
+    if db not in _watched:
+        _watched.add(db)
+        db.add_listener(_on_book_changed)
+
+
+def cover_pixmap(db, book_id: int, size: str) -> Optional[QPixmap]:
+    """Возвращает миниатюру обложки книги, используя кеш"""
+    key = (book_id, size)
+    pixmap = cover_cache.get(key)
+    if pixmap is not None:
+        return pixmap
+    if cover_cache.has_no_cover(book_id):
+        return None
+
+    pixmap = QPixmap()
+    thumbnail = db.get_thumbnail(book_id, size)
+    if thumbnail:
+        pixmap.loadFromData(thumbnail)
+    else:
+        # Обложка сохранена до появления миниатюр: масштабируем оригинал
+        # один раз и создаем миниатюры в фоне для следующих показов
+        # (в базе только для чтения их некуда записать)
+        cover_image = db.get_cover(book_id)
+        if not cover_image:
+            cover_cache.mark_no_cover(book_id)
+            return None
+        pixmap.loadFromData(cover_image)
+        width, height = THUMBNAIL_SIZES[size]
+        pixmap = pixmap.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatio,
+                               Qt.TransformationMode.SmoothTransformation)
+        if not db.read_only and book_id not in _thumbnails_queued:
+            _thumbnails_queued.add(book_id)
+            store_thumbnails_later(db, book_id, cover_image)
+
+    if pixmap.isNull():
+        return None
+
+    cover_cache.put(key, pixmap)
+    return pixmap
\ No newline at end of file
@@ -0,0 +1,44 @@
+from PyQt6.QtWidgets import QDialog, QMessageBox
+from PyQt6.QtCore import QDateTime
+from ui_loader import load_ui
+
+
+class ReadingSessionDialog(QDialog):
+    """Запись сессии чтения книги: когда начали, сколько страниц и минут"""
+
+    def __init__(self, db, book, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.book = book
+
+        load_ui('reading_session_dialog', self)
+
+        self.setup_ui()
+        self.buttonBox.accepted.connect(self.save_session)
+        self.buttonBox.rejected.connect(self.reject)
+
+    def setup_ui(self):
+        """Настраивает интерфейс"""
+        self.lbl_book.setText(f"{self.book['title']} — {self.book['author']}")
+        self.datetime_started.setDateTime(QDateTime.currentDateTime())
+        self.datetime_started.setMaximumDateTime(QDateTime.currentDateTime().addDays(1))
+
+        # По умолчанию предлагаем оставшиеся страницы, но не больше 50
+        progress = self.db.get_book_progress(self.book['id'])
+        remaining = max(0, progress['pages'] - progress['pages_read'])
+        self.spin_pages.setValue(min(remaining, 50) if remaining else 0)
+
+    def save_session(self):
+        """Сохраняет сессию в базу данных"""
+        pages = self.spin_pages.value()
+        minutes = self.spin_minutes.value()
+        if not pages and not minutes:
+            QMessageBox.warning(self, "Ошибка", "Укажите прочитанные страницы или длительность")
+            return
+
+        try:
+            self.db.log_reading_session(self.book['id'], pages, minutes * 60,
+                                        self.datetime_started.dateTime().toPyDateTime())
+            self.accept()
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Ошибка при сохранении: {e}")
\ No newline at end of file
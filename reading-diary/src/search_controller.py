@@ -0,0 +1,123 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from workers import DatabaseTask
+
+logger = logging.getLogger(__name__)
+
+
+class SearchTask(DatabaseTask):
+    """Поиск книг в фоновом потоке: первая страница, общее количество и счетчики фильтров
+
+    Если задан facets (FacetIndex), количество и счетчики значений фильтров
+    считаются по его битовым картам, иначе счетчиков нет, а количество
+    считает база.
+    """
+
+    def __init__(self, db, search_text: str, sort: List[Tuple[str, bool]], page_size: int,
+                 filters: Optional[Dict[str, set]] = None, facets=None):
+        super().__init__(db)
+        self.search_text = search_text
+        self.sort = sort
+        self.page_size = page_size
+        self.filters = filters
+        self.facets = facets
+        self.started_at = None
+        self.query_ms = 0.0
+
+    def work(self):
+        self.started_at = time.perf_counter()
+        page = self.db.get_books_page(self.search_text, self.sort, limit=self.page_size,
+                                      filters=self.filters)
+        counts = None
+        if self.facets is not None:
+            self.facets.refresh()
+            total, counts = self.facets.counts(self.filters, self.search_text)
+        else:
+            total = self.db.count_books(self.search_text, self.filters)
+        self.query_ms = (time.perf_counter() - self.started_at) * 1000
+        return page, total, counts
+
+
+class SearchController(QObject):
+    """Поиск по мере ввода: с задержкой, в фоновом потоке, с отменой устаревших запросов"""
+
+    # Текст поиска, первая страница (книги, курсор), общее количество,
+    # счетчики фильтров (или None), задержка от нажатия клавиши в мс
+    results_ready = pyqtSignal(str, object, int, object, float)
+    search_failed = pyqtSignal(str)
+
+    DEBOUNCE_MS = 250
+
+    def __init__(self, db, page_size: int, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.page_size = page_size
+        # Ключи сортировки списка и фасетные фильтры (см. Database.get_books_page)
+        self.sort: List[Tuple[str, bool]] = []
+        self.filters: Dict[str, set] = {}
+        # Индекс фильтров (FacetIndex), если нужны счетчики значений
+        self.facets: Optional[Any] = None
+        self._text = ""
+        self._keystroke_at = 0.0
+        self._task: Optional[SearchTask] = None
+        self._generation = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS)
+        self._timer.timeout.connect(self._start_search)
+
+    def on_text_changed(self, text: str):
+        """Запоминает ввод и перезапускает таймер задержки"""
+        self._text = text.strip()
+        self._keystroke_at = time.perf_counter()
+        self._timer.start()
+
+    def search_now(self):
+        """Запускает поиск сразу, без задержки (например, после смены фильтров)"""
+        self._keystroke_at = time.perf_counter()
+        self._start_search()
+
+    def cancel(self):
+        """Отменяет ожидающий и выполняющийся поиск"""
+        self._timer.stop()
+        self._generation += 1
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _start_search(self):
+        self.cancel()
+        generation = self._generation
+
+        task = SearchTask(self.db, self._text, self.sort, self.page_size, self.filters, self.facets)
+        keystroke_at = self._keystroke_at
+        task.signals.finished.connect(
+            lambda result: self._on_finished(generation, task, keystroke_at, result)
+        )
+        task.signals.failed.connect(lambda error: self._on_failed(generation, error))
+        self._task = task
+        task.start()
+
+    def _on_finished(self, generation: int, task: SearchTask, keystroke_at: float, result):
+        if generation != self._generation:
+            return  # Результат устарел: пользователь продолжил ввод
+
+        self._task = None
+        page, total, counts = result
+        latency_ms = (time.perf_counter() - keystroke_at) * 1000
+        logger.debug(
+            "search %r: ввод→запуск %.1f мс, запрос %.1f мс, ввод→результат %.1f мс, найдено %d",
+            task.search_text, (task.started_at - keystroke_at) * 1000, task.query_ms,
+            latency_ms, total
+        )
+        self.results_ready.emit(task.search_text, page, total, counts, latency_ms)
+
+    def _on_failed(self, generation: int, error: str):
+        if generation == self._generation:
+            self._task = None
+            self.search_failed.emit(error)
\ No newline at end of file
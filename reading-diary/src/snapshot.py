@@ -0,0 +1,250 @@
+"""Снимок библиотеки по колонкам в массивах NumPy
+
+Все книги читаются одним запросом и раскладываются по массивам: id,
+коды статуса, жанра, названия и автора, оценка, объем и даты (номерами
+дней от 1970-01-01). Строки хранятся один раз в таблицах StringTable, в
+массивах — только их коды. Фильтры и агрегаты считаются векторными
+операциями над массивами без создания словаря на каждую книгу.
+
+Снимок необязателен: он создается только при первом обращении к
+library_snapshot и поддерживается по уведомлениям об изменении книг
+(см. BookTracker в analytics.py).
+"""
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from analytics import BookTracker
+from database import FACET_COLUMNS, PAGE_RANGES
+
+# Номер дня для пустой даты
+NO_DAY = -1_000_000
+
+_STRING_COLUMNS = ('status', 'title', 'author')
+
+
+def _day_sql(column: str) -> str:
+    return f"COALESCE(CAST(julianday({column}) - 2440587.5 AS INTEGER), {NO_DAY})"
+
+
+_ROWS_SQL = f'''
+    SELECT id, status, COALESCE(genre_id, 0), COALESCE(rating, 0), COALESCE(MAX(pages, 0), 0),
+           {_day_sql('start_date')}, {_day_sql('finish_date')}, {_day_sql('created_at')},
+           title, author
+    FROM books
+'''
+
+
+def library_snapshot(db) -> 'LibrarySnapshot':
+    """Общий снимок библиотеки для базы (создается при первом обращении)"""
+    return LibrarySnapshot.shared(db)
+
+
+class StringTable:
+    """Таблица строк: каждая строка хранится один раз, в массивах — ее код
+
+    Коды не переиспользуются: строки, которые больше не встречаются,
+    остаются в таблице до перезагрузки снимка.
+    """
+
+    def __init__(self):
+        self._codes: Dict[Optional[str], int] = {}
+        self.strings: List[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def encode(self, values: Sequence[Optional[str]]) -> np.ndarray:
+        """Коды строк; новые строки добавляются в таблицу"""
+        codes, strings = self._codes, self.strings
+        for value in values:
+            if value not in codes:
+                codes[value] = len(strings)
+                strings.append(value)
+        return np.fromiter(map(codes.__getitem__, values), dtype=np.int32, count=len(values))
+
+    def code(self, value: Optional[str]) -> Optional[int]:
+        """Код строки или None, если такой строки нет"""
+        return self._codes.get(value)
+
+    def memory_size(self) -> int:
+        """Примерный объем таблицы в байтах"""
+        return (sys.getsizeof(self._codes) + sys.getsizeof(self.strings)
+                + sum(sys.getsizeof(value) for value in self.strings if value is not None))
+
+
+def _years(days: np.ndarray) -> np.ndarray:
+    """Номер дня -> год, 0 для пустой даты"""
+    known = days != NO_DAY
+    years = np.where(known, days, 0).astype('datetime64[D]').astype('datetime64[Y]').astype(np.int64) + 1970
+    return np.where(known, years, 0)
+
+
+class LibrarySnapshot(BookTracker):
+    """Книги по колонкам: фильтры, выборки и статистика векторными операциями"""
+
+    COLUMNS = ('ids', 'status', 'genre', 'rating', 'pages', 'start', 'finish', 'created', 'title', 'author')
+
+    def __init__(self, db):
+        super().__init__(db)
+        self._reset()
+
+    def _reset(self):
+        self.strings = {column: StringTable() for column in _STRING_COLUMNS}
+        # Книги, упорядоченные по id; пустой жанр, оценка и объем — 0, пустая дата — NO_DAY
+        self.ids = np.empty(0, dtype=np.int64)
+        self.status = np.empty(0, dtype=np.int16)
+        self.genre = np.empty(0, dtype=np.int32)
+        self.rating = np.empty(0, dtype=np.int8)
+        self.pages = np.empty(0, dtype=np.int32)
+        self.start = np.empty(0, dtype=np.int32)
+        self.finish = np.empty(0, dtype=np.int32)
+        self.created = np.empty(0, dtype=np.int32)
+        self.title = np.empty(0, dtype=np.int32)
+        self.author = np.empty(0, dtype=np.int32)
+
+    def _fetch(self, conn, ids: Optional[List[int]] = None) -> List[np.ndarray]:
+        """Колонки книг одним запросом, в порядке COLUMNS"""
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        if ids is None:
+            cursor.execute(_ROWS_SQL + " ORDER BY id")
+        else:
+            cursor.execute(_ROWS_SQL + f" WHERE id IN ({', '.join('?' * len(ids))}) ORDER BY id", ids)
+        rows = cursor.fetchall()
+        columns = list(zip(*rows)) if rows else [()] * len(self.COLUMNS)
+
+        arrays = []
+        for name, values in zip(self.COLUMNS, columns):
+            if name in self.strings:
+                arrays.append(self.strings[name].encode(values).astype(getattr(self, name).dtype))
+            else:
+                arrays.append(np.array(values, dtype=getattr(self, name).dtype))
+        return arrays
+
+    def load(self, conn=None):
+        """Читает все книги заново"""
+        conn = conn or self.db.connect()
+        self._reset()
+        for name, values in zip(self.COLUMNS, self._fetch(conn)):
+            setattr(self, name, values)
+        self.loaded = True
+
+    def update(self, book_ids: Iterable[int], conn=None):
+        """Перечитывает изменившиеся книги"""
+        conn = conn or self.db.connect()
+        book_ids = np.unique(np.fromiter(book_ids, dtype=np.int64))
+        if not len(book_ids):
+            return
+
+        positions = self._positions(book_ids)
+        self._splice(positions, self._fetch(conn, book_ids.tolist()))
+
+    def _facet_mask(self, facet: str, values: Iterable) -> np.ndarray:
+        """Книги, подходящие под одно из значений фильтра (значения как в FacetIndex)"""
+        values = set(values)
+        if facet == 'pages':
+            mask = self.pages < 1 if None in values else np.zeros(len(self.ids), dtype=bool)
+            for number in values - {None}:
+                if not isinstance(number, int) or not 0 <= number < len(PAGE_RANGES):
+                    raise ValueError(f"Нет диапазона объема {number!r}")
+                low, high = PAGE_RANGES[number]
+                mask |= (self.pages >= low) & (self.pages < high) if high else self.pages >= low
+            return mask
+
+        if facet == 'status':
+            column = self.status
+            table = self.strings['status']
+            codes = [code for code in map(table.code, values) if code is not None]
+        elif facet == 'year':
+            column = _years(self.finish)
+            codes = [0 if value is None else int(value) for value in values]
+        else:
+            column = getattr(self, facet)
+            codes = [0 if value is None else value for value in values]
+        return np.isin(column, codes)
+
+    def _mask(self, filters: Optional[Dict[str, Iterable]], search_text: str) -> Optional[np.ndarray]:
+        """Маска книг под поиском и фильтрами; None — ограничений нет"""
+        mask = None
+        for facet, values in (filters or {}).items():
+            if facet not in FACET_COLUMNS:
+                raise ValueError(f"Нельзя фильтровать по {facet}")
+            if values:
+                facet_mask = self._facet_mask(facet, values)
+                mask = facet_mask if mask is None else mask & facet_mask
+
+        found = self.db.find_book_ids(search_text)
+        if found is not None:
+            search_mask = np.zeros(len(self.ids), dtype=bool)
+            search_mask[self._positions(np.array(found, dtype=np.int64))] = True
+            mask = search_mask if mask is None else mask & search_mask
+        return mask
+
+    def count(self, filters: Optional[Dict[str, Iterable]] = None, search_text: str = "") -> int:
+        """Число книг под поиском и фасетными фильтрами"""
+        with self._lock:
+            mask = self._mask(filters, search_text)
+            return len(self.ids) if mask is None else int(np.count_nonzero(mask))
+
+    def book_ids(self, filters: Optional[Dict[str, Iterable]] = None, search_text: str = "") -> np.ndarray:
+        """id книг под поиском и фасетными фильтрами, по возрастанию"""
+        with self._lock:
+            mask = self._mask(filters, search_text)
+            return self.ids.copy() if mask is None else self.ids[mask]
+
+    def statistics(self, filters: Optional[Dict[str, Iterable]] = None, search_text: str = "") -> Dict[str, Any]:
+        """Статистика по книгам под поиском и фильтрами, в формате Database.get_statistics"""
+        genre_names = {genre['id']: genre['name'] for genre in self.db.get_all_genres()}
+        with self._lock:
+            mask = self._mask(filters, search_text)
+            # Копии выбранных книг: после снятия блокировки массивы могут меняться
+            selected = np.arange(len(self.ids)) if mask is None else mask
+            status, genre = self.status[selected], self.genre[selected]
+            rating, pages, finish = self.rating[selected], self.pages[selected], self.finish[selected]
+            statuses = self.strings['status']
+            status_counts = np.bincount(status, minlength=len(statuses))
+
+        def status_count(name: str) -> int:
+            code = statuses.code(name)
+            return int(status_counts[code]) if code is not None else 0
+
+        rated = rating[rating > 0]
+        avg_rating = float(rated.mean()) if len(rated) else 0
+
+        genre_counts: Dict[str, int] = {}
+        genre_ids, counts = np.unique(genre[genre > 0], return_counts=True)
+        for genre_id, count in zip(genre_ids.tolist(), counts.tolist()):
+            name = genre_names.get(genre_id)
+            if name is not None:
+                genre_counts[name] = genre_counts.get(name, 0) + count
+        genres_stats = [{'genre': name, 'count': count} for name, count in genre_counts.items()]
+        genres_stats.sort(key=lambda item: item['count'], reverse=True)
+
+        ratings, counts = np.unique(rated, return_counts=True)
+        finished = finish[finish != NO_DAY].astype('datetime64[D]')
+        months, month_counts = np.unique(finished.astype('datetime64[M]'), return_counts=True)
+        years, year_counts = np.unique(finished.astype('datetime64[Y]'), return_counts=True)
+
+        return {
+            'total': len(status),
+            'read_count': status_count('Прочитано'),
+            'reading_count': status_count('Читаю'),
+            'wishlist_count': status_count('Хочу прочитать'),
+            'avg_rating': round(avg_rating, 2) if avg_rating else 0,
+            'total_pages': int(pages.sum()),
+            'genres_stats': genres_stats,
+            'ratings_stats': [{'rating': value, 'count': count}
+                              for value, count in zip(ratings.tolist(), counts.tolist())],
+            'monthly_stats': [{'month': str(month), 'count': count}
+                              for month, count in zip(months, month_counts.tolist())],
+            'yearly_stats': [{'year': str(year), 'count': count}
+                             for year, count in zip(years, year_counts.tolist())],
+        }
+
+    def memory_size(self) -> int:
+        """Примерный объем снимка в байтах: массивы и таблицы строк"""
+        with self._lock:
+            return (sum(getattr(self, name).nbytes for name in self.COLUMNS)
+                    + sum(table.memory_size() for table in self.strings.values()))
\ No newline at end of file
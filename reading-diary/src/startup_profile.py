@@ -0,0 +1,87 @@
+import builtins
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from PyQt6.QtCore import QEvent, QObject
+
+# Модули, которые не должны загружаться до появления главного окна
+HEAVY_MODULES = ('matplotlib', 'numpy')
+
+
+class StartupProfiler(QObject):
+    """Профилирование запуска: время импорта каждого модуля и время до первого окна
+
+    Импорты замеряются подменой builtins.__import__ в главном потоке: для
+    модуля учитывается полное время (с вложенными импортами) и собственное.
+    Включается ключом --profile-startup до импорта остальных модулей.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.started_at = time.perf_counter()
+        self.first_paint_at: Optional[float] = None
+        # (имя модуля, полное время, собственное время), в секундах
+        self.imports: List[Tuple[str, float, float]] = []
+        self._stack: List[list] = []
+        # Суммарное время импортов, не вложенных в другие замеренные
+        self.import_time = 0.0
+        self._original_import = builtins.__import__
+        self._thread = threading.get_ident()
+        self._on_first_paint = None
+
+    def start(self):
+        """Начинает замер импортов"""
+        builtins.__import__ = self._timed_import
+
+    def stop(self):
+        """Прекращает замер импортов"""
+        builtins.__import__ = self._original_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Замеряются только первые абсолютные импорты главного потока
+        if level or name in sys.modules or threading.get_ident() != self._thread:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        frame = [time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._stack.pop()
+            total = time.perf_counter() - frame[0]
+            if self._stack:
+                self._stack[-1][1] += total
+            else:
+                self.import_time += total
+            self.imports.append((name, total, total - frame[1]))
+
+    def watch_window(self, window, on_first_paint=None):
+        """Отмечает первую отрисовку окна; on_first_paint вызывается после отчета"""
+        self._on_first_paint = on_first_paint
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and self.first_paint_at is None:
+            self.first_paint_at = time.perf_counter()
+            obj.removeEventFilter(self)
+            self.stop()
+            self.report()
+            if self._on_first_paint:
+                self._on_first_paint()
+        return False
+
+    def report(self, top: int = 15):
+        """Печатает отчет о запуске"""
+        print("Профиль запуска")
+        print(f"  Импортировано модулей: {len(self.imports)}, "
+              f"время импортов: {self.import_time * 1000:.1f} мс")
+        print("  Самые медленные модули (собственное / полное время, мс):")
+        for name, total, own in sorted(self.imports, key=lambda item: item[2], reverse=True)[:top]:
+            print(f"    {own * 1000:8.1f} {total * 1000:8.1f}  {name}")
+
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        print(f"  Тяжелые модули при запуске: {', '.join(loaded) if loaded else 'нет'}")
+        if self.first_paint_at is not None:
+            print(f"  Первое окно: {(self.first_paint_at - self.started_at) * 1000:.1f} мс")
\ No newline at end of file
@@ -1,22 +1,20 @@
-import os
-from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTableWidgetItem, QLabel
-from PyQt6.QtCore import Qt
-from PyQt6 import uic
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import numpy as np
-from datetime import datetime
+from PyQt6.QtWidgets import QDialog, QMessageBox, QTableWidgetItem
+from ui_loader import load_ui
+from workers import StatisticsTask
+from charts import CHART_BACKENDS, backend_name, create_backend
 
 
 class StatisticsDialog(QDialog):
     def __init__(self, db, parent=None):
         super().__init__(parent)
         self.db = db
+        # Версия статистики, уже показанной в диалоге
+        self.shown_version = None
+        # Выполняющаяся фоновая загрузка статистики
+        self.statistics_task = None
 
         # Загружаем интерфейс
-        ui_path = os.path.join(os.path.dirname(__file__), '..', 'qt', 'statistics_dialog.ui')
-        uic.loadUi(ui_path, self)
+        load_ui('statistics_dialog', self)
 
         self.setup_ui()
         self.load_statistics()
@@ -33,11 +31,101 @@ class StatisticsDialog(QDialog):
         self.table_ratings.setColumnCount(2)
         self.table_ratings.setHorizontalHeaderLabels(["Оценка", "Количество"])
 
+        # Графики создаются один раз и дальше только обновляются;
+        # реализация выбирается в диалоге или через READING_DIARY_CHARTS
+        self.charts = create_backend(backend_name(), self.widget_chart,
+                                     self.widget_pie_chart, self.widget_bar_chart)
+        for name, (_, title) in CHART_BACKENDS.items():
+            self.combo_charts.addItem(title, name)
+        self.combo_charts.setCurrentIndex(self.combo_charts.findData(self.charts.name))
+        self.combo_charts.currentIndexChanged.connect(self.change_chart_backend)
+
+    def change_chart_backend(self):
+        """Переключает реализацию графиков и перерисовывает статистику"""
+        name = self.combo_charts.currentData()
+        if name == self.charts.name:
+            return
+        self.charts.close()
+        self.charts = create_backend(name, self.widget_chart,
+                                     self.widget_pie_chart, self.widget_bar_chart)
+        self.shown_version = None
+        self.load_statistics()
+
     def load_statistics(self):
-        """Загружает статистику"""
-        stats = self.db.get_statistics()
+        """Запускает фоновую загрузку статистики; если данные не менялись с прошлого показа, ничего не делает"""
+        if self.shown_version is not None and self.db.get_statistics_version() == self.shown_version:
+            return
+
+        self.cancel_loading()
+        # При первом показе — заглушки; при обновлении старые данные видны до прихода новых
+        if self.shown_version is None:
+            self.show_placeholders()
+
+        self.statistics_task = StatisticsTask(self.db)
+        self.statistics_task.signals.section_ready.connect(self.on_section_ready)
+        self.statistics_task.signals.finished.connect(self.on_statistics_loaded)
+        self.statistics_task.signals.failed.connect(self.on_statistics_failed)
+        self.statistics_task.start()
+
+    def cancel_loading(self):
+        """Отменяет незавершенную загрузку статистики"""
+        if self.statistics_task is not None:
+            self.statistics_task.cancel()
+            self.statistics_task = None
+
+    def done(self, result):
+        # Закрытие диалога любым способом прерывает загрузку
+        self.cancel_loading()
+        super().done(result)
+
+    def show_placeholders(self):
+        """Показывает диалог без данных, пока статистика загружается"""
+        for label in (self.lbl_total_books, self.lbl_read_books, self.lbl_reading_books,
+                      self.lbl_wishlist_books, self.lbl_avg_rating, self.lbl_total_pages,
+                      self.lbl_reading_days, self.lbl_books_this_year, self.lbl_last_12_months,
+                      self.lbl_avg_duration, self.lbl_pages_per_day, self.lbl_day_streak,
+                      self.lbl_month_streak):
+            label.setText("…")
+        self.table_genres.setRowCount(0)
+        self.table_ratings.setRowCount(0)
+        self.charts.show_loading()
+
+    def is_current_task(self) -> bool:
+        """Пришел ли сигнал от выполняющейся загрузки, а не от отмененной"""
+        return self.statistics_task is not None and self.sender() is self.statistics_task.signals
+
+    def on_section_ready(self, section, data):
+        """Показывает загруженный раздел статистики"""
+        if not self.is_current_task():
+            return
+
+        if section == 'totals':
+            self.load_totals(data)
+        elif section == 'genres':
+            self.load_genres_stats(data['genres_stats'])
+        elif section == 'ratings':
+            self.load_ratings_stats(data['ratings_stats'])
+        elif section == 'monthly':
+            self.create_monthly_chart(data['monthly_stats'])
+        elif section == 'analytics':
+            self.load_analytics(data)
+
+    def on_statistics_loaded(self, version):
+        """Запоминает версию статистики, загруженной полностью"""
+        if not self.is_current_task():
+            return
+        self.statistics_task = None
+        self.shown_version = version
+
+    def on_statistics_failed(self, message):
+        """Обрабатывает ошибку загрузки статистики"""
+        if not self.is_current_task():
+            return
+        self.statistics_task = None
+        QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить статистику: {message}")
 
-        # Общая статистика
+    def load_totals(self, stats):
+        """Заполняет общие показатели"""
         self.lbl_total_books.setText(str(stats['total']))
         self.lbl_read_books.setText(str(stats['read_count']))
         self.lbl_reading_books.setText(str(stats['reading_count']))
@@ -45,80 +133,23 @@ class StatisticsDialog(QDialog):
         self.lbl_avg_rating.setText(str(stats['avg_rating']))
         self.lbl_total_pages.setText(str(stats['total_pages']))
 
-        # Примерные расчеты
-        if stats['read_count'] > 0:
-            self.lbl_reading_days.setText(str(stats['read_count'] * 14))  # По 14 дней на книгу
-            self.lbl_books_this_year.setText(str(stats['read_count']))  # Упрощенный расчет
-        else:
-            self.lbl_reading_days.setText("0")
-            self.lbl_books_this_year.setText("0")
-
-        # График чтения по месяцам
-        self.create_monthly_chart(stats['monthly_stats'])
-
-        # Статистика по жанрам
-        self.load_genres_stats(stats['genres_stats'])
-
-        # Статистика по оценкам
-        self.load_ratings_stats(stats['ratings_stats'])
+    def load_analytics(self, analytics):
+        """Заполняет показатели по датам чтения"""
+        self.lbl_reading_days.setText(str(analytics['reading_days']))
+        self.lbl_books_this_year.setText(f"{analytics['books_this_year']} ({analytics['pages_this_year']} стр.)")
+        self.lbl_last_12_months.setText(
+            f"{analytics['books_last_12_months']} ({analytics['pages_last_12_months']} стр.)"
+        )
+        self.lbl_avg_duration.setText(str(analytics['avg_duration']))
+        self.lbl_pages_per_day.setText(str(analytics['pages_per_day']))
+        self.lbl_day_streak.setText(str(analytics['day_streak']))
+        self.lbl_month_streak.setText(str(analytics['month_streak']))
 
     def create_monthly_chart(self, monthly_stats):
-        """Создает простой график чтения по месяцам"""
-        # Очищаем предыдущий график
-        for i in reversed(range(self.widget_chart.layout().count() if self.widget_chart.layout() else 0)):
-            widget = self.widget_chart.layout().itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        if not monthly_stats:
-            # Если нет данных, показываем сообщение
-            layout = QVBoxLayout(self.widget_chart)
-            label = QLabel("Нет данных для графика")
-            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            layout.addWidget(label)
-            return
-
-        # Создаем простой график
-        fig = Figure(figsize=(6, 4))
-        canvas = FigureCanvas(fig)
-
-        ax = fig.add_subplot(111)
-
-        # Подготавливаем данные
+        """Обновляет график чтения по месяцам"""
         months = [item['month'] for item in monthly_stats]
         counts = [item['count'] for item in monthly_stats]
-
-        # Простая столбчатая диаграмма
-        bars = ax.bar(range(len(months)), counts, color='lightblue')
-
-        # Простые подписи
-        ax.set_xlabel('Месяц')
-        ax.set_ylabel('Количество книг')
-        ax.set_title('Чтение по месяцам')
-
-        # Простые подписи месяцев
-        if len(months) <= 12:
-            # Если месяцев немного, показываем все
-            ax.set_xticks(range(len(months)))
-            ax.set_xticklabels(months, rotation=45)
-        else:
-            # Если много месяцев, показываем каждый 3-й
-            ax.set_xticks(range(0, len(months), 3))
-            ax.set_xticklabels(months[::3], rotation=45)
-
-        # Добавляем значения на столбцы (только если их немного)
-        if len(bars) <= 15:
-            for bar in bars:
-                height = bar.get_height()
-                if height > 0:  # Только если есть значение
-                    ax.text(bar.get_x() + bar.get_width() / 2., height,
-                            f'{int(height)}', ha='center', va='bottom')
-
-        fig.tight_layout()
-
-        # Встраиваем в Qt виджет
-        layout = QVBoxLayout(self.widget_chart)
-        layout.addWidget(canvas)
+        self.charts.set_monthly(months, counts)
 
     def load_genres_stats(self, genres_stats):
         """Загружает статистику по жанрам"""
@@ -142,57 +173,15 @@ class StatisticsDialog(QDialog):
             self.table_genres.setItem(row, 2, QTableWidgetItem(f"{percentage:.1f}%"))
             row += 1
 
-        # Создаем простую круговую диаграмму
+        # Обновляем круговую диаграмму
         self.create_pie_chart(genres_stats)
 
     def create_pie_chart(self, genres_stats):
-        """Создает простую круговую диаграмму по жанрам"""
-        # Очищаем предыдущий график
-        for i in reversed(range(self.widget_pie_chart.layout().count() if self.widget_pie_chart.layout() else 0)):
-            widget = self.widget_pie_chart.layout().itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
+        """Обновляет круговую диаграмму по жанрам"""
         # Фильтруем только жанры с книгами
         filtered_stats = [item for item in genres_stats if item['count'] and item['count'] > 0]
-        if not filtered_stats:
-            # Если нет данных, показываем сообщение
-            layout = QVBoxLayout(self.widget_pie_chart)
-            label = QLabel("Нет данных для диаграммы")
-            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            layout.addWidget(label)
-            return
-
-        # Подготавливаем данные
-        labels = [item['genre'] for item in filtered_stats]
-        sizes = [item['count'] for item in filtered_stats]
-
-        # Создаем диаграмму
-        fig = Figure(figsize=(5, 5))
-        canvas = FigureCanvas(fig)
-
-        ax = fig.add_subplot(111)
-
-        # Простая круговая диаграмма
-        wedges, texts, autotexts = ax.pie(sizes,
-                                          labels=labels,
-                                          autopct='%1.1f%%',
-                                          startangle=90)
-
-        ax.set_title('Распределение по жанрам')
-
-        # Делаем подписи меньше
-        for autotext in autotexts:
-            autotext.set_fontsize(8)
-
-        for text in texts:
-            text.set_fontsize(8)
-
-        fig.tight_layout()
-
-        # Встраиваем в Qt виджет
-        layout = QVBoxLayout(self.widget_pie_chart)
-        layout.addWidget(canvas)
+        self.charts.set_genres([item['genre'] for item in filtered_stats],
+                               [item['count'] for item in filtered_stats])
 
     def load_ratings_stats(self, ratings_stats):
         """Загружает статистику по оценкам"""
@@ -205,52 +194,9 @@ class StatisticsDialog(QDialog):
             self.table_ratings.setItem(row, 0, QTableWidgetItem("★" * rating))
             self.table_ratings.setItem(row, 1, QTableWidgetItem(str(count)))
 
-        # Создаем простую столбчатую диаграмму
+        # Обновляем столбчатую диаграмму
         self.create_bar_chart(ratings_stats)
 
     def create_bar_chart(self, ratings_stats):
-        """Создает простую столбчатую диаграмму оценок"""
-        # Очищаем предыдущий график
-        for i in reversed(range(self.widget_bar_chart.layout().count() if self.widget_bar_chart.layout() else 0)):
-            widget = self.widget_bar_chart.layout().itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        if not ratings_stats:
-            # Если нет данных, показываем сообщение
-            layout = QVBoxLayout(self.widget_bar_chart)
-            label = QLabel("Нет данных для графика")
-            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            layout.addWidget(label)
-            return
-
-        # Подготавливаем данные
-        ratings = [item['rating'] for item in ratings_stats]
-        counts = [item['count'] for item in ratings_stats]
-        labels = ["★" * r for r in ratings]
-
-        # Создаем диаграмму
-        fig = Figure(figsize=(5, 5))
-        canvas = FigureCanvas(fig)
-
-        ax = fig.add_subplot(111)
-
-        # Простая столбчатая диаграмма
-        colors = ['gold', 'silver', 'lightblue', 'lightgreen', 'pink']
-        bars = ax.bar(labels, counts, color=colors[:len(ratings)])
-
-        ax.set_xlabel('Оценка')
-        ax.set_ylabel('Количество книг')
-        ax.set_title('Распределение оценок')
-
-        # Добавляем значения на столбцы
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width() / 2., height,
-                    f'{int(height)}', ha='center', va='bottom')
-
-        fig.tight_layout()
-
-        # Встраиваем в Qt виджет
-        layout = QVBoxLayout(self.widget_bar_chart)
-        layout.addWidget(canvas)
\ No newline at end of file
+        """Обновляет столбчатую диаграмму оценок"""
+        self.charts.set_ratings({item['rating']: item['count'] for item in ratings_stats})
\ No newline at end of file
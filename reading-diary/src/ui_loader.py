@@ -0,0 +1,35 @@
+import importlib
+import os
+
+from PyQt6.QtWidgets import QWidget
+
+UI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'qt')
+# Пакет с классами, заранее сгенерированными из qt/*.ui (см. build_ui.py)
+COMPILED_PACKAGE = 'ui_compiled'
+COMPILED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), COMPILED_PACKAGE)
+
+
+def load_ui(name: str, widget: QWidget):
+    """Строит интерфейс qt/<name>.ui на виджете
+
+    Если есть сгенерированный модуль и он не старше .ui-файла, используется
+    он: это избавляет от разбора XML при каждом открытии окна. Иначе .ui
+    загружается через uic, как раньше (принудительно — READING_DIARY_UIC=1).
+    В обоих случаях дочерние виджеты становятся атрибутами widget.
+    """
+    ui_path = os.path.join(UI_DIR, f'{name}.ui')
+    compiled_path = os.path.join(COMPILED_DIR, f'{name}.py')
+
+    if (not os.environ.get('READING_DIARY_UIC')
+            and os.path.exists(compiled_path)
+            and os.path.getmtime(compiled_path) >= os.path.getmtime(ui_path)):
+        module = importlib.import_module(f'{COMPILED_PACKAGE}.{name}')
+        form = module.FORM_CLASS()
+        form.setupUi(widget)
+        # Как uic.loadUi: виджеты доступны как атрибуты окна
+        for attribute, value in vars(form).items():
+            setattr(widget, attribute, value)
+        return
+
+    from PyQt6 import uic
+    uic.loadUi(ui_path, widget)
\ No newline at end of file
@@ -0,0 +1,143 @@
+import sqlite3
+import threading
+from typing import Any, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from database import STATISTICS_SECTIONS
+
+
+class TaskSignals(QObject):
+    """Сигналы фоновой задачи (QRunnable не может объявлять их сам)"""
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(int, int)
+
+
+class DatabaseTask(QRunnable):
+    """Фоновая задача, работающая с базой через соединение своего потока
+
+    Наследники реализуют work(). Отмена помечает задачу и прерывает
+    выполняющийся запрос через sqlite3.Connection.interrupt; результат
+    отмененной задачи не доставляется.
+
+    Соединение закрывается в конце задачи: между задачами Qt не сохраняет
+    состояние Python потока пула, и threading.local с соединением
+    пропадает, а само соединение осталось бы в Database до close().
+    """
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        self.signals = TaskSignals()
+        self.cancelled = False
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def work(self) -> Any:
+        raise NotImplementedError
+
+    def run(self):
+        if self.cancelled:
+            return
+
+        with self._lock:
+            self._connection = self.db.connect()
+        try:
+            result = self.work()
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.failed.emit(str(e))
+            return
+        finally:
+            with self._lock:
+                self._connection = None
+            self.db.release_thread_connection()
+
+        if not self.cancelled:
+            self.signals.finished.emit(result)
+
+    def report_progress(self, done: int, total: int):
+        """Сообщает о ходе выполнения"""
+        self.signals.progress.emit(done, total)
+
+    def cancel(self):
+        """Отменяет задачу и прерывает текущий запрос к базе"""
+        self.cancelled = True
+        with self._lock:
+            if self._connection is not None:
+                self._connection.interrupt()
+
+    def start(self, pool: Optional[QThreadPool] = None):
+        """Запускает задачу в пуле потоков"""
+        (pool or QThreadPool.globalInstance()).start(self)
+
+
+class ExportTask(DatabaseTask):
+    """Экспорт книг в CSV в фоновом потоке"""
+
+    def __init__(self, db, file_path: str):
+        super().__init__(db)
+        self.file_path = file_path
+
+    def work(self) -> bool:
+        return self.db.export_to_csv(self.file_path, progress=self.report_progress)
+
+
+class ImportTask(DatabaseTask):
+    """Импорт книг из CSV в фоновом потоке"""
+
+    def __init__(self, db, file_path: str):
+        super().__init__(db)
+        self.file_path = file_path
+
+    def work(self):
+        return self.db.import_from_csv(self.file_path, progress=self.report_progress)
+
+
+class StatisticsSignals(TaskSignals):
+    """Сигналы загрузки статистики: каждый раздел доставляется по готовности"""
+    section_ready = pyqtSignal(str, object)
+
+
+class StatisticsTask(DatabaseTask):
+    """Загрузка статистики по разделам в фоновом потоке
+
+    Разделы — STATISTICS_SECTIONS и затем 'analytics' (ReadingAnalytics.summary).
+    Результат задачи — версия статистики, с которой начиналась загрузка.
+    """
+
+    def __init__(self, db):
+        super().__init__(db)
+        self.signals = StatisticsSignals()
+
+    def work(self) -> Optional[int]:
+        version = None
+        for section in STATISTICS_SECTIONS:
+            if self.cancelled:
+                return None
+            data = self.db.get_statistics_section(section)
+            if section == 'totals':
+                version = data['version']
+            self.signals.section_ready.emit(section, data)
+
+        # Аналитика по датам чтения — последней: первый раз она читает все книги.
+        # NumPy загружается здесь, в фоновом потоке
+        if self.cancelled:
+            return None
+        from analytics import reading_analytics
+        analytics = reading_analytics(self.db)
+        analytics.refresh()
+        self.signals.section_ready.emit('analytics', analytics.summary())
+        return version
+
+
+class FacetIndexTask(DatabaseTask):
+    """Построение или обновление битовых карт фильтров в фоновом потоке; результат — FacetIndex"""
+
+    def work(self):
+        # Индекс фильтров основан на analytics: NumPy загружается здесь, в фоновом потоке
+        from facets import facet_index
+        index = facet_index(self.db)
+        index.refresh()
+        return index
\ No newline at end of file